@@ -1,6 +1,8 @@
+import secrets
 from typing import Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from app.core.config import settings
 from app.services.auth_service import AuthService
 
 security = HTTPBearer(auto_error=False)
@@ -29,3 +31,28 @@ async def get_current_admin(
     
     return admin
 
+
+
+async def get_optional_admin(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
+) -> Optional[dict]:
+    """Dependency to get the authenticated admin if a valid token was sent."""
+    if not credentials:
+        return None
+    return await AuthService.get_current_admin(credentials.credentials)
+
+
+async def is_operator(x_ops_key: Optional[str] = Header(None)) -> bool:
+    """Dependency telling whether the request carries the operator key."""
+    if not settings.ops_api_key or not x_ops_key:
+        return False
+    return secrets.compare_digest(x_ops_key.encode("utf-8"), settings.ops_api_key.encode("utf-8"))
+
+
+async def require_operator(operator: bool = Depends(is_operator)) -> None:
+    """Dependency restricting fleet-wide endpoints to operators."""
+    if not operator:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Operator access required. Please provide a valid X-Ops-Key header."
+        )
@@ -1,6 +1,18 @@
-from fastapi import APIRouter, HTTPException, status
-from app.schemas.auth import AdminLogin, TokenResponse
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from app.core.profiling import profile_store
+from app.core.loop_monitor import loop_monitor
+from app.core.tenant_scheduler import tenant_scheduler
+from app.schemas.auth import AdminLogin, RefreshRequest, TokenResponse
+from app.schemas.audit import AuditEventPage
+from app.schemas.org import DeprovisionRequest, DeprovisionResponse
 from app.services.auth_service import AuthService
+from app.services.audit_service import AuditService
+from app.services.consistency_service import ConsistencyService
+from app.services.org_service import OrganizationService
+from app.services.template_service import current_template, reconcile_progress
+from app.api.deps import get_optional_admin, is_operator, require_operator
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -15,6 +27,7 @@ async def admin_login(login_data: AdminLogin):
         )
         return TokenResponse(
             access_token=result["access_token"],
+            refresh_token=result["refresh_token"],
             token_type=result["token_type"],
             admin_id=result["admin_id"],
             organization_id=result["organization_id"],
@@ -31,3 +44,106 @@ async def admin_login(login_data: AdminLogin):
             detail=f"Login failed: {str(e)}"
         )
 
+
+@router.post("/refresh", response_model=TokenResponse, status_code=status.HTTP_200_OK)
+async def refresh_token(request: RefreshRequest):
+    """Exchange a refresh token for a new access token. The refresh token is returned unchanged."""
+    try:
+        return TokenResponse(**await AuthService.refresh(request.refresh_token))
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e)
+        )
+
+
+
+@router.get("/audit", response_model=AuditEventPage)
+async def list_audit_events(
+    organization_name: Optional[str] = Query(None, description="Operators only: filter by organization, omit for all"),
+    limit: int = Query(50, ge=1, le=500, description="Maximum events per page"),
+    before: Optional[str] = Query(None, description="next_before from the previous page"),
+    operator: bool = Depends(is_operator),
+    current_admin: Optional[dict] = Depends(get_optional_admin)
+):
+    """
+    List audit events, newest first.
+    Admins see their own organization's events; operators can see any.
+    """
+    if not operator:
+        if not current_admin:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Authentication required. Please provide a Bearer token.",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        organization_name = current_admin["organization_name"]
+    
+    try:
+        return await AuditService.list_events(
+            organization_name=organization_name,
+            limit=limit,
+            before=before
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.get("/profiles", dependencies=[Depends(require_operator)])
+async def list_profiles():
+    """List captured request profiles, newest first. Operator only."""
+    return {"items": profile_store.list()}
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse, dependencies=[Depends(require_operator)])
+async def download_profile(profile_id: int):
+    """Download a request profile in collapsed-stack format. Operator only."""
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Profile {profile_id} not found"
+        )
+    return PlainTextResponse(
+        profile_store.collapsed(profile),
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.collapsed"'}
+    )
+
+
+@router.get("/loop", dependencies=[Depends(require_operator)])
+async def event_loop_status():
+    """Event-loop lag percentiles and recent blocking stacks. Operator only."""
+    return loop_monitor.summary()
+
+
+@router.get("/scheduler", dependencies=[Depends(require_operator)])
+async def tenant_scheduler_status():
+    """Tenant database slots in use and batches waiting, per tenant. Operator only."""
+    return tenant_scheduler.summary()
+
+
+@router.post("/consistency", dependencies=[Depends(require_operator)])
+async def check_consistency(
+    repair: bool = Query(False, description="Fix what can be fixed instead of only reporting")
+):
+    """Cross-check master metadata against the tenant collections. Operator only."""
+    return await ConsistencyService.check(repair=repair)
+
+
+@router.post("/deprovision", response_model=DeprovisionResponse, dependencies=[Depends(require_operator)])
+async def deprovision_organizations(request: DeprovisionRequest):
+    """
+    Delete up to 1000 organizations in one call, for offboarding. Operator only.
+    Organizations are marked deleted at once; their collections are
+    reclaimed in the background at a throttled rate.
+    """
+    return await OrganizationService.deprovision_organizations(request.organization_names, actor="operator")
+
+
+@router.get("/templates", dependencies=[Depends(require_operator)])
+async def tenant_template_status():
+    """The current tenant collection template and the reconciler's progress. Operator only."""
+    return {"template": current_template(), "reconcile": reconcile_progress}
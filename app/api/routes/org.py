@@ -1,12 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import logging
+from typing import Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
+from fastapi.responses import StreamingResponse
+from app.core.config import settings
 from app.schemas.org import (
     OrganizationCreate,
     OrganizationResponse,
-    OrganizationUpdate
+    OrganizationSearchResponse,
+    OrganizationUpdate,
+    TenantStatsResponse,
+    FleetStatsResponse
 )
-from app.services.org_service import OrganizationService
-from app.api.deps import get_current_admin
+from app.services.org_service import OrganizationService, ConcurrentUpdateError, QuotaExceededError
+from app.services.stats_service import StatsService
+from app.services.transfer_service import TenantTransferService, EXPORT_FORMATS
+from app.services.event_service import organization_events
+from app.api.deps import get_current_admin, get_optional_admin, is_operator
 
+logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/org", tags=["organizations"])
 
 
@@ -14,20 +25,17 @@ router = APIRouter(prefix="/org", tags=["organizations"])
 async def create_organization(org_data: OrganizationCreate):
     """Create a new organization with dynamic MongoDB collection."""
     try:
-        # DEBUG: Verify what we received from the request
-        import sys
+        # Verify what we received from the request; only its type and length are logged
         password_received = org_data.password
         if not isinstance(password_received, str):
-            error_msg = f"DEBUG: API route received non-string password. Type: {type(password_received)}"
-            print(error_msg, file=sys.stderr)
+            logger.debug("create_organization: received non-string password of type %s", type(password_received).__name__)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Invalid password type: {type(password_received).__name__}"
             )
         
         if len(password_received) > 100:
-            error_msg = f"DEBUG: API route received suspiciously long password. Length: {len(password_received)}. First 100: {password_received[:100]}"
-            print(error_msg, file=sys.stderr)
+            logger.debug("create_organization: suspiciously long password of %d chars", len(password_received))
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Password appears incorrect. Length: {len(password_received)} chars."
@@ -46,7 +54,9 @@ async def create_organization(org_data: OrganizationCreate):
             collection_name=result["collection_name"],
             admin_email=result["admin_email"],
             created_at=result["created_at"],
-            updated_at=result["created_at"]
+            updated_at=result["created_at"],
+            version=result["version"],
+            cluster=result["cluster"]
         )
     except ValueError as e:
         raise HTTPException(
@@ -60,12 +70,40 @@ async def create_organization(org_data: OrganizationCreate):
         )
 
 
-@router.get("/get", response_model=OrganizationResponse)
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag, as RFC 9110 requires."""
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+@router.get("/get", response_model=OrganizationResponse, responses={304: {"description": "Not modified"}})
 async def get_organization(
-    organization_name: str = Query(..., description="Name of the organization to retrieve")
+    request: Request,
+    response: Response,
+    organization_name: str = Query(..., description="Name of the organization to retrieve"),
+    fresh: bool = Query(False, description="Read from the primary, e.g. right after a write made elsewhere")
 ):
-    """Get organization details by name."""
-    org = await OrganizationService.get_organization(organization_name)
+    """
+    Get organization details by name.
+    Responses carry an ETag; send it back in If-None-Match to get an empty
+    304 when the organization has not changed. May be served by a
+    secondary (READ_PREFERENCE) unless fresh is set.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        etag = await OrganizationService.get_organization_etag(organization_name)
+        if etag is not None and _etag_matches(if_none_match, etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": etag, "Cache-Control": settings.org_cache_control}
+            )
+    
+    # A client holding an ETag must not be served an older version than it has seen
+    org = await OrganizationService.get_organization(organization_name, fresh=fresh or bool(if_none_match))
     
     if not org:
         raise HTTPException(
@@ -73,12 +111,148 @@ async def get_organization(
             detail=f"Organization '{organization_name}' not found"
         )
     
+    response.headers["ETag"] = org["etag"]
+    response.headers["Cache-Control"] = settings.org_cache_control
     return OrganizationResponse(
         organization_name=org["organization_name"],
         collection_name=org["collection_name"],
         admin_email=org["admin_email"],
         created_at=org["created_at"],
-        updated_at=org["updated_at"]
+        updated_at=org["updated_at"],
+        version=org["version"],
+        cluster=org["cluster"]
+    )
+
+
+@router.get("/search", response_model=OrganizationSearchResponse)
+async def search_organizations(
+    q: str = Query(..., min_length=1, description="Name prefix or substring to search for"),
+    mode: str = Query("prefix", pattern="^(prefix|substring)$", description="prefix or substring matching"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum results per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
+):
+    """Search organizations by partial, case-insensitive name."""
+    try:
+        result = await OrganizationService.search_organizations(
+            query=q,
+            mode=mode,
+            limit=limit,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return OrganizationSearchResponse(
+        items=[
+            OrganizationResponse(
+                organization_name=org["organization_name"],
+                collection_name=org["collection_name"],
+                admin_email=org["admin_email"],
+                created_at=org["created_at"],
+                updated_at=org["updated_at"],
+                version=org["version"],
+                cluster=org["cluster"]
+            )
+            for org in result["items"]
+        ],
+        next_cursor=result["next_cursor"]
+    )
+
+
+@router.get("/events")
+async def stream_organization_events(
+    request: Request,
+    last_event_id: Optional[str] = Query(None, description="Resume after this event id; the Last-Event-ID header takes precedence"),
+    operator: bool = Depends(is_operator),
+    current_admin: Optional[dict] = Depends(get_optional_admin)
+):
+    """
+    Server-sent events stream of organization creates, updates, renames and deletes.
+    Admins receive their own organization's events; operators receive all.
+    A "reset" event means the resume point was lost and the client should
+    reload state; an "overflow" event means it fell behind and was
+    disconnected, and should reconnect with its last event id.
+    """
+    if not operator and not current_admin:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required. Please provide a Bearer token.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if organization_events.full:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many event subscribers, retry shortly",
+            headers={"Retry-After": "5"}
+        )
+    
+    return StreamingResponse(
+        organization_events.stream(
+            organization_id=None if operator else current_admin["organization_id"],
+            last_event_id=request.headers.get("last-event-id") or last_event_id
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/stats", response_model=Union[TenantStatsResponse, FleetStatsResponse])
+async def get_stats(
+    organization_name: Optional[str] = Query(None, description="Organization to report on; omit for fleet-wide totals"),
+    operator: bool = Depends(is_operator),
+    current_admin: Optional[dict] = Depends(get_optional_admin)
+):
+    """
+    Get cached usage statistics.
+    Per-tenant stats are available to that organization's admin and to
+    operators; fleet-wide totals require the operator key.
+    """
+    if organization_name is None:
+        if not operator:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Fleet-wide stats require operator access"
+            )
+        fleet = await StatsService.get_fleet_stats()
+        if not fleet:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Stats have not been collected yet"
+            )
+        return FleetStatsResponse(**fleet)
+    
+    if not operator:
+        if not current_admin:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Authentication required. Please provide a Bearer token.",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        if current_admin["organization_name"] != organization_name:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You can only access your own organization"
+            )
+    
+    org = await OrganizationService.get_organization(organization_name)
+    stats = await StatsService.get_tenant_stats(org["organization_id"]) if org else None
+    if not stats:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No stats collected yet for organization '{organization_name}'"
+        )
+    
+    return TenantStatsResponse(
+        organization_name=org["organization_name"],
+        collection_name=stats["collection_name"],
+        document_count=stats["document_count"],
+        data_size=stats["data_size"],
+        index_size=stats["index_size"],
+        last_write_at=stats["last_write_at"],
+        refreshed_at=stats["refreshed_at"]
     )
 
 
@@ -106,7 +280,9 @@ async def update_organization(
             organization_name=org_data.organization_name,
             new_email=org_data.email,
             new_password=org_data.password,
-            new_organization_name=org_data.new_organization_name
+            new_organization_name=org_data.new_organization_name,
+            expected_version=org_data.expected_version,
+            actor=current_admin["email"]
         )
         
         return OrganizationResponse(
@@ -114,7 +290,14 @@ async def update_organization(
             collection_name=result["collection_name"],
             admin_email=result["admin_email"],
             created_at=result["created_at"],
-            updated_at=result["updated_at"]
+            updated_at=result["updated_at"],
+            version=result["version"],
+            cluster=result["cluster"]
+        )
+    except ConcurrentUpdateError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
         )
     except ValueError as e:
         raise HTTPException(
@@ -135,7 +318,11 @@ async def delete_organization(
     organization_name: str = Query(..., description="Name of the organization to delete"),
     current_admin: dict = Depends(get_current_admin)
 ):
-    """Delete organization and its collection. Requires authentication."""
+    """
+    Delete organization. Requires authentication.
+    Returns once the organization is marked deleted; its collection is
+    reclaimed in the background.
+    """
     try:
         # Verify admin belongs to the organization being deleted
         if current_admin["organization_name"] != organization_name:
@@ -144,8 +331,13 @@ async def delete_organization(
                 detail="You can only delete your own organization"
             )
         
-        await OrganizationService.delete_organization(organization_name)
+        await OrganizationService.delete_organization(organization_name, actor=current_admin["email"])
         return {"message": f"Organization '{organization_name}' deleted successfully"}
+    except ConcurrentUpdateError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -159,3 +351,80 @@ async def delete_organization(
             detail=f"Failed to delete organization: {str(e)}"
         )
 
+
+
+async def _get_own_organization(organization_name: str, current_admin: dict) -> dict:
+    """Load an organization the current admin is allowed to manage."""
+    if current_admin["organization_name"] != organization_name:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only access your own organization"
+        )
+    
+    org = await OrganizationService.get_organization(organization_name)
+    if not org:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Organization '{organization_name}' not found"
+        )
+    return org
+
+
+@router.get("/{organization_name}/export")
+async def export_organization(
+    organization_name: str,
+    format: str = Query("bson", pattern="^(bson|ndjson)$", description="bson (raw, length-prefixed) or ndjson (gzip'd)"),
+    current_admin: dict = Depends(get_current_admin)
+):
+    """Stream the organization's collection. Requires authentication."""
+    org = await _get_own_organization(organization_name, current_admin)
+    media_type, extension = EXPORT_FORMATS[format]
+    
+    return StreamingResponse(
+        TenantTransferService.export_collection(org["collection_name"], format, org["cluster"], org["scheduling"]),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{org["collection_name"]}.{extension}"'
+        }
+    )
+
+
+@router.post("/{organization_name}/import")
+async def import_organization(
+    organization_name: str,
+    request: Request,
+    format: str = Query("bson", pattern="^(bson|ndjson)$", description="bson (raw, length-prefixed) or ndjson (gzip'd)"),
+    current_admin: dict = Depends(get_current_admin)
+):
+    """Load documents streamed in the request body into the organization's collection. Requires authentication."""
+    org = await _get_own_organization(organization_name, current_admin)
+    if org["move_fenced"]:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Organization '{organization_name}' is being moved to another cluster, retry shortly"
+        )
+    
+    try:
+        await OrganizationService.check_quota(org["organization_id"])
+        return await TenantTransferService.import_collection(
+            org["collection_name"],
+            request.stream(),
+            format,
+            org["cluster"],
+            org["scheduling"]
+        )
+    except QuotaExceededError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to import organization data: {str(e)}"
+        )
@@ -0,0 +1,61 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    Run a coroutine function on a fixed interval in the background.
+    Failures are logged and retried on the next tick so one bad run
+    cannot stop the loop. The interval may be a callable, read before
+    each sleep, so it can come from settings without loading them at import.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        interval_seconds: Union[float, Callable[[], float]],
+        func: Callable[[], Awaitable[None]]
+    ):
+        self.name = name
+        self._interval_seconds = interval_seconds
+        self.func = func
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def interval_seconds(self) -> float:
+        if callable(self._interval_seconds):
+            return self._interval_seconds()
+        return self._interval_seconds
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start the loop on the running event loop; no-op if already started."""
+        if not self.running:
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self):
+        """Cancel the loop and wait for it to finish."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.func()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Background task %s failed", self.name)
+            await asyncio.sleep(self.interval_seconds)
@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
-from typing import Optional
+from typing import Any, Dict, Optional
 
 
 class Settings(BaseSettings):
@@ -8,9 +8,139 @@ class Settings(BaseSettings):
     jwt_secret: str = Field(alias="JWT_SECRET")
     jwt_algorithm: str = Field(default="HS256", alias="JWT_ALGO")
     jwt_expire_minutes: int = Field(default=1440, alias="JWT_EXPIRE_MINUTES")
+    # "lookup" reads the admin on every authenticated request; "stateless" trusts the
+    # signed claims, checked against an in-memory map of revoked token versions
+    auth_mode: str = Field(default="lookup", alias="AUTH_MODE")
+    # Access tokens last this long in stateless mode (JWT_EXPIRE_MINUTES otherwise)
+    access_token_expire_minutes: int = Field(default=15, alias="ACCESS_TOKEN_EXPIRE_MINUTES")
+    refresh_token_expire_minutes: int = Field(default=10080, alias="REFRESH_TOKEN_EXPIRE_MINUTES")
+    # How often the revoked token versions are reloaded from master_db
+    token_revocation_refresh_seconds: float = Field(default=10.0, alias="TOKEN_REVOCATION_REFRESH_SECONDS")
+    
+    # Threads hashing and verifying passwords off the event loop
+    bcrypt_workers: int = Field(default=4, alias="BCRYPT_WORKERS")
     
     mongo_uri: str = Field(alias="MONGO_URI")
     master_db: str = Field(default="master_db", alias="MASTER_DB")
+    # Where read-only lookups (/org/get, searches, token checks) are served:
+    # primary, primaryPreferred, secondary, secondaryPreferred or nearest.
+    # Reads that must see the latest writes always use the primary.
+    read_preference: str = Field(default="primary", alias="READ_PREFERENCE")
+    # Skip secondaries lagging more than this; -1 for no limit, otherwise at least 90
+    read_max_staleness_seconds: int = Field(default=-1, alias="READ_MAX_STALENESS_SECONDS")
+    # Organizations and admins written by this instance are read from the primary for this long
+    read_your_writes_seconds: float = Field(default=120.0, alias="READ_YOUR_WRITES_SECONDS")
+    
+    # Storage behind OrganizationService and AuthService: "motor" (MongoDB) or
+    # "memory" (in-process, for tests and benchmarks; nothing is persisted)
+    repository_backend: str = Field(default="motor", alias="REPOSITORY_BACKEND")
+    
+    # Extra clusters for tenant data as a JSON object of name -> URI; MONGO_URI is always "default"
+    tenant_clusters: Dict[str, str] = Field(default_factory=dict, alias="TENANT_CLUSTERS")
+    # Where new tenants go: "least_loaded" (by data size from the stats refresh) or "pinned"
+    tenant_placement_policy: str = Field(default="least_loaded", alias="TENANT_PLACEMENT_POLICY")
+    tenant_pinned_cluster: str = Field(default="default", alias="TENANT_PINNED_CLUSTER")
+    # Batches of tenant collection work (imports, exports, move copies) run at once in
+    # total, and per tenant unless its organization document overrides it; 0 disables
+    # the scheduler. Keep the total below the pool size so metadata reads always get through.
+    tenant_db_concurrency: int = Field(default=32, alias="TENANT_DB_CONCURRENCY")
+    tenant_max_db_concurrency: int = Field(default=4, alias="TENANT_MAX_DB_CONCURRENCY")
+    # Seconds a tenant move waits after fencing imports for in-flight writes to land
+    tenant_move_fence_seconds: float = Field(default=5.0, alias="TENANT_MOVE_FENCE_SECONDS")
+    
+    # Shared secret for fleet-wide operator endpoints (X-Ops-Key header); unset disables them
+    ops_api_key: Optional[str] = Field(default=None, alias="OPS_API_KEY")
+    
+    # Tenant usage statistics
+    stats_refresh_seconds: int = Field(default=300, alias="STATS_REFRESH_SECONDS")
+    stats_concurrency: int = Field(default=8, alias="STATS_CONCURRENCY")
+    # Tenants exported as per-organization gauges, largest data size first; the fleet totals cover the rest
+    stats_metrics_top_tenants: int = Field(default=100, alias="STATS_METRICS_TOP_TENANTS")
+    # Per-tenant quotas enforced from cached stats; 0 disables the limit
+    tenant_max_documents: int = Field(default=0, alias="TENANT_MAX_DOCUMENTS")
+    tenant_max_data_bytes: int = Field(default=0, alias="TENANT_MAX_DATA_BYTES")
+    
+    # Deleted organizations are tombstoned, then reclaimed in the background
+    reaper_interval_seconds: float = Field(default=30.0, alias="REAPER_INTERVAL_SECONDS")
+    # Tenant collections dropped per second at most, and per reaper run
+    reaper_drops_per_second: float = Field(default=2.0, alias="REAPER_DROPS_PER_SECOND")
+    reaper_batch_size: int = Field(default=100, alias="REAPER_BATCH_SIZE")
+    # Organizations tombstoned at once by a bulk deprovision
+    deprovision_concurrency: int = Field(default=8, alias="DEPROVISION_CONCURRENCY")
+    
+    # Indexes, validator and collation of tenant collections, as a JSON object with a
+    # "version" to bump on every change; see app/services/template_service.py
+    tenant_template: Dict[str, Any] = Field(default_factory=lambda: {"version": 0}, alias="TENANT_TEMPLATE")
+    template_reconcile_seconds: float = Field(default=300.0, alias="TEMPLATE_RECONCILE_SECONDS")
+    template_reconcile_batch_size: int = Field(default=100, alias="TEMPLATE_RECONCILE_BATCH_SIZE")
+    # Tenant collections the reconciler changes at once
+    template_reconcile_concurrency: int = Field(default=4, alias="TEMPLATE_RECONCILE_CONCURRENCY")
+    
+    # Batches of records the consistency check verifies at once
+    consistency_check_concurrency: int = Field(default=8, alias="CONSISTENCY_CHECK_CONCURRENCY")
+    
+    # Write-behind audit log
+    audit_queue_size: int = Field(default=10000, alias="AUDIT_QUEUE_SIZE")
+    audit_batch_size: int = Field(default=500, alias="AUDIT_BATCH_SIZE")
+    audit_flush_seconds: float = Field(default=1.0, alias="AUDIT_FLUSH_SECONDS")
+    audit_overflow: str = Field(default="drop", alias="AUDIT_OVERFLOW")  # "drop" or "block"
+    
+    # Cache-Control sent with organization reads; "no-cache" lets caches store but revalidate by ETag
+    org_cache_control: str = Field(default="no-cache", alias="ORG_CACHE_CONTROL")
+    # Organization ETags held in memory for answering If-None-Match without a read
+    etag_cache_size: int = Field(default=10000, alias="ETAG_CACHE_SIZE")
+    
+    # Organization change events (GET /org/events); EVENTS_SOURCE is auto, change_stream or local
+    events_source: str = Field(default="auto", alias="EVENTS_SOURCE")
+    events_subscriber_buffer: int = Field(default=256, alias="EVENTS_SUBSCRIBER_BUFFER")
+    events_history_size: int = Field(default=1000, alias="EVENTS_HISTORY_SIZE")
+    events_max_subscribers: int = Field(default=1000, alias="EVENTS_MAX_SUBSCRIBERS")
+    events_keepalive_seconds: float = Field(default=15.0, alias="EVENTS_KEEPALIVE_SECONDS")
+    
+    # Load shedding: concurrency limit, wait-queue size and queue deadline per route class
+    load_shedding_enabled: bool = Field(default=True, alias="LOAD_SHEDDING_ENABLED")
+    shed_auth_hashing_limit: int = Field(default=8, alias="SHED_AUTH_HASHING_LIMIT")
+    shed_auth_hashing_queue: int = Field(default=64, alias="SHED_AUTH_HASHING_QUEUE")
+    shed_auth_hashing_deadline_ms: int = Field(default=2000, alias="SHED_AUTH_HASHING_DEADLINE_MS")
+    shed_migration_limit: int = Field(default=4, alias="SHED_MIGRATION_LIMIT")
+    shed_migration_queue: int = Field(default=16, alias="SHED_MIGRATION_QUEUE")
+    shed_migration_deadline_ms: int = Field(default=5000, alias="SHED_MIGRATION_DEADLINE_MS")
+    shed_transfer_limit: int = Field(default=4, alias="SHED_TRANSFER_LIMIT")
+    shed_transfer_queue: int = Field(default=8, alias="SHED_TRANSFER_QUEUE")
+    shed_transfer_deadline_ms: int = Field(default=2000, alias="SHED_TRANSFER_DEADLINE_MS")
+    shed_read_limit: int = Field(default=200, alias="SHED_READ_LIMIT")
+    shed_read_queue: int = Field(default=1000, alias="SHED_READ_QUEUE")
+    shed_read_deadline_ms: int = Field(default=500, alias="SHED_READ_DEADLINE_MS")
+    shed_default_limit: int = Field(default=100, alias="SHED_DEFAULT_LIMIT")
+    shed_default_queue: int = Field(default=500, alias="SHED_DEFAULT_QUEUE")
+    shed_default_deadline_ms: int = Field(default=1000, alias="SHED_DEFAULT_DEADLINE_MS")
+    
+    # Readiness probe: check interval and the limits beyond which the instance reports not ready
+    health_refresh_seconds: float = Field(default=5.0, alias="HEALTH_REFRESH_SECONDS")
+    health_ping_timeout_ms: int = Field(default=2000, alias="HEALTH_PING_TIMEOUT_MS")
+    ready_max_pool_saturation: float = Field(default=0.95, alias="READY_MAX_POOL_SATURATION")
+    ready_max_bcrypt_backlog: int = Field(default=64, alias="READY_MAX_BCRYPT_BACKLOG")
+    ready_max_loop_lag_ms: float = Field(default=250.0, alias="READY_MAX_LOOP_LAG_MS")
+    
+    # Request profiling; the middleware is not installed at all unless enabled
+    profiling_enabled: bool = Field(default=False, alias="PROFILING_ENABLED")
+    profiling_sample_rate: float = Field(default=0.0, alias="PROFILING_SAMPLE_RATE")
+    profiling_interval_ms: float = Field(default=5.0, alias="PROFILING_INTERVAL_MS")
+    profiling_buffer_size: int = Field(default=50, alias="PROFILING_BUFFER_SIZE")
+    
+    # Tracing: head-sampled spans exported in batches; TRACING_EXPORTER is none, file, or module:Class
+    tracing_enabled: bool = Field(default=False, alias="TRACING_ENABLED")
+    tracing_sample_rate: float = Field(default=0.01, alias="TRACING_SAMPLE_RATE")
+    tracing_exporter: str = Field(default="file", alias="TRACING_EXPORTER")
+    tracing_file_path: str = Field(default="traces.jsonl", alias="TRACING_FILE_PATH")
+    tracing_buffer_size: int = Field(default=10000, alias="TRACING_BUFFER_SIZE")
+    tracing_flush_seconds: float = Field(default=2.0, alias="TRACING_FLUSH_SECONDS")
+    
+    # Event-loop lag monitor; stalls longer than the threshold are recorded with the blocking stack
+    loop_monitor_enabled: bool = Field(default=True, alias="LOOP_MONITOR_ENABLED")
+    loop_monitor_interval_ms: float = Field(default=100.0, alias="LOOP_MONITOR_INTERVAL_MS")
+    loop_stall_threshold_ms: float = Field(default=200.0, alias="LOOP_STALL_THRESHOLD_MS")
+    loop_monitor_offenders: int = Field(default=50, alias="LOOP_MONITOR_OFFENDERS")
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -20,5 +150,34 @@ class Settings(BaseSettings):
     )
 
 
-settings = Settings()
+_settings: Optional[Settings] = None
+
+
+def get_settings() -> Settings:
+    """Load settings from the environment on first use; later calls return the same object."""
+    global _settings
+    if _settings is None:
+        _settings = Settings()
+    return _settings
+
+
+class _LazySettings:
+    """
+    Stand-in for the Settings instance that loads it on first attribute access.
+
+    Importing a module that reads settings therefore does not parse the
+    environment (or fail on a missing JWT_SECRET) until a value is needed.
+    """
+
+    def __getattr__(self, name: str):
+        return getattr(get_settings(), name)
+
+    def __setattr__(self, name: str, value):
+        setattr(get_settings(), name, value)
+
+    def __delattr__(self, name: str):
+        delattr(get_settings(), name)
+
+
+settings = _LazySettings()
 
@@ -1,38 +1,303 @@
-from motor.motor_asyncio import AsyncIOMotorClient
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from pymongo import monitoring
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
 from app.core.config import settings
-from typing import Optional
+from app.core.metrics import registry
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """
+    Track checked-out connections per server from one client's pool events.
+    Events arrive on pymongo's threads, so the counts are read with counts().
+    """
+
+    def __init__(self):
+        self.checked_out: Dict[tuple, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def counts(self) -> List[int]:
+        """Checked-out connections of each pool, copied under the lock."""
+        with self._lock:
+            return list(self.checked_out.values())
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checked_out[event.address] += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out[event.address] -= 1
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.checked_out[event.address] = 0
+
+    def pool_closed(self, event):
+        with self._lock:
+            self.checked_out.pop(event.address, None)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        pass
+
+
+# One monitor per cluster, so each client's pools are measured against its own maxPoolSize
+pool_monitors: Dict[str, PoolMonitor] = defaultdict(PoolMonitor)
+
+reads_served = registry.counter(
+    "mongo_reads_total", "Read commands sent to MongoDB, by the type of server that served them", ["server"]
+)
+
+# Commands that only read; writes always go to the primary
+READ_COMMANDS = frozenset({"find", "getMore", "aggregate", "count", "distinct"})
+
+
+class ReadRoutingMonitor(monitoring.CommandListener, monitoring.ServerListener):
+    """
+    Count read commands by the type of server (primary, secondary, ...) they were sent to.
+    Called on pymongo's threads: server_types only sees single get/set/pop
+    calls, which are atomic, and the counter takes its own lock.
+    """
+
+    def __init__(self):
+        self.server_types: Dict[tuple, str] = {}
+
+    def description_changed(self, event):
+        self.server_types[event.server_address] = event.new_description.server_type_name
+
+    def closed(self, event):
+        self.server_types.pop(event.server_address, None)
+
+    def opened(self, event):
+        pass
+
+    def started(self, event):
+        if event.command_name in READ_COMMANDS:
+            reads_served.inc(server=self.server_types.get(event.connection_id, "Unknown"))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+read_routing_monitor = ReadRoutingMonitor()
+
+
+def _event_listeners(cluster: str) -> list:
+    """Driver listeners attached to the client of a cluster."""
+    listeners = [pool_monitors[cluster]]
+    # Command monitoring has a cost per command; with every read on the
+    # primary there is nothing to report
+    if settings.read_preference != "primary":
+        listeners.append(read_routing_monitor)
+    if settings.tracing_enabled:
+        from app.core.tracing import command_tracer
+        listeners.append(command_tracer)
+    return listeners
+
+
+# Name of the MONGO_URI cluster, which also holds the master metadata
+DEFAULT_CLUSTER = "default"
+
+
+# Read routes: PRIMARY for reads that must see the latest writes, STALE_OK for
+# read-only lookups that may be served per READ_PREFERENCE
+PRIMARY = "primary"
+STALE_OK = "stale_ok"
+
+READ_PREFERENCES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest
+}
+
+
+def stale_ok_read_preference():
+    """The read preference of STALE_OK reads, from READ_PREFERENCE and READ_MAX_STALENESS_SECONDS."""
+    mode = READ_PREFERENCES.get(settings.read_preference)
+    if mode is None:
+        raise ValueError(f"Unknown read preference '{settings.read_preference}'")
+    if mode is Primary:
+        return Primary()
+    return mode(max_staleness=settings.read_max_staleness_seconds)
+
+
+class RecentWrites:
+    """
+    Keys (organization names, admin ids) written by this instance recently.
+    Reads of them stay on the primary for read_your_writes_seconds, so a
+    client sees its own writes while other reads go to secondaries.
+    """
+
+    def __init__(self, max_size: int = 100000):
+        self.max_size = max_size
+        self._written: OrderedDict = OrderedDict()
+
+    def mark(self, *keys: Optional[str]):
+        if settings.read_preference == "primary":
+            return
+        now = time.monotonic()
+        for key in keys:
+            if key is None:
+                continue
+            self._written[key] = now
+            self._written.move_to_end(key)
+        while len(self._written) > self.max_size:
+            self._written.popitem(last=False)
+
+    def route(self, key: str) -> str:
+        """PRIMARY if key was written within the window, otherwise STALE_OK."""
+        written_at = self._written.get(key)
+        if written_at is None:
+            return STALE_OK
+        if time.monotonic() - written_at < settings.read_your_writes_seconds:
+            return PRIMARY
+        del self._written[key]
+        return STALE_OK
+
+
+recent_writes = RecentWrites()
+
+
+def serves_latest(read: str) -> bool:
+    """Whether reads routed as read are guaranteed to see the latest writes."""
+    return read == PRIMARY or settings.read_preference == "primary"
+
 
 class Database:
-    client: Optional[AsyncIOMotorClient] = None
+    client: Optional["AsyncIOMotorClient"] = None
+    # The master database with the STALE_OK read preference
+    stale_ok_master_db = None
+    # Tenant cluster clients other than the default, created on first use
+    cluster_clients: Dict[str, "AsyncIOMotorClient"] = {}
 
 db = Database()
 
 
+def cluster_names() -> list:
+    """Every cluster tenants can be placed on, default first."""
+    return [DEFAULT_CLUSTER] + [name for name in settings.tenant_clusters if name != DEFAULT_CLUSTER]
+
+
+def _new_client(uri: str, cluster: str) -> "AsyncIOMotorClient":
+    # Motor is imported on the first connection rather than with the app
+    from motor.motor_asyncio import AsyncIOMotorClient
+    return AsyncIOMotorClient(uri, event_listeners=_event_listeners(cluster))
+
+
 async def get_database():
     """Get database connection."""
     if db.client is None:
-        db.client = AsyncIOMotorClient(settings.mongo_uri)
+        db.client = _new_client(settings.mongo_uri, DEFAULT_CLUSTER)
     return db.client
 
 
-async def get_master_db():
-    """Get master database instance."""
+async def get_cluster_client(cluster: Optional[str] = None):
+    """
+    Get the client for a tenant cluster.
+    Each cluster gets one client, and with it one connection pool per
+    server, shared by every tenant placed there.
+    """
+    if not cluster or cluster == DEFAULT_CLUSTER:
+        return await get_database()
+    client = db.cluster_clients.get(cluster)
+    if client is None:
+        if cluster not in settings.tenant_clusters:
+            raise ValueError(f"Unknown cluster '{cluster}'")
+        client = _new_client(settings.tenant_clusters[cluster], cluster)
+        db.cluster_clients[cluster] = client
+    return client
+
+
+def open_clients() -> Dict[str, "AsyncIOMotorClient"]:
+    """The clients created so far, by cluster name."""
+    clients = {DEFAULT_CLUSTER: db.client} if db.client else {}
+    clients.update(db.cluster_clients)
+    return clients
+
+
+async def get_tenant_db(cluster: Optional[str] = None):
+    """Get the database holding tenant collections on a cluster."""
+    client = await get_cluster_client(cluster)
+    return client[settings.master_db]
+
+
+async def get_master_db(read: str = PRIMARY):
+    """
+    Get master database instance. Reads go to the primary unless read is
+    STALE_OK, when they follow READ_PREFERENCE and may lag the primary by
+    up to READ_MAX_STALENESS_SECONDS.
+    """
     database = await get_database()
+    if read == STALE_OK and settings.read_preference != "primary":
+        if db.stale_ok_master_db is None:
+            db.stale_ok_master_db = database.get_database(
+                settings.master_db, read_preference=stale_ok_read_preference()
+            )
+        return db.stale_ok_master_db
     return database[settings.master_db]
 
 
-async def get_org_collection(organization_name: str):
-    """Get organization-specific collection."""
-    from app.utils.naming import slugify_org_name
-    database = await get_database()
-    collection_name = slugify_org_name(organization_name)
-    # Collections are stored in master_db but dynamically named per organization
-    master_db = database[settings.master_db]
-    return master_db[collection_name]
+async def get_org_collection(collection_name: str, cluster: Optional[str] = None):
+    """Get organization-specific collection by the name and cluster stored on its organization."""
+    # Collections are stored in a database named like master_db on the
+    # tenant's cluster, and dynamically named per organization
+    tenant_db = await get_tenant_db(cluster)
+    return tenant_db[collection_name]
+
+
+async def ensure_indexes():
+    """Create the indexes the master collections rely on for uniqueness."""
+    master_db = await get_master_db()
+    await master_db.organizations.create_index("organization_name", unique=True)
+    # Prefix search range-scans name_normalized; _id breaks ties for paging
+    await master_db.organizations.create_index([("name_normalized", 1), ("_id", 1)])
+    await master_db.organizations.create_index("name_trigrams")
+    # Lets the consistency check map tenant collections back to their owners
+    await master_db.organizations.create_index("collection_name")
+    # Only deleted organizations carry deleted_at, so the reaper's scan stays small
+    await master_db.organizations.create_index("deleted_at", sparse=True)
+    # Lets the template reconciler find tenants below the current version
+    await master_db.organizations.create_index("template_version")
+    await master_db.admin_users.create_index("email", unique=True)
+    # Revocations are only needed until the tokens they revoke have expired
+    await master_db.token_revocations.create_index("expires_at", expireAfterSeconds=0)
+    await master_db.audit_log.create_index([("organization_name", 1), ("_id", -1)])
 
 
 async def close_database():
     """Close database connection."""
     if db.client:
         db.client.close()
+    db.stale_ok_master_db = None
+    for client in db.cluster_clients.values():
+        client.close()
+    db.cluster_clients.clear()
 
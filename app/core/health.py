@@ -0,0 +1,115 @@
+"""
+Cached dependency checks behind the readiness probe.
+
+A background task refreshes the checks every health_refresh_seconds, so
+probes only read the last result and never touch MongoDB themselves.
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Optional
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.database import get_database, open_clients, pool_monitors
+from app.core.metrics import registry
+from app.core.loop_monitor import loop_monitor
+from app.core.security import hashing_backlog
+
+mongo_ping_seconds = registry.gauge("org_mongo_ping_seconds", "Latency of the last MongoDB ping")
+pool_checked_out = registry.gauge("org_mongo_pool_checked_out", "Connections checked out across all pools")
+pool_saturation_ratio = registry.gauge("org_mongo_pool_saturation", "Busiest pool's checked-out connections / maxPoolSize")
+bcrypt_backlog = registry.gauge("org_bcrypt_backlog", "Password hash/verify calls queued or running")
+ready_gauge = registry.gauge("org_ready", "1 when the readiness probe passes")
+
+
+class HealthMonitor:
+    """Periodically checks dependencies and caches the readiness verdict."""
+
+    def __init__(self):
+        self.last_result: Optional[dict] = None
+        self._checked_at = 0.0
+
+    async def _ping_mongo(self) -> dict:
+        client = await get_database()
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(
+                client.admin.command("ping"),
+                settings.health_ping_timeout_ms / 1000
+            )
+        except Exception as e:
+            return {"ok": False, "error": str(e) or type(e).__name__}
+        latency = time.perf_counter() - started
+        mongo_ping_seconds.set(latency)
+        return {"ok": True, "latency_ms": round(latency * 1000, 2)}
+
+    def _pool_status(self, clients: dict) -> dict:
+        """Saturation of each cluster's busiest pool against its own client's maxPoolSize."""
+        clusters = {}
+        checked_out = 0
+        for name, client in clients.items():
+            counts = pool_monitors[name].counts()
+            max_pool_size = client.options.pool_options.max_pool_size
+            busiest = max(counts, default=0)
+            saturation = busiest / max_pool_size if max_pool_size else 0.0
+            checked_out += sum(counts)
+            clusters[name] = {"checked_out": busiest, "max_pool_size": max_pool_size, "saturation": round(saturation, 3)}
+        pool_checked_out.set(checked_out)
+        busiest_cluster = max(clusters.values(), key=lambda pool: pool["saturation"], default=None)
+        pool = dict(busiest_cluster or {"checked_out": 0, "max_pool_size": 0, "saturation": 0.0}, clusters=clusters)
+        pool_saturation_ratio.set(pool["saturation"])
+        return pool
+
+    async def _loop_lag(self) -> float:
+        """Recent worst lag from the loop monitor, else a one-off scheduling delay sample."""
+        recent = loop_monitor.recent_max_lag(settings.health_refresh_seconds) if loop_monitor.running else None
+        if recent is not None:
+            return recent
+        started = time.perf_counter()
+        await asyncio.sleep(0)
+        return time.perf_counter() - started
+
+    async def refresh(self):
+        """Run every check and store the combined result."""
+        await get_database()
+
+        mongo = await self._ping_mongo()
+        pool = self._pool_status(open_clients())
+        backlog = hashing_backlog()
+        lag = await self._loop_lag()
+        bcrypt_backlog.set(backlog)
+
+        problems = []
+        if not mongo["ok"]:
+            problems.append("mongo_unreachable")
+        if pool["saturation"] >= settings.ready_max_pool_saturation:
+            problems.append("mongo_pool_saturated")
+        if backlog > settings.ready_max_bcrypt_backlog:
+            problems.append("bcrypt_backlog")
+        if lag * 1000 > settings.ready_max_loop_lag_ms:
+            problems.append("event_loop_lag")
+
+        self.last_result = {
+            "status": "ready" if not problems else "not_ready",
+            "problems": problems,
+            "checked_at": datetime.utcnow(),
+            "mongo": mongo,
+            "pool": pool,
+            "bcrypt_backlog": backlog,
+            "event_loop_lag_ms": round(lag * 1000, 2)
+        }
+        self._checked_at = time.monotonic()
+        ready_gauge.set(0 if problems else 1)
+
+    def readiness(self) -> dict:
+        """Return the cached result, treating a missing or stale one as not ready."""
+        if self.last_result is None:
+            return {"status": "not_ready", "problems": ["not_checked_yet"]}
+        age = time.monotonic() - self._checked_at
+        if age > settings.health_refresh_seconds * 3:
+            return dict(self.last_result, status="not_ready", problems=self.last_result["problems"] + ["stale"])
+        return self.last_result
+
+
+health_monitor = HealthMonitor()
+health_refresher = PeriodicTask("health-refresher", lambda: settings.health_refresh_seconds, health_monitor.refresh)
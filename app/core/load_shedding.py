@@ -0,0 +1,179 @@
+"""
+Load shedding for overload protection.
+
+Each request is assigned a route class with its own concurrency limit,
+bounded wait queue and queue-time deadline. A request that cannot start
+before its deadline, or finds the queue already full, is rejected with 503
+straight away instead of adding latency for everyone else.
+"""
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple
+from app.core.config import settings
+from app.core.metrics import registry
+
+AUTH_HASHING = "auth_hashing"
+TENANT_MIGRATION = "tenant_migration"
+BULK_TRANSFER = "bulk_transfer"
+METADATA_READ = "metadata_read"
+DEFAULT = "default"
+
+# Requests on these paths are never queued or shed
+EXEMPT_PATHS = ("/health", "/metrics")
+# Event streams stay open indefinitely and are capped by EVENTS_MAX_SUBSCRIBERS instead
+STREAMING_PATHS = ("/org/events",)
+
+inflight = registry.gauge("org_load_inflight_requests", "Requests currently running", ["route_class"])
+queue_depth = registry.gauge("org_load_queue_depth", "Requests waiting for a slot", ["route_class"])
+shed_total = registry.counter("org_load_shed_total", "Requests rejected with 503", ["route_class", "reason"])
+queue_wait = registry.histogram(
+    "org_load_queue_wait_seconds", "Time requests waited for a slot", ["route_class"]
+)
+
+
+def classify_request(method: str, path: str) -> Optional[str]:
+    """Map a request to its route class, or None if it is exempt."""
+    if path.startswith(EXEMPT_PATHS) or path in STREAMING_PATHS:
+        return None
+    if (method, path) in (("POST", "/admin/login"), ("POST", "/org/create")):
+        return AUTH_HASHING
+    if path.startswith("/org/"):
+        # Transfers hold their slot for the whole body, so they get their own
+        # class rather than starving updates and deletes
+        if path.endswith(("/export", "/import")):
+            return BULK_TRANSFER
+        if method in ("PUT", "DELETE"):
+            return TENANT_MIGRATION
+        if method == "GET":
+            return METADATA_READ
+    return DEFAULT
+
+
+class ShedError(Exception):
+    """Raised when a request cannot get a slot."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class ConcurrencyLimiter:
+    """Concurrency limit with a bounded FIFO wait queue and a wait deadline."""
+
+    def __init__(self, name: str, limit: int, max_queue: int, deadline_seconds: float):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.deadline_seconds = deadline_seconds
+        self.active = 0
+        self._waiters: deque = deque()
+
+    async def acquire(self):
+        """Take a slot, waiting in the queue until the deadline if needed."""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            inflight.set(self.active, route_class=self.name)
+            return
+        if len(self._waiters) >= self.max_queue:
+            shed_total.inc(route_class=self.name, reason="queue_full")
+            raise ShedError("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        queue_depth.set(len(self._waiters), route_class=self.name)
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.deadline_seconds)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the deadline hit; keep it
+                return
+            waiter.cancel()
+            shed_total.inc(route_class=self.name, reason="deadline")
+            raise ShedError("deadline")
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                waiter.cancel()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            queue_depth.set(len(self._waiters), route_class=self.name)
+            queue_wait.observe(time.monotonic() - started, route_class=self.name)
+
+    def release(self):
+        """Free a slot, handing it directly to the oldest live waiter."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                queue_depth.set(len(self._waiters), route_class=self.name)
+                return
+        self.active -= 1
+        inflight.set(self.active, route_class=self.name)
+
+
+def build_limiters() -> Dict[str, ConcurrencyLimiter]:
+    """Create one limiter per route class from settings."""
+    configs: Dict[str, Tuple[int, int, int]] = {
+        AUTH_HASHING: (settings.shed_auth_hashing_limit, settings.shed_auth_hashing_queue, settings.shed_auth_hashing_deadline_ms),
+        TENANT_MIGRATION: (settings.shed_migration_limit, settings.shed_migration_queue, settings.shed_migration_deadline_ms),
+        BULK_TRANSFER: (settings.shed_transfer_limit, settings.shed_transfer_queue, settings.shed_transfer_deadline_ms),
+        METADATA_READ: (settings.shed_read_limit, settings.shed_read_queue, settings.shed_read_deadline_ms),
+        DEFAULT: (settings.shed_default_limit, settings.shed_default_queue, settings.shed_default_deadline_ms),
+    }
+    return {
+        name: ConcurrencyLimiter(name, limit, max_queue, deadline_ms / 1000)
+        for name, (limit, max_queue, deadline_ms) in configs.items()
+    }
+
+
+class LoadSheddingMiddleware:
+    """ASGI middleware applying per-route-class concurrency limits."""
+
+    def __init__(self, app):
+        self.app = app
+        self.limiters = build_limiters()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route_class = classify_request(scope["method"], scope["path"])
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiters[route_class]
+        try:
+            await limiter.acquire()
+        except ShedError as e:
+            await self._reject(send, route_class, e.reason)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+    async def _reject(self, send, route_class: str, reason: str):
+        body = json.dumps({
+            "detail": "Service overloaded, please retry shortly",
+            "route_class": route_class,
+            "reason": reason
+        }).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("ascii")),
+                (b"retry-after", b"1"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,139 @@
+"""
+Event-loop lag monitor and blocking-call detector.
+
+A task on the loop sleeps for a fixed interval and records how late it
+wakes up; that overshoot is the loop lag. Each tick also refreshes a
+heartbeat. A watchdog thread checks the heartbeat, and when the loop has
+not ticked for longer than the stall threshold it captures the loop
+thread's stack, which is the code blocking the loop at that moment.
+"""
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Optional
+from app.core.config import settings
+from app.core.metrics import registry
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+loop_lag = registry.histogram("org_event_loop_lag_seconds", "Event-loop wake-up delay per monitor tick", buckets=LAG_BUCKETS)
+loop_stalls = registry.counter("org_event_loop_stalls_total", "Times the loop was blocked beyond the stall threshold")
+loop_max_lag = registry.gauge("org_event_loop_recent_max_lag_seconds", "Largest lag within the recent window")
+
+
+class LoopMonitor:
+    """Measures loop lag and records the stacks of calls that blocked it."""
+
+    def __init__(self):
+        self._offenders: Optional[deque] = None
+        self._recent_lags: deque = deque(maxlen=600)
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._current_stall: Optional[dict] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def offenders(self) -> deque:
+        if self._offenders is None:
+            self._offenders = deque(maxlen=settings.loop_monitor_offenders)
+        return self._offenders
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start the lag task on the running loop and the watchdog thread."""
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._run(), name="loop-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            # The watchdog can be mid-sample; wait for it off the loop
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+    async def _run(self):
+        interval = settings.loop_monitor_interval_ms / 1000
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            lag = max(0.0, loop.time() - expected)
+            self._heartbeat = time.monotonic()
+            self._recent_lags.append(lag)
+            loop_lag.observe(lag)
+            loop_max_lag.set(max(self._recent_lags))
+
+            stall = self._current_stall
+            if stall is not None:
+                # The loop is running again; record how long the stall lasted
+                stall["blocked_ms"] = round(lag * 1000, 1)
+                self._current_stall = None
+
+    def _watch(self):
+        threshold = settings.loop_stall_threshold_ms / 1000
+        interval = settings.loop_monitor_interval_ms / 1000
+        while not self._stop.wait(min(threshold, interval) / 2):
+            stalled_for = time.monotonic() - self._heartbeat - interval
+            if stalled_for < threshold or self._current_stall is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.format_stack(frame)
+            stall = {
+                "detected_at": datetime.utcnow(),
+                "blocked_ms": round(stalled_for * 1000, 1),
+                "location": stack[-1].strip().splitlines()[0] if stack else "",
+                "stack": [line.rstrip() for line in stack]
+            }
+            self._current_stall = stall
+            self.offenders.append(stall)
+            loop_stalls.inc()
+
+    def recent_max_lag(self, window_seconds: float) -> Optional[float]:
+        """Largest lag over roughly the last window_seconds, or None before the first tick."""
+        if not self._recent_lags:
+            return None
+        ticks = max(1, int(window_seconds * 1000 / settings.loop_monitor_interval_ms))
+        return max(list(self._recent_lags)[-ticks:])
+
+    def summary(self) -> dict:
+        lags = sorted(self._recent_lags)
+
+        def percentile(p: float) -> Optional[float]:
+            if not lags:
+                return None
+            return round(lags[min(len(lags) - 1, int(p * len(lags)))] * 1000, 2)
+
+        return {
+            "running": self.running,
+            "samples": len(lags),
+            "lag_ms": {"p50": percentile(0.5), "p99": percentile(0.99), "max": percentile(1.0)},
+            "stall_threshold_ms": settings.loop_stall_threshold_ms,
+            "offenders": list(reversed(self.offenders))
+        }
+
+
+loop_monitor = LoopMonitor()
@@ -0,0 +1,188 @@
+"""
+Opt-in per-request statistical profiling.
+
+When a request is selected (operator header or random sampling), a sampler
+thread records the stacks of every busy thread at a fixed interval until
+the response finishes. The event-loop thread shows route and service
+frames, driver executor threads show MongoDB calls, and bcrypt pool
+threads show hashing. Profiles are kept in a bounded ring buffer and
+served in collapsed-stack format for flamegraph tools.
+
+The middleware is only installed when PROFILING_ENABLED is set, so it
+costs nothing when off.
+"""
+import asyncio
+import itertools
+import os
+import random
+import secrets
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from typing import List, Optional
+from app.core.config import settings
+
+PROFILE_HEADER = b"x-profile"
+OPS_KEY_HEADER = b"x-ops-key"
+# Leaf frames of worker threads that are parked waiting for work
+IDLE_LEAVES = {("threading.py", "wait"), ("queue.py", "get"), ("thread.py", "_worker")}
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{getattr(code, 'co_qualname', code.co_name)} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def _thread_group(name: str) -> str:
+    """Collapse numbered pool threads (bcrypt_0, ThreadPoolExecutor-0_3) into one group."""
+    return name.rstrip("0123456789_-") or name
+
+
+class StackSampler:
+    """Background thread sampling all other threads' stacks until stopped."""
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    async def stop(self):
+        """Stop sampling; the join runs in a worker thread so the loop keeps serving."""
+        self._stop.set()
+        await asyncio.to_thread(self._thread.join)
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval_seconds):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                leaf = (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name)
+                if leaf in IDLE_LEAVES and thread_id != threading.main_thread().ident:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                labels.append(_thread_group(names.get(thread_id, str(thread_id))))
+                self.stacks[";".join(reversed(labels))] += 1
+            self.samples += 1
+
+
+class ProfileStore:
+    """Ring buffer of the most recent request profiles."""
+
+    def __init__(self, size: Optional[int] = None):
+        # None: profiling_buffer_size, read when first needed
+        self._size = size
+        self._buffer: Optional[deque] = None
+        self._ids = itertools.count(1)
+
+    @property
+    def _profiles(self) -> deque:
+        if self._buffer is None:
+            self._buffer = deque(maxlen=self._size if self._size is not None else settings.profiling_buffer_size)
+        return self._buffer
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def add(
+        self,
+        profile_id: int,
+        method: str,
+        path: str,
+        status_code: Optional[int],
+        duration: float,
+        sampler: StackSampler
+    ) -> dict:
+        profile = {
+            "id": profile_id,
+            "method": method,
+            "path": path,
+            "status_code": status_code,
+            "started_at": datetime.utcnow(),
+            "duration_ms": round(duration * 1000, 2),
+            "samples": sampler.samples,
+            "stacks": sampler.stacks
+        }
+        self._profiles.append(profile)
+        return profile
+
+    def list(self) -> List[dict]:
+        """Profile summaries, newest first, without the stacks."""
+        return [
+            {key: value for key, value in profile.items() if key != "stacks"}
+            for profile in reversed(self._profiles)
+        ]
+
+    def get(self, profile_id: int) -> Optional[dict]:
+        return next((profile for profile in self._profiles if profile["id"] == profile_id), None)
+
+    @staticmethod
+    def collapsed(profile: dict) -> str:
+        """Render a profile as `frame;frame;frame count` lines."""
+        return "".join(f"{stack} {count}\n" for stack, count in profile["stacks"].most_common())
+
+
+profile_store = ProfileStore()
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling selected requests.
+
+    A request is profiled when it sends `X-Profile: 1` together with a valid
+    operator key, or when it is picked by PROFILING_SAMPLE_RATE. Only one
+    request is profiled at a time, since a sampler sees the whole process
+    and overlapping profiles would double-count each other's work.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._busy = threading.Lock()
+
+    def _selected(self, scope) -> bool:
+        headers = dict(scope.get("headers") or [])
+        if headers.get(PROFILE_HEADER) == b"1" and settings.ops_api_key:
+            if secrets.compare_digest(headers.get(OPS_KEY_HEADER, b""), settings.ops_api_key.encode("utf-8")):
+                return True
+        return settings.profiling_sample_rate > 0 and random.random() < settings.profiling_sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._selected(scope) or not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        status_code = None
+        profile_id = profile_store.next_id()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Tell the caller where to download the profile
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", str(profile_id).encode("ascii"))
+                ]
+            await send(message)
+
+        sampler = StackSampler(settings.profiling_interval_ms / 1000)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            try:
+                await sampler.stop()
+            finally:
+                self._busy.release()
+            profile_store.add(profile_id, scope["method"], scope["path"], status_code, time.perf_counter() - started, sampler)
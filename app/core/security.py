@@ -1,11 +1,18 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
-import bcrypt
 import hashlib
-import sys
-import traceback
+import logging
 from app.core.config import settings
+from app.core.tracing import traced
+
+# bcrypt and jose (which loads the cryptography backend) are imported where
+# they are used, so importing the app does not pay for them before the
+# first login or token check.
+# Diagnostics go through logging (debug level) rather than synchronous
+# stderr prints, which stalled the event loop on every hash.
+logger = logging.getLogger(__name__)
 
 
 def hash_password(password: str) -> str:
@@ -27,20 +34,19 @@ def hash_password(password: str) -> str:
     Raises:
         ValueError: If password is invalid
     """
-    # DEBUG: Log what we received
+    import bcrypt
+
+    # Diagnostics record lengths and types only, never password material
     if not isinstance(password, str):
-        error_msg = f"DEBUG hash_password: Received non-string. Type: {type(password)}, Value: {str(password)[:100] if password else 'None'}"
-        print(error_msg, file=sys.stderr)
+        logger.debug("hash_password: received non-string of type %s", type(password).__name__)
         raise ValueError(f"Password must be a string. Received type: {type(password).__name__}")
     
-    # DEBUG: Check password length and content
+    # Check password length
     password_len = len(password)
     password_bytes_len = len(password.encode('utf-8'))
     
     if password_len > 100 or password_bytes_len > 100:
-        error_msg = f"DEBUG hash_password: Suspiciously long value. Length: {password_len} chars, {password_bytes_len} bytes. First 100 chars: {password[:100]}"
-        print(error_msg, file=sys.stderr)
-        print(f"DEBUG hash_password: Full value type: {type(password)}, repr: {repr(password)[:200]}", file=sys.stderr)
+        logger.debug("hash_password: suspiciously long value of %d chars, %d bytes", password_len, password_bytes_len)
         raise ValueError(f"Password appears to be incorrect value. Length: {password_len} chars. Expected password string, got something else.")
     
     # Validate password length (reasonable limits)
@@ -56,8 +62,7 @@ def hash_password(password: str) -> str:
     if not password_to_hash:
         raise ValueError("Password cannot be empty or whitespace only")
     
-    # DEBUG: Log the actual password being hashed (truncated for security)
-    print(f"DEBUG hash_password: Hashing password of length {len(password_to_hash)} chars", file=sys.stderr)
+    logger.debug("hash_password: hashing password of %d chars", len(password_to_hash))
     
     try:
         # Step 1: Hash password with SHA256 (always produces 32 bytes)
@@ -65,46 +70,36 @@ def hash_password(password: str) -> str:
         password_bytes = password_to_hash.encode('utf-8')
         sha256_hash = hashlib.sha256(password_bytes).digest()
         
-        # DEBUG: Verify SHA256 hash is 32 bytes
+        # Verify SHA256 hash is 32 bytes
         if len(sha256_hash) != 32:
-            error_msg = f"DEBUG hash_password: SHA256 hash is not 32 bytes! Length: {len(sha256_hash)}"
-            print(error_msg, file=sys.stderr)
+            logger.debug("hash_password: SHA256 hash is %d bytes, expected 32", len(sha256_hash))
             raise ValueError("SHA256 hash generation failed")
         
-        print(f"DEBUG hash_password: SHA256 hash created successfully, length: {len(sha256_hash)} bytes", file=sys.stderr)
-        
         # Step 2: Hash the SHA256 result with bcrypt
         # Since SHA256 is always 32 bytes, this is safe
         try:
             salt = bcrypt.gensalt(rounds=12)
-            print(f"DEBUG hash_password: Salt generated, length: {len(salt)} bytes", file=sys.stderr)
-            
             # Ensure we're passing bytes to bcrypt.hashpw
             if not isinstance(sha256_hash, bytes):
-                error_msg = f"DEBUG hash_password: sha256_hash is not bytes! Type: {type(sha256_hash)}"
-                print(error_msg, file=sys.stderr)
+                logger.debug("hash_password: SHA256 hash is %s, not bytes", type(sha256_hash).__name__)
                 sha256_hash = bytes(sha256_hash)
             
             if not isinstance(salt, bytes):
-                error_msg = f"DEBUG hash_password: salt is not bytes! Type: {type(salt)}"
-                print(error_msg, file=sys.stderr)
+                logger.debug("hash_password: salt is %s, not bytes", type(salt).__name__)
                 salt = bytes(salt)
             
             bcrypt_hash = bcrypt.hashpw(sha256_hash, salt)
-            print(f"DEBUG hash_password: bcrypt hash created successfully, length: {len(bcrypt_hash)} bytes", file=sys.stderr)
-            
         except ValueError as bcrypt_error:
-            # If bcrypt still complains, log detailed info
-            error_msg = f"DEBUG hash_password: bcrypt.hashpw failed. SHA256 hash length: {len(sha256_hash)} bytes. Error: {str(bcrypt_error)}"
-            print(error_msg, file=sys.stderr)
-            print(f"DEBUG hash_password: SHA256 hash type: {type(sha256_hash)}, salt type: {type(salt)}", file=sys.stderr)
-            print(f"DEBUG hash_password: SHA256 hash value (first 50): {sha256_hash[:50] if isinstance(sha256_hash, bytes) else 'not bytes'}", file=sys.stderr)
+            # If bcrypt still complains, log the sizes involved
+            logger.debug(
+                "hash_password: bcrypt.hashpw failed with a %d-byte SHA256 hash: %s",
+                len(sha256_hash), bcrypt_error
+            )
             raise ValueError(f"Bcrypt hashing failed: {str(bcrypt_error)}")
         
         # Return in bcrypt-sha256 format for compatibility
         # Format: $bcrypt-sha256$<bcrypt_hash>
         result = f"$bcrypt-sha256${bcrypt_hash.decode('utf-8')}"
-        print(f"DEBUG hash_password: Password hashed successfully", file=sys.stderr)
         return result
         
     except ValueError:
@@ -112,11 +107,7 @@ def hash_password(password: str) -> str:
         raise
     except Exception as e:
         # Log full traceback for debugging
-        error_msg = f"DEBUG hash_password: Unexpected error. Password length: {len(password)}, Type: {type(password)}"
-        print(error_msg, file=sys.stderr)
-        print(f"DEBUG hash_password: Exception: {str(e)}", file=sys.stderr)
-        print(f"DEBUG hash_password: Traceback:", file=sys.stderr)
-        traceback.print_exc(file=sys.stderr)
+        logger.debug("hash_password: unexpected error hashing a password of %d chars", len(password), exc_info=True)
         raise ValueError(f"Failed to hash password: {str(e)}")
 
 
@@ -131,6 +122,8 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         True if password matches, False otherwise
     """
+    import bcrypt
+
     try:
         # Validate inputs
         if not isinstance(plain_password, str) or not isinstance(hashed_password, str):
@@ -162,8 +155,51 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return False
 
 
+# bcrypt is deliberately slow and releases the GIL, so it runs on a small
+# dedicated pool instead of blocking the event loop.
+_hash_executor: Optional[ThreadPoolExecutor] = None
+_hash_backlog = 0
+
+
+def _get_hash_executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=settings.bcrypt_workers,
+            thread_name_prefix="bcrypt"
+        )
+    return _hash_executor
+
+
+async def _run_hashing(func, *args):
+    global _hash_backlog
+    _hash_backlog += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_hash_executor(), func, *args)
+    finally:
+        _hash_backlog -= 1
+
+
+def hashing_backlog() -> int:
+    """Number of hash/verify calls queued or running on the bcrypt pool."""
+    return _hash_backlog
+
+
+@traced("security.hash_password")
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the bcrypt pool without blocking the event loop."""
+    return await _run_hashing(hash_password, password)
+
+
+@traced("security.verify_password")
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the bcrypt pool without blocking the event loop."""
+    return await _run_hashing(verify_password, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
+    from jose import jwt
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -177,6 +213,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 def decode_access_token(token: str) -> Optional[dict]:
     """Decode and verify a JWT token."""
+    from jose import JWTError, jwt
     try:
         payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
         return payload
@@ -0,0 +1,187 @@
+"""
+Fair sharing of tenant database work.
+
+Every tenant's collection is reached through the same connection pool, so
+one tenant importing or moving a large collection could otherwise take
+every connection. Batches of tenant work run through TenantScheduler,
+which allows at most tenant_db_concurrency of them at once in total and
+tenant_max_db_concurrency per tenant. When slots are short, waiting
+batches are started in start-time fair queuing order: each tenant's
+batches are tagged on arrival with a virtual start time that advances by
+1/weight per batch, so backlogged tenants share the slots in proportion
+to their weights however much work each one queues.
+
+Per-tenant overrides come from the "scheduling" field of the
+organization's document: {"max_concurrency": int, "weight": float}.
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+from app.core.config import settings
+from app.core.metrics import registry
+
+tenant_active = registry.gauge("org_tenant_db_active", "Batches of tenant work running", ["tenant"])
+tenant_queued = registry.gauge("org_tenant_db_queued", "Batches of tenant work waiting for a slot", ["tenant"])
+tenant_operations = registry.counter("org_tenant_db_operations_total", "Batches of tenant work started", ["tenant"])
+tenant_wait = registry.histogram(
+    "org_tenant_db_wait_seconds", "Time batches of tenant work waited for a slot", ["tenant"]
+)
+
+
+class _TenantQueue:
+    """Scheduling state of one tenant with work running or waiting."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.active = 0
+        # (start tag, future), in arrival order; tags only grow within a tenant
+        self.waiters: deque = deque()
+        self.last_finish = 0.0
+        self.max_concurrency = 1
+        self.weight = 1.0
+
+
+class TenantScheduler:
+    """Per-tenant concurrency caps with weighted fair queuing across tenants."""
+
+    def __init__(self, capacity: Optional[int] = None, max_concurrency: Optional[int] = None):
+        # None: tenant_db_concurrency and tenant_max_db_concurrency, read when needed
+        self._capacity = capacity
+        self._max_concurrency = max_concurrency
+        self.active = 0
+        self._virtual_time = 0.0
+        self._tenants: Dict[str, _TenantQueue] = {}
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity if self._capacity is not None else settings.tenant_db_concurrency
+
+    def _tenant(self, name: str, scheduling: Optional[dict]) -> _TenantQueue:
+        queue = self._tenants.get(name)
+        if queue is None:
+            queue = self._tenants[name] = _TenantQueue(name)
+        # Overrides are re-read on every batch, so edits apply without a restart
+        scheduling = scheduling or {}
+        default = self._max_concurrency if self._max_concurrency is not None else settings.tenant_max_db_concurrency
+        max_concurrency = max(1, int(scheduling.get("max_concurrency") or default))
+        raised = max_concurrency > queue.max_concurrency
+        queue.max_concurrency = max_concurrency
+        queue.weight = float(scheduling.get("weight") or 1.0)
+        if queue.weight <= 0:
+            queue.weight = 1.0
+        if raised and queue.waiters:
+            self._dispatch()
+        return queue
+
+    @asynccontextmanager
+    async def slot(self, tenant: str, scheduling: Optional[dict] = None) -> AsyncIterator[None]:
+        """
+        Hold one of the tenant's slots for a batch of database work.
+        Keep the block to the database calls themselves; waiting on a
+        client inside it would hold the slot from other tenants.
+        """
+        if self.capacity <= 0:
+            yield
+            return
+        queue = self._tenant(tenant, scheduling)
+        await self._acquire(queue)
+        try:
+            yield
+        finally:
+            self._release(queue)
+
+    def _start(self, queue: _TenantQueue, start_tag: float):
+        queue.active += 1
+        self.active += 1
+        self._virtual_time = max(self._virtual_time, start_tag)
+        tenant_active.set(queue.active, tenant=queue.name)
+        tenant_operations.inc(tenant=queue.name)
+
+    async def _acquire(self, queue: _TenantQueue):
+        start_tag = max(self._virtual_time, queue.last_finish)
+        queue.last_finish = start_tag + 1.0 / queue.weight
+
+        # Waiters that could run are always started on release, so a free
+        # slot here means nobody eligible is queued ahead of this batch
+        if self.active < self.capacity and queue.active < queue.max_concurrency and not queue.waiters:
+            self._start(queue, start_tag)
+            tenant_wait.observe(0.0, tenant=queue.name)
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (start_tag, waiter)
+        queue.waiters.append(entry)
+        tenant_queued.set(len(queue.waiters), tenant=queue.name)
+        started = time.monotonic()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # Observed first: giving up may leave the tenant idle and drop its series
+            tenant_wait.observe(time.monotonic() - started, tenant=queue.name)
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over as the caller was cancelled
+                self._release(queue)
+            elif entry in queue.waiters:
+                queue.waiters.remove(entry)
+                tenant_queued.set(len(queue.waiters), tenant=queue.name)
+                self._forget_if_idle(queue)
+            raise
+        tenant_wait.observe(time.monotonic() - started, tenant=queue.name)
+
+    def _release(self, queue: _TenantQueue):
+        queue.active -= 1
+        self.active -= 1
+        tenant_active.set(queue.active, tenant=queue.name)
+        self._dispatch()
+        self._forget_if_idle(queue)
+
+    def _dispatch(self):
+        """Start waiting batches, lowest start tag first, while slots are free."""
+        while self.active < self.capacity:
+            eligible = [
+                queue for queue in self._tenants.values()
+                if queue.waiters and queue.active < queue.max_concurrency
+            ]
+            if not eligible:
+                return
+            queue = min(eligible, key=lambda candidate: candidate.waiters[0][0])
+            start_tag, waiter = queue.waiters.popleft()
+            tenant_queued.set(len(queue.waiters), tenant=queue.name)
+            self._start(queue, start_tag)
+            waiter.set_result(None)
+
+    def _forget_if_idle(self, queue: _TenantQueue):
+        if not queue.active and not queue.waiters:
+            # Per-tenant series only cover tenants with work, so /metrics
+            # stays bounded by concurrent tenants rather than every tenant seen
+            for metric in (tenant_active, tenant_queued, tenant_operations, tenant_wait):
+                metric.remove(tenant=queue.name)
+            # A tenant whose tags are behind the virtual time would start from it
+            # anyway, so dropping its state loses nothing and bounds memory
+            if queue.last_finish <= self._virtual_time:
+                self._tenants.pop(queue.name, None)
+        # Once nothing runs or waits, past shares no longer matter
+        if not self.active and not any(other.waiters for other in self._tenants.values()):
+            self._tenants.clear()
+
+    def summary(self) -> dict:
+        """Slots in use and waiting batches, per tenant with work."""
+        return {
+            "capacity": self.capacity,
+            "active": self.active,
+            "tenants": {
+                queue.name: {
+                    "active": queue.active,
+                    "queued": len(queue.waiters),
+                    "max_concurrency": queue.max_concurrency,
+                    "weight": queue.weight
+                }
+                for queue in self._tenants.values()
+                if queue.active or queue.waiters
+            }
+        }
+
+
+tenant_scheduler = TenantScheduler()
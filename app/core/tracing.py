@@ -0,0 +1,322 @@
+"""
+Lightweight request tracing.
+
+A root span is opened per request, with W3C traceparent propagation;
+@traced adds child spans for service methods and password hashing, and a
+driver command listener adds one span per MongoDB command. The current
+span lives in a contextvar, which Motor copies into its executor threads,
+so command spans nest under the service call that issued them.
+
+Sampling is decided once at the root (head sampling). Unsampled requests
+carry no span at all, so instrumented code pays one contextvar lookup.
+Finished spans are buffered and exported in batches off the event loop.
+"""
+import asyncio
+import functools
+import importlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+from pymongo import monitoring
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+spans_dropped = registry.counter("org_tracing_spans_dropped_total", "Finished spans dropped because the export buffer was full")
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "status")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None, kind: str = "internal"):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, object] = {}
+        self.status = "ok"
+
+    def child(self, name: str, kind: str = "internal") -> "Span":
+        return Span(name, self.trace_id, self.span_id, kind)
+
+    def set_error(self, exc: BaseException):
+        self.status = "error"
+        self.attributes["error.type"] = type(exc).__name__
+        self.attributes["error.message"] = str(exc)
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            span_processor.on_end(self)
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_otlp(self) -> dict:
+        """Render in the OTLP/JSON span shape."""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "kind": {"server": 2, "client": 3}.get(self.kind, 1),
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": key, "value": {"stringValue": str(value)}}
+                for key, value in self.attributes.items()
+            ],
+            "status": {"code": 2 if self.status == "error" else 1}
+        }
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def parse_traceparent(header: Optional[str]):
+    """Return (trace_id, parent_span_id, sampled) from a W3C traceparent, or None if invalid."""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16)
+        int(parts[2], 16)
+        flags = int(parts[3][:2], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+
+def traced(name: str):
+    """Decorator opening a child span around a function when the request is sampled."""
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                parent = _current_span.get()
+                if parent is None:
+                    return await func(*args, **kwargs)
+                span = parent.child(name)
+                token = _current_span.set(span)
+                try:
+                    return await func(*args, **kwargs)
+                except BaseException as e:
+                    span.set_error(e)
+                    raise
+                finally:
+                    _current_span.reset(token)
+                    span.end()
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            parent = _current_span.get()
+            if parent is None:
+                return func(*args, **kwargs)
+            span = parent.child(name)
+            token = _current_span.set(span)
+            try:
+                return func(*args, **kwargs)
+            except BaseException as e:
+                span.set_error(e)
+                raise
+            finally:
+                _current_span.reset(token)
+                span.end()
+        return wrapper
+    return decorator
+
+
+class SpanExporter:
+    """Exporter interface; export() runs on a worker thread."""
+
+    def export(self, spans: List[Span]):
+        raise NotImplementedError
+
+    def shutdown(self):
+        pass
+
+
+class NullSpanExporter(SpanExporter):
+    def export(self, spans: List[Span]):
+        pass
+
+
+class FileSpanExporter(SpanExporter):
+    """
+    Append spans to a file as OTLP/JSON ExportTraceServiceRequest lines,
+    one line per batch, so the file can be replayed into any OTLP collector.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, spans: List[Span]):
+        request = {
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    {"key": "service.name", "value": {"stringValue": settings.app_name}}
+                ]},
+                "scopeSpans": [{
+                    "scope": {"name": "app.core.tracing"},
+                    "spans": [span.to_otlp() for span in spans]
+                }]
+            }]
+        }
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(request) + "\n")
+
+
+def build_exporter() -> SpanExporter:
+    """Create the exporter named by TRACING_EXPORTER: none, file, or module:Class."""
+    name = settings.tracing_exporter
+    if name == "file":
+        return FileSpanExporter(settings.tracing_file_path)
+    if name == "none":
+        return NullSpanExporter()
+    module_name, _, class_name = name.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+class BatchSpanProcessor:
+    """Buffers finished spans and hands them to the exporter in batches."""
+
+    def __init__(self, max_buffer: Optional[int] = None):
+        self._buffer: deque = deque()
+        # None: tracing_buffer_size, read when first needed
+        self._max_buffer = max_buffer
+        self._lock = threading.Lock()
+        self.exporter: Optional[SpanExporter] = None
+
+    def on_end(self, span: Span):
+        # Command listener callbacks finish spans on driver threads
+        with self._lock:
+            max_buffer = self._max_buffer if self._max_buffer is not None else settings.tracing_buffer_size
+            if len(self._buffer) >= max_buffer:
+                spans_dropped.inc()
+                return
+            self._buffer.append(span)
+
+    def _take(self) -> List[Span]:
+        with self._lock:
+            spans = list(self._buffer)
+            self._buffer.clear()
+        return spans
+
+    async def flush(self):
+        spans = self._take()
+        if spans and self.exporter is not None:
+            await asyncio.to_thread(self.exporter.export, spans)
+
+    async def shutdown(self):
+        await self.flush()
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+
+span_processor = BatchSpanProcessor()
+span_flusher = PeriodicTask("span-exporter", lambda: settings.tracing_flush_seconds, span_processor.flush)
+
+
+class CommandTracer(monitoring.CommandListener):
+    """Driver listener recording one client span per MongoDB command."""
+
+    def __init__(self):
+        self._spans: Dict[tuple, Span] = {}
+
+    def started(self, event):
+        parent = _current_span.get()
+        if parent is None:
+            return
+        span = parent.child(f"mongo.{event.command_name}", kind="client")
+        span.attributes["db.system"] = "mongodb"
+        span.attributes["db.name"] = event.database_name
+        span.attributes["db.operation"] = event.command_name
+        collection = event.command.get(event.command_name)
+        if isinstance(collection, str):
+            span.attributes["db.mongodb.collection"] = collection
+        span.attributes["net.peer.name"] = f"{event.connection_id[0]}:{event.connection_id[1]}"
+        self._spans[(event.request_id, event.connection_id)] = span
+
+    def succeeded(self, event):
+        span = self._spans.pop((event.request_id, event.connection_id), None)
+        if span is not None:
+            span.end()
+
+    def failed(self, event):
+        span = self._spans.pop((event.request_id, event.connection_id), None)
+        if span is not None:
+            span.status = "error"
+            span.attributes["error.message"] = str(event.failure.get("errmsg", ""))
+            span.end()
+
+
+command_tracer = CommandTracer()
+
+
+class TracingMiddleware:
+    """ASGI middleware opening the root span of each sampled request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        incoming = parse_traceparent(headers.get(b"traceparent", b"").decode("latin-1"))
+        if incoming is not None:
+            trace_id, parent_id, sampled = incoming
+        else:
+            trace_id, parent_id = os.urandom(16).hex(), None
+            sampled = random.random() < settings.tracing_sample_rate
+        if not sampled:
+            await self.app(scope, receive, send)
+            return
+
+        span = Span(f"{scope['method']} {scope['path']}", trace_id, parent_id, kind="server")
+        span.attributes["http.method"] = scope["method"]
+        span.attributes["http.target"] = scope["path"]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                span.attributes["http.status_code"] = message["status"]
+                if message["status"] >= 500:
+                    span.status = "error"
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"traceparent", span.traceparent.encode("ascii"))
+                ]
+            await send(message)
+
+        token = _current_span.set(span)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            span.set_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
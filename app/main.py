@@ -1,29 +1,29 @@
+import logging
+from typing import Optional
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse
 from app.core.config import settings
-from app.core.database import close_database
+from app.core.database import close_database, ensure_indexes
+from app.core.metrics import registry
+from app.core.load_shedding import LoadSheddingMiddleware
+from app.core.health import health_monitor, health_refresher
+from app.core.profiling import ProfilingMiddleware
+from app.core.loop_monitor import loop_monitor
+from app.core.tracing import TracingMiddleware, build_exporter, span_flusher, span_processor
 from app.api.routes import org, admin
+from app.services.org_service import OrganizationService, tenant_reaper
+from app.services.stats_service import stats_refresher
+from app.services.audit_service import audit_log
+from app.services.auth_service import revocation_refresher
+from app.services.event_service import organization_events
+from app.services.template_service import template_reconciler
+
+logger = logging.getLogger(__name__)
+
 
-app = FastAPI(
-    title=settings.app_name,
-    description="Multi-tenant Organization Management Service with MongoDB",
-    version="1.0.0"
-)
-
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Configure appropriately for production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-    expose_headers=["*"],
-)
-
-# Exception handler for validation errors
-@app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Handle validation errors and return clear error messages."""
     errors = exc.errors()
@@ -46,12 +46,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         }
     )
 
-# Include routers
-app.include_router(org.router)
-app.include_router(admin.router)
 
-
-@app.get("/")
 async def root():
     """Root endpoint."""
     return {
@@ -61,14 +56,130 @@ async def root():
     }
 
 
-@app.get("/health")
 async def health_check():
-    """Health check endpoint."""
+    """Health check endpoint. Kept for compatibility; same as /health/live."""
     return {"status": "healthy"}
 
 
-@app.on_event("shutdown")
+async def liveness_check():
+    """Liveness probe. Does no I/O: answering at all means the process is alive."""
+    return {"status": "alive"}
+
+
+async def readiness_check():
+    """Readiness probe. Serves the result of the last background dependency check."""
+    result = health_monitor.readiness()
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if result["status"] == "ready" else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=jsonable_encoder(result)
+    )
+
+
+async def metrics():
+    """Prometheus metrics endpoint."""
+    return registry.render()
+
+
+async def startup_event():
+    """Prepare master collections and start background tasks."""
+    try:
+        await ensure_indexes()
+        await OrganizationService.backfill_search_fields()
+    except Exception as e:
+        logger.warning("Could not prepare master collections at startup: %s", e)
+    stats_refresher.start()
+    tenant_reaper.start()
+    template_reconciler.start()
+    audit_log.start()
+    organization_events.start()
+    if settings.loop_monitor_enabled:
+        loop_monitor.start()
+    health_refresher.start()
+    if settings.auth_mode == "stateless":
+        revocation_refresher.start()
+    if settings.tracing_enabled:
+        span_processor.exporter = build_exporter()
+        span_flusher.start()
+
+
 async def shutdown_event():
-    """Close database connections on shutdown."""
+    """Stop background tasks and close database connections on shutdown."""
+    await health_refresher.stop()
+    await revocation_refresher.stop()
+    await loop_monitor.stop()
+    await stats_refresher.stop()
+    await tenant_reaper.stop()
+    await template_reconciler.stop()
+    await audit_log.stop()
+    await organization_events.stop()
+    await span_flusher.stop()
+    await span_processor.shutdown()
     await close_database()
 
+
+def create_app() -> FastAPI:
+    """
+    Build the application.
+
+    Settings are read here rather than when this module is imported, so
+    the import stays cheap and an app can be built after the environment
+    is adjusted. Serve with `uvicorn --factory app.main:create_app`, or
+    through `app.main:app`, which builds one app on first access.
+    """
+    app = FastAPI(
+        title=settings.app_name,
+        description="Multi-tenant Organization Management Service with MongoDB",
+        version="1.0.0"
+    )
+
+    # Request profiling (innermost, so it only measures requests that were admitted)
+    if settings.profiling_enabled:
+        app.add_middleware(ProfilingMiddleware)
+
+    # Load shedding (added before CORS so CORS still wraps its 503 responses)
+    if settings.load_shedding_enabled:
+        app.add_middleware(LoadSheddingMiddleware)
+
+    # Tracing (wraps load shedding so shed requests are traced too)
+    if settings.tracing_enabled:
+        app.add_middleware(TracingMiddleware)
+
+    # CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # Configure appropriately for production
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["*"],
+    )
+
+    app.add_exception_handler(RequestValidationError, validation_exception_handler)
+
+    # Include routers
+    app.include_router(org.router)
+    app.include_router(admin.router)
+
+    app.get("/")(root)
+    app.get("/health")(health_check)
+    app.get("/health/live")(liveness_check)
+    app.get("/health/ready")(readiness_check)
+    app.get("/metrics", response_class=PlainTextResponse)(metrics)
+
+    app.add_event_handler("startup", startup_event)
+    app.add_event_handler("shutdown", shutdown_event)
+    return app
+
+
+_app: Optional[FastAPI] = None
+
+
+def __getattr__(name: str):
+    # `app.main:app` keeps working for uvicorn and `from app.main import app`;
+    # the app is only built when first asked for.
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
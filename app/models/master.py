@@ -1,38 +1,80 @@
+from dataclasses import dataclass, field
 from typing import Optional
 from datetime import datetime
 from bson import ObjectId
+from app.utils.naming import normalize_org_name, name_trigrams
 
 
+@dataclass(slots=True)
 class Organization:
-    """Organization document structure in master database."""
-    
-    def __init__(
-        self,
-        organization_name: str,
-        collection_name: str,
-        admin_email: str,
-        admin_id: str,
-        created_at: Optional[datetime] = None,
-        updated_at: Optional[datetime] = None
-    ):
-        self.organization_name = organization_name
-        self.collection_name = collection_name
-        self.admin_email = admin_email
-        self.admin_id = admin_id
-        self.created_at = created_at or datetime.utcnow()
-        self.updated_at = updated_at or datetime.utcnow()
-    
+    """
+    Organization document structure in master database.
+
+    Slotted, so instances carry no per-instance __dict__. Reads should
+    fetch with PROJECTION, which leaves out the derived search fields
+    (name_trigrams is an array of one string per trigram) that no model
+    attribute needs.
+    """
+
+    organization_name: str
+    collection_name: str
+    admin_email: str
+    admin_id: str
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    updated_at: datetime = field(default_factory=datetime.utcnow)
+    version: int = 1
+    cluster: str = "default"
+    id: Optional[ObjectId] = None
+    moving_to: Optional[str] = None
+    move_fenced: bool = False
+    # Set when the organization is deleted; its collection is reclaimed later
+    deleted_at: Optional[datetime] = None
+    deleted_name: Optional[str] = None
+    # Tenant collection template version the collection was last brought up to
+    template_version: int = 0
+    # Operator overrides for the tenant scheduler: {"max_concurrency": int, "weight": float}
+    scheduling: Optional[dict] = None
+
+    # Stored fields the model maps; pass as the projection of reads
+    PROJECTION = {
+        "organization_name": 1,
+        "collection_name": 1,
+        "admin_email": 1,
+        "admin_id": 1,
+        "created_at": 1,
+        "updated_at": 1,
+        "version": 1,
+        "cluster": 1,
+        "moving_to": 1,
+        "move_fenced": 1,
+        "deleted_at": 1,
+        "deleted_name": 1,
+        "template_version": 1,
+        "scheduling": 1
+    }
+
     def to_dict(self) -> dict:
         """Convert to dictionary for MongoDB insertion."""
-        return {
+        normalized_name = normalize_org_name(self.organization_name)
+        document = {
             "organization_name": self.organization_name,
+            "name_normalized": normalized_name,
+            "name_trigrams": name_trigrams(normalized_name),
             "collection_name": self.collection_name,
             "admin_email": self.admin_email,
             "admin_id": self.admin_id,
             "created_at": self.created_at,
-            "updated_at": self.updated_at
+            "updated_at": self.updated_at,
+            "version": self.version,
+            "cluster": self.cluster,
+            "template_version": self.template_version
         }
-    
+        if self.scheduling is not None:
+            document["scheduling"] = self.scheduling
+        if self.id is not None:
+            document["_id"] = self.id
+        return document
+
     @classmethod
     def from_dict(cls, data: dict):
         """Create Organization instance from MongoDB document."""
@@ -41,46 +83,72 @@ class Organization:
             collection_name=data["collection_name"],
             admin_email=data["admin_email"],
             admin_id=data["admin_id"],
-            created_at=data.get("created_at"),
-            updated_at=data.get("updated_at")
+            created_at=data.get("created_at") or datetime.utcnow(),
+            updated_at=data.get("updated_at") or datetime.utcnow(),
+            version=data.get("version") or 1,
+            cluster=data.get("cluster", "default"),
+            id=data.get("_id"),
+            moving_to=data.get("moving_to"),
+            move_fenced=data.get("move_fenced", False),
+            deleted_at=data.get("deleted_at"),
+            deleted_name=data.get("deleted_name"),
+            template_version=data.get("template_version", 0),
+            scheduling=data.get("scheduling")
         )
 
 
+@dataclass(slots=True)
 class AdminUser:
     """Admin user document structure in master database."""
-    
-    def __init__(
-        self,
-        email: str,
-        hashed_password: str,
-        organization_name: str,
-        organization_id: str,
-        created_at: Optional[datetime] = None
-    ):
-        self.email = email
-        self.hashed_password = hashed_password
-        self.organization_name = organization_name
-        self.organization_id = organization_id
-        self.created_at = created_at or datetime.utcnow()
-    
+
+    email: str
+    hashed_password: str
+    organization_name: str
+    organization_id: str
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    # Embedded in issued tokens; bumping it revokes every token issued before
+    token_version: int = 0
+    id: Optional[ObjectId] = None
+
+    PROJECTION = {
+        "email": 1,
+        "hashed_password": 1,
+        "organization_name": 1,
+        "organization_id": 1,
+        "created_at": 1,
+        "token_version": 1
+    }
+    # For reads that never check the password
+    PROFILE_PROJECTION = {
+        "email": 1,
+        "organization_name": 1,
+        "organization_id": 1,
+        "token_version": 1
+    }
+
     def to_dict(self) -> dict:
         """Convert to dictionary for MongoDB insertion."""
-        return {
+        document = {
             "email": self.email,
             "hashed_password": self.hashed_password,
             "organization_name": self.organization_name,
             "organization_id": self.organization_id,
-            "created_at": self.created_at
+            "created_at": self.created_at,
+            "token_version": self.token_version
         }
-    
+        if self.id is not None:
+            document["_id"] = self.id
+        return document
+
     @classmethod
     def from_dict(cls, data: dict):
-        """Create AdminUser instance from MongoDB document."""
+        """Create AdminUser instance from MongoDB document, which may be projected."""
         return cls(
             email=data["email"],
-            hashed_password=data["hashed_password"],
+            hashed_password=data.get("hashed_password", ""),
             organization_name=data["organization_name"],
-            organization_id=str(data.get("_id", "")),
-            created_at=data.get("created_at")
+            organization_id=data.get("organization_id", ""),
+            created_at=data.get("created_at") or datetime.utcnow(),
+            token_version=data.get("token_version", 0),
+            id=data.get("_id")
         )
-
@@ -0,0 +1,31 @@
+"""
+Storage backends for organizations, admin users and tenant collections,
+selected by REPOSITORY_BACKEND: "motor" (MongoDB, the default) or "memory".
+"""
+from typing import Optional
+from app.core.config import settings
+from app.repositories.base import Repositories
+
+_repositories: Optional[Repositories] = None
+
+
+def get_repositories() -> Repositories:
+    """Get the repositories of the configured backend, built on first use."""
+    global _repositories
+    if _repositories is None:
+        if settings.repository_backend == "motor":
+            from app.repositories.motor import build_motor_repositories
+            _repositories = build_motor_repositories()
+        elif settings.repository_backend == "memory":
+            from app.repositories.memory import build_memory_repositories
+            _repositories = build_memory_repositories()
+        else:
+            raise ValueError(f"Unknown repository backend '{settings.repository_backend}'")
+    return _repositories
+
+
+def reset_repositories():
+    """Forget the current backend; the next get_repositories() builds a fresh one."""
+    global _repositories
+    _repositories = None
+
@@ -0,0 +1,225 @@
+"""
+Storage interfaces used by the services for master metadata: organizations,
+admins, token revocations, tenant stats and the audit log.
+
+Documents go in and come out as plain dicts shaped like the stored BSON.
+Projections are include-style ({"field": 1}), and _id is always returned.
+Every backend enforces the same unique indexes: organizations on
+organization_name, and admin_users on email. A violation raises
+pymongo.errors.DuplicateKeyError, whichever backend is in use. Lookups
+take a read route from app.core.database (PRIMARY or STALE_OK); backends
+without replicas ignore it.
+"""
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
+from bson import ObjectId
+from app.core.database import PRIMARY
+
+
+class OrganizationRepository:
+    """The organizations collection."""
+
+    async def find_by_name(
+        self, organization_name: str, projection: Optional[dict] = None, read: str = PRIMARY
+    ) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def find_by_id(
+        self, organization_id: ObjectId, projection: Optional[dict] = None, read: str = PRIMARY
+    ) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def insert(self, document: dict) -> ObjectId:
+        raise NotImplementedError
+
+    async def update_versioned(
+        self,
+        organization_id: ObjectId,
+        version: Optional[int],
+        fields: dict,
+        projection: Optional[dict] = None
+    ) -> Optional[dict]:
+        """
+        Set fields and increment version, only if the stored version is
+        still version (None matches documents without one). Returns the
+        updated document, or None when the version did not match.
+        """
+        raise NotImplementedError
+
+    async def delete(self, organization_id: ObjectId) -> bool:
+        raise NotImplementedError
+
+    async def search(
+        self,
+        normalized_query: str,
+        mode: str,
+        after: Optional[Tuple[str, ObjectId]],
+        limit: int,
+        projection: Optional[dict] = None,
+        read: str = PRIMARY
+    ) -> List[dict]:
+        """
+        Organizations whose name_normalized starts with ("prefix") or
+        contains ("substring") normalized_query, ordered by
+        (name_normalized, _id) and starting after the given key.
+        """
+        raise NotImplementedError
+
+    async def list_tombstoned(self, limit: int, projection: Optional[dict] = None) -> List[dict]:
+        """Deleted organizations awaiting reclamation, oldest deletion first."""
+        raise NotImplementedError
+
+    async def count_template_outdated(self, version: int) -> int:
+        """Live organizations whose template_version is below version."""
+        raise NotImplementedError
+
+    async def list_template_outdated(
+        self,
+        version: int,
+        after: Optional[ObjectId],
+        limit: int,
+        projection: Optional[dict] = None
+    ) -> List[dict]:
+        """Live organizations whose template_version is below version, in _id order after the given id."""
+        raise NotImplementedError
+
+    def iter_missing_search_fields(self, batch_size: int) -> AsyncIterator[dict]:
+        """Organizations without name_normalized, projected to organization_name."""
+        raise NotImplementedError
+
+    async def set_fields_many(self, updates: List[Tuple[ObjectId, dict]]):
+        raise NotImplementedError
+
+    def iter_live(self, batch_size: int, projection: Optional[dict] = None) -> AsyncIterator[dict]:
+        """Organizations that are not deleted, in no particular order."""
+        raise NotImplementedError
+
+    async def update_where(
+        self,
+        organization_id: ObjectId,
+        match: dict,
+        fields: dict,
+        unset: Tuple[str, ...] = (),
+        inc: Optional[dict] = None
+    ) -> bool:
+        """
+        Set fields, remove unset and increment inc, only if the document
+        also matches match: per field, a value (None also matches a missing
+        field) or {"$in": [values]}. Returns whether a document matched.
+        """
+        raise NotImplementedError
+
+
+class AdminUserRepository:
+    """The admin_users collection."""
+
+    async def find_by_email(self, email: str, projection: Optional[dict] = None, read: str = PRIMARY) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def find_by_id(self, admin_id: ObjectId, projection: Optional[dict] = None, read: str = PRIMARY) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def insert(self, document: dict) -> ObjectId:
+        raise NotImplementedError
+
+    async def update(self, admin_id: ObjectId, fields: dict, expected: Optional[dict] = None):
+        """Set fields; with expected, only if the admin still holds those values."""
+        raise NotImplementedError
+
+    async def bump_token_version(self, admin_id: ObjectId) -> Optional[int]:
+        """Increment the admin's token_version; returns the new value, or None if there is no such admin."""
+        raise NotImplementedError
+
+    async def delete(self, admin_id: ObjectId) -> bool:
+        raise NotImplementedError
+
+
+class TokenRevocationRepository:
+    """
+    The token_revocations collection: the lowest token_version still valid
+    per admin, kept until every token issued before it has expired.
+    """
+
+    async def revoke(self, admin_id: ObjectId, token_version: int, expires_at: datetime):
+        """Record token_version for the admin; a lower version never replaces a higher one."""
+        raise NotImplementedError
+
+    async def list_active(self, now: datetime) -> List[dict]:
+        """Every revocation expiring after now, as {"_id", "token_version"}."""
+        raise NotImplementedError
+
+
+class TenantRepository:
+    """Per-organization collections and the stats kept about them."""
+
+    async def create(self, collection_name: str, cluster: Optional[str], metadata: dict, template: dict):
+        """Create the collection with the template's collation, its _metadata document, then apply the template."""
+        raise NotImplementedError
+
+    async def apply_template(self, collection_name: str, cluster: Optional[str], template: dict):
+        """
+        Create the template's indexes and set its validator (or clear it, if
+        None). Raises ValueError if the collection does not exist.
+        """
+        raise NotImplementedError
+
+    async def drop(self, collection_name: str, cluster: Optional[str]):
+        raise NotImplementedError
+
+    async def get_stats(self, organization_id: ObjectId) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def remove_stats(self, organization_id: ObjectId):
+        raise NotImplementedError
+
+    async def ensure(self, collection_name: str, cluster: Optional[str], template: dict):
+        """Create the collection with the template's collation unless it exists, then apply the template."""
+        raise NotImplementedError
+
+    async def collection_stats(self, collection_name: str, cluster: Optional[str]) -> dict:
+        """
+        Storage figures of one collection: document_count, data_size,
+        index_size and last_write_at (from the newest ObjectId _id, or None).
+        A missing collection reports zeros.
+        """
+        raise NotImplementedError
+
+    async def save_stats(self, stats: List[dict]):
+        """Store per-organization stats documents, replacing any with the same _id."""
+        raise NotImplementedError
+
+    async def get_fleet_stats(self) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def save_fleet_stats(self, fleet: dict):
+        raise NotImplementedError
+
+
+class AuditRepository:
+    """The audit_log collection."""
+
+    async def append(self, events: List[dict]):
+        """Store events; each is given an ObjectId _id, so _id order is insertion order."""
+        raise NotImplementedError
+
+    async def list(self, organization_name: Optional[str], before: Optional[ObjectId], limit: int) -> List[dict]:
+        """Events newest first, optionally of one organization and older than the event before."""
+        raise NotImplementedError
+
+
+class Repositories:
+    """The repositories of one backend."""
+
+    def __init__(
+        self,
+        organizations: OrganizationRepository,
+        admin_users: AdminUserRepository,
+        tenants: TenantRepository,
+        token_revocations: TokenRevocationRepository,
+        audit: AuditRepository
+    ):
+        self.organizations = organizations
+        self.admin_users = admin_users
+        self.tenants = tenants
+        self.token_revocations = token_revocations
+        self.audit = audit
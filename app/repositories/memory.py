@@ -0,0 +1,407 @@
+"""
+In-process repositories for tests and benchmarks.
+
+Each operation completes without awaiting anything, so on one event loop it
+is atomic, as a single-document MongoDB write is. Unique indexes and the
+(name_normalized, _id) search order are kept in memory with the same
+semantics as the MongoDB indexes. Documents are copied on the way in and
+out, so callers can never mutate stored state.
+"""
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import bson
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+from app.core.database import DEFAULT_CLUSTER, PRIMARY
+from app.repositories.base import (
+    AdminUserRepository,
+    AuditRepository,
+    OrganizationRepository,
+    Repositories,
+    TenantRepository,
+    TokenRevocationRepository
+)
+
+
+def _copy(document: dict) -> dict:
+    return {
+        key: list(value) if isinstance(value, list) else dict(value) if isinstance(value, dict) else value
+        for key, value in document.items()
+    }
+
+
+def _project(document: Optional[dict], projection: Optional[dict]) -> Optional[dict]:
+    if document is None:
+        return None
+    if projection is None:
+        return _copy(document)
+    result = {"_id": document["_id"]}
+    for field, include in projection.items():
+        if include and field in document:
+            value = document[field]
+            result[field] = list(value) if isinstance(value, list) else value
+    return result
+
+
+def _matches(document: dict, match: dict) -> bool:
+    """The subset of MongoDB equality matching update_where takes."""
+    for field, expected in match.items():
+        allowed = expected["$in"] if isinstance(expected, dict) else [expected]
+        if document.get(field) not in allowed:
+            return False
+    return True
+
+
+class _Collection:
+    """Documents by _id plus a unique index per listed field."""
+
+    def __init__(self, name: str, unique_fields: Tuple[str, ...]):
+        self.name = name
+        self.documents: Dict[ObjectId, dict] = {}
+        self.unique: Dict[str, Dict[object, ObjectId]] = {field: {} for field in unique_fields}
+
+    def _duplicate(self, field: str, value) -> DuplicateKeyError:
+        return DuplicateKeyError(
+            f"E11000 duplicate key error collection: {self.name} index: {field}_1 dup key: {{ {field}: {value!r} }}",
+            11000,
+            {"keyValue": {field: value}}
+        )
+
+    def find_unique(self, field: str, value) -> Optional[dict]:
+        document_id = self.unique[field].get(value)
+        return self.documents.get(document_id) if document_id is not None else None
+
+    def insert(self, document: dict) -> dict:
+        document = _copy(document)
+        document.setdefault("_id", ObjectId())
+        if document["_id"] in self.documents:
+            raise self._duplicate("_id", document["_id"])
+        for field, index in self.unique.items():
+            if field in document and document[field] in index:
+                raise self._duplicate(field, document[field])
+        for field, index in self.unique.items():
+            if field in document:
+                index[document[field]] = document["_id"]
+        self.documents[document["_id"]] = document
+        return document
+
+    def update(self, document: dict, fields: dict):
+        # Check every unique field before changing anything, like a single write
+        for field, index in self.unique.items():
+            if field in fields and index.get(fields[field], document["_id"]) != document["_id"]:
+                raise self._duplicate(field, fields[field])
+        for field, index in self.unique.items():
+            if field in fields:
+                index.pop(document.get(field), None)
+                index[fields[field]] = document["_id"]
+        document.update(_copy(fields))
+
+    def delete(self, document_id: ObjectId) -> Optional[dict]:
+        document = self.documents.pop(document_id, None)
+        if document is not None:
+            for field, index in self.unique.items():
+                if field in document:
+                    index.pop(document[field], None)
+        return document
+
+
+class MemoryOrganizationRepository(OrganizationRepository):
+
+    def __init__(self):
+        self._collection = _Collection("organizations", ("organization_name",))
+        # Sorted (name_normalized, _id) keys: the search index
+        self._search_keys: List[Tuple[str, ObjectId]] = []
+
+    def _index_search_key(self, document: dict):
+        if "name_normalized" in document:
+            insort(self._search_keys, (document["name_normalized"], document["_id"]))
+
+    def _unindex_search_key(self, document: dict):
+        if "name_normalized" in document:
+            key = (document["name_normalized"], document["_id"])
+            position = bisect_left(self._search_keys, key)
+            if position < len(self._search_keys) and self._search_keys[position] == key:
+                del self._search_keys[position]
+
+    async def find_by_name(
+        self, organization_name: str, projection: Optional[dict] = None, read: str = PRIMARY
+    ) -> Optional[dict]:
+        return _project(self._collection.find_unique("organization_name", organization_name), projection)
+
+    async def find_by_id(
+        self, organization_id: ObjectId, projection: Optional[dict] = None, read: str = PRIMARY
+    ) -> Optional[dict]:
+        return _project(self._collection.documents.get(organization_id), projection)
+
+    async def insert(self, document: dict) -> ObjectId:
+        stored = self._collection.insert(document)
+        self._index_search_key(stored)
+        return stored["_id"]
+
+    async def update_versioned(
+        self,
+        organization_id: ObjectId,
+        version: Optional[int],
+        fields: dict,
+        projection: Optional[dict] = None
+    ) -> Optional[dict]:
+        document = self._collection.documents.get(organization_id)
+        if document is None or document.get("version") != version:
+            return None
+        self._unindex_search_key(document)
+        try:
+            self._collection.update(document, dict(fields, version=(version or 0) + 1))
+        finally:
+            self._index_search_key(document)
+        return _project(document, projection)
+
+    async def delete(self, organization_id: ObjectId) -> bool:
+        document = self._collection.delete(organization_id)
+        if document is None:
+            return False
+        self._unindex_search_key(document)
+        return True
+
+    async def search(
+        self,
+        normalized_query: str,
+        mode: str,
+        after: Optional[Tuple[str, ObjectId]],
+        limit: int,
+        projection: Optional[dict] = None,
+        read: str = PRIMARY
+    ) -> List[dict]:
+        if mode == "substring":
+            start = bisect_right(self._search_keys, after) if after else 0
+        else:
+            start = bisect_left(self._search_keys, (normalized_query,))
+            if after and after >= (normalized_query,):
+                start = bisect_right(self._search_keys, after)
+
+        results = []
+        for name, organization_id in self._search_keys[start:]:
+            if mode == "substring":
+                if normalized_query not in name:
+                    continue
+            elif not name.startswith(normalized_query):
+                break
+            results.append(_project(self._collection.documents[organization_id], projection))
+            if len(results) >= limit:
+                break
+        return results
+
+    async def list_tombstoned(self, limit: int, projection: Optional[dict] = None) -> List[dict]:
+        tombstoned = sorted(
+            (document for document in self._collection.documents.values() if "deleted_at" in document),
+            key=lambda document: document["deleted_at"]
+        )
+        return [_project(document, projection) for document in tombstoned[:limit]]
+
+    def _template_outdated(self, version: int) -> List[dict]:
+        return [
+            document for document in self._collection.documents.values()
+            if document.get("template_version", 0) < version and "deleted_at" not in document
+        ]
+
+    async def count_template_outdated(self, version: int) -> int:
+        return len(self._template_outdated(version))
+
+    async def list_template_outdated(
+        self,
+        version: int,
+        after: Optional[ObjectId],
+        limit: int,
+        projection: Optional[dict] = None
+    ) -> List[dict]:
+        outdated = sorted(
+            (document for document in self._template_outdated(version) if after is None or document["_id"] > after),
+            key=lambda document: document["_id"]
+        )
+        return [_project(document, projection) for document in outdated[:limit]]
+
+    async def iter_missing_search_fields(self, batch_size: int) -> AsyncIterator[dict]:
+        missing = [
+            document for document in self._collection.documents.values()
+            if "name_normalized" not in document
+        ]
+        for document in missing:
+            yield _project(document, {"organization_name": 1})
+
+    async def set_fields_many(self, updates: List[Tuple[ObjectId, dict]]):
+        for organization_id, fields in updates:
+            document = self._collection.documents.get(organization_id)
+            if document is not None:
+                self._unindex_search_key(document)
+                self._collection.update(document, fields)
+                self._index_search_key(document)
+
+    async def iter_live(self, batch_size: int, projection: Optional[dict] = None) -> AsyncIterator[dict]:
+        live = [document for document in self._collection.documents.values() if "deleted_at" not in document]
+        for document in live:
+            yield _project(document, projection)
+
+    async def update_where(
+        self,
+        organization_id: ObjectId,
+        match: dict,
+        fields: dict,
+        unset: Tuple[str, ...] = (),
+        inc: Optional[dict] = None
+    ) -> bool:
+        document = self._collection.documents.get(organization_id)
+        if document is None or not _matches(document, match):
+            return False
+        changes = dict(fields)
+        for field, amount in (inc or {}).items():
+            changes[field] = document.get(field, 0) + amount
+        self._unindex_search_key(document)
+        try:
+            self._collection.update(document, changes)
+            for field in unset:
+                document.pop(field, None)
+        finally:
+            self._index_search_key(document)
+        return True
+
+
+class MemoryAdminUserRepository(AdminUserRepository):
+
+    def __init__(self):
+        self._collection = _Collection("admin_users", ("email",))
+
+    async def find_by_email(self, email: str, projection: Optional[dict] = None, read: str = PRIMARY) -> Optional[dict]:
+        return _project(self._collection.find_unique("email", email), projection)
+
+    async def find_by_id(self, admin_id: ObjectId, projection: Optional[dict] = None, read: str = PRIMARY) -> Optional[dict]:
+        return _project(self._collection.documents.get(admin_id), projection)
+
+    async def insert(self, document: dict) -> ObjectId:
+        return self._collection.insert(document)["_id"]
+
+    async def update(self, admin_id: ObjectId, fields: dict, expected: Optional[dict] = None):
+        document = self._collection.documents.get(admin_id)
+        if document is None:
+            return
+        if expected and any(document.get(field) != value for field, value in expected.items()):
+            return
+        self._collection.update(document, fields)
+
+    async def bump_token_version(self, admin_id: ObjectId) -> Optional[int]:
+        document = self._collection.documents.get(admin_id)
+        if document is None:
+            return None
+        self._collection.update(document, {"token_version": document.get("token_version", 0) + 1})
+        return document["token_version"]
+
+    async def delete(self, admin_id: ObjectId) -> bool:
+        return self._collection.delete(admin_id) is not None
+
+
+class MemoryTenantRepository(TenantRepository):
+
+    def __init__(self):
+        # (cluster, collection name) -> documents
+        self.collections: Dict[Tuple[str, str], List[dict]] = {}
+        # (cluster, collection name) -> version of the last template applied
+        self.templates: Dict[Tuple[str, str], int] = {}
+        self.stats: Dict[ObjectId, dict] = {}
+        self.fleet_stats: Optional[dict] = None
+
+    async def create(self, collection_name: str, cluster: Optional[str], metadata: dict, template: dict):
+        key = (cluster or DEFAULT_CLUSTER, collection_name)
+        self.collections.setdefault(key, []).append({"_id": ObjectId(), "_metadata": dict(metadata)})
+        await self.apply_template(collection_name, cluster, template)
+
+    async def apply_template(self, collection_name: str, cluster: Optional[str], template: dict):
+        key = (cluster or DEFAULT_CLUSTER, collection_name)
+        if key not in self.collections:
+            raise ValueError(f"Collection '{collection_name}' does not exist")
+        self.templates[key] = template["version"]
+
+    async def drop(self, collection_name: str, cluster: Optional[str]):
+        self.collections.pop((cluster or DEFAULT_CLUSTER, collection_name), None)
+        self.templates.pop((cluster or DEFAULT_CLUSTER, collection_name), None)
+
+    async def get_stats(self, organization_id: ObjectId) -> Optional[dict]:
+        return _project(self.stats.get(organization_id), None)
+
+    async def remove_stats(self, organization_id: ObjectId):
+        self.stats.pop(organization_id, None)
+
+    async def ensure(self, collection_name: str, cluster: Optional[str], template: dict):
+        self.collections.setdefault((cluster or DEFAULT_CLUSTER, collection_name), [])
+        await self.apply_template(collection_name, cluster, template)
+
+    async def collection_stats(self, collection_name: str, cluster: Optional[str]) -> dict:
+        documents = self.collections.get((cluster or DEFAULT_CLUSTER, collection_name), [])
+        ids = [document["_id"] for document in documents if isinstance(document.get("_id"), ObjectId)]
+        return {
+            "document_count": len(documents),
+            "data_size": sum(len(bson.encode(document)) for document in documents),
+            "index_size": 0,
+            "last_write_at": max(ids).generation_time.replace(tzinfo=None) if ids else None
+        }
+
+    async def save_stats(self, stats: List[dict]):
+        for entry in stats:
+            self.stats[entry["_id"]] = _copy(entry)
+
+    async def get_fleet_stats(self) -> Optional[dict]:
+        return _copy(self.fleet_stats) if self.fleet_stats is not None else None
+
+    async def save_fleet_stats(self, fleet: dict):
+        self.fleet_stats = _copy(fleet)
+
+
+class MemoryTokenRevocationRepository(TokenRevocationRepository):
+
+    def __init__(self):
+        self.revocations: Dict[ObjectId, dict] = {}
+
+    async def revoke(self, admin_id: ObjectId, token_version: int, expires_at: datetime):
+        current = self.revocations.get(admin_id)
+        if current:
+            token_version = max(token_version, current["token_version"])
+            expires_at = max(expires_at, current["expires_at"])
+        self.revocations[admin_id] = {"_id": admin_id, "token_version": token_version, "expires_at": expires_at}
+
+    async def list_active(self, now: datetime) -> List[dict]:
+        return [
+            {"_id": admin_id, "token_version": revocation["token_version"]}
+            for admin_id, revocation in self.revocations.items()
+            if revocation["expires_at"] > now
+        ]
+
+
+class MemoryAuditRepository(AuditRepository):
+
+    def __init__(self):
+        # In insertion order, which is also _id order
+        self.events: List[dict] = []
+
+    async def append(self, events: List[dict]):
+        for event in events:
+            self.events.append(dict(_copy(event), _id=event.get("_id") or ObjectId()))
+
+    async def list(self, organization_name: Optional[str], before: Optional[ObjectId], limit: int) -> List[dict]:
+        results = []
+        for event in reversed(self.events):
+            if organization_name is not None and event.get("organization_name") != organization_name:
+                continue
+            if before is not None and event["_id"] >= before:
+                continue
+            results.append(_copy(event))
+            if len(results) >= limit:
+                break
+        return results
+
+
+def build_memory_repositories() -> Repositories:
+    return Repositories(
+        organizations=MemoryOrganizationRepository(),
+        admin_users=MemoryAdminUserRepository(),
+        tenants=MemoryTenantRepository(),
+        token_revocations=MemoryTokenRevocationRepository(),
+        audit=MemoryAuditRepository()
+    )
@@ -0,0 +1,343 @@
+"""MongoDB repositories backed by Motor."""
+import re
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
+from bson import ObjectId
+from pymongo import IndexModel, ReplaceOne, ReturnDocument, UpdateOne
+from pymongo.errors import OperationFailure
+from app.core.database import PRIMARY, get_master_db, get_org_collection, get_tenant_db
+from app.repositories.base import (
+    AdminUserRepository,
+    AuditRepository,
+    OrganizationRepository,
+    Repositories,
+    TenantRepository,
+    TokenRevocationRepository
+)
+from app.utils.naming import name_trigrams
+
+# _id of the single fleet_stats document
+FLEET_STATS_ID = "fleet"
+
+
+class MotorOrganizationRepository(OrganizationRepository):
+
+    async def _collection(self, read: str = PRIMARY):
+        master_db = await get_master_db(read)
+        return master_db.organizations
+
+    async def find_by_name(
+        self, organization_name: str, projection: Optional[dict] = None, read: str = PRIMARY
+    ) -> Optional[dict]:
+        organizations = await self._collection(read)
+        return await organizations.find_one({"organization_name": organization_name}, projection=projection)
+
+    async def find_by_id(
+        self, organization_id: ObjectId, projection: Optional[dict] = None, read: str = PRIMARY
+    ) -> Optional[dict]:
+        organizations = await self._collection(read)
+        return await organizations.find_one({"_id": organization_id}, projection=projection)
+
+    async def insert(self, document: dict) -> ObjectId:
+        organizations = await self._collection()
+        result = await organizations.insert_one(document)
+        return result.inserted_id
+
+    async def update_versioned(
+        self,
+        organization_id: ObjectId,
+        version: Optional[int],
+        fields: dict,
+        projection: Optional[dict] = None
+    ) -> Optional[dict]:
+        organizations = await self._collection()
+        # {"version": None} also matches documents created before versioning
+        return await organizations.find_one_and_update(
+            {"_id": organization_id, "version": version},
+            {"$set": fields, "$inc": {"version": 1}},
+            projection=projection,
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def delete(self, organization_id: ObjectId) -> bool:
+        organizations = await self._collection()
+        result = await organizations.delete_one({"_id": organization_id})
+        return result.deleted_count == 1
+
+    async def search(
+        self,
+        normalized_query: str,
+        mode: str,
+        after: Optional[Tuple[str, ObjectId]],
+        limit: int,
+        projection: Optional[dict] = None,
+        read: str = PRIMARY
+    ) -> List[dict]:
+        # Prefix mode is a range scan over the name_normalized index. Substring
+        # mode narrows candidates with the name_trigrams index and confirms the
+        # match on name_normalized.
+        if mode == "substring":
+            filters = [
+                {"name_trigrams": {"$all": name_trigrams(normalized_query)}},
+                {"name_normalized": {"$regex": re.escape(normalized_query)}}
+            ]
+        else:
+            # "\uffff" sorts after every character, closing the prefix range
+            filters = [{"name_normalized": {"$gte": normalized_query, "$lt": normalized_query + "\uffff"}}]
+
+        if after:
+            last_name, last_id = after
+            filters.append({"$or": [
+                {"name_normalized": {"$gt": last_name}},
+                {"name_normalized": last_name, "_id": {"$gt": last_id}}
+            ]})
+
+        organizations = await self._collection(read)
+        return await organizations.find(
+            {"$and": filters}, projection=projection
+        ).sort([("name_normalized", 1), ("_id", 1)]).limit(limit).to_list(length=limit)
+
+    async def list_tombstoned(self, limit: int, projection: Optional[dict] = None) -> List[dict]:
+        organizations = await self._collection()
+        return await organizations.find(
+            {"deleted_at": {"$exists": True}}, projection=projection
+        ).sort("deleted_at", 1).limit(limit).to_list(length=limit)
+
+    @staticmethod
+    def _template_outdated_filter(version: int) -> dict:
+        return {
+            "$or": [{"template_version": {"$lt": version}}, {"template_version": {"$exists": False}}],
+            "deleted_at": {"$exists": False}
+        }
+
+    async def count_template_outdated(self, version: int) -> int:
+        organizations = await self._collection()
+        return await organizations.count_documents(self._template_outdated_filter(version))
+
+    async def list_template_outdated(
+        self,
+        version: int,
+        after: Optional[ObjectId],
+        limit: int,
+        projection: Optional[dict] = None
+    ) -> List[dict]:
+        query = self._template_outdated_filter(version)
+        if after is not None:
+            query["_id"] = {"$gt": after}
+        organizations = await self._collection()
+        return await organizations.find(query, projection=projection).sort("_id", 1).limit(limit).to_list(length=limit)
+
+    async def iter_missing_search_fields(self, batch_size: int) -> AsyncIterator[dict]:
+        organizations = await self._collection()
+        cursor = organizations.find(
+            {"name_normalized": {"$exists": False}},
+            projection={"organization_name": 1}
+        ).batch_size(batch_size)
+        async for org_doc in cursor:
+            yield org_doc
+
+    async def set_fields_many(self, updates: List[Tuple[ObjectId, dict]]):
+        if not updates:
+            return
+        organizations = await self._collection()
+        await organizations.bulk_write(
+            [UpdateOne({"_id": organization_id}, {"$set": fields}) for organization_id, fields in updates],
+            ordered=False
+        )
+
+    async def iter_live(self, batch_size: int, projection: Optional[dict] = None) -> AsyncIterator[dict]:
+        organizations = await self._collection()
+        cursor = organizations.find(
+            {"deleted_at": {"$exists": False}}, projection=projection
+        ).batch_size(batch_size)
+        async for org_doc in cursor:
+            yield org_doc
+
+    async def update_where(
+        self,
+        organization_id: ObjectId,
+        match: dict,
+        fields: dict,
+        unset: Tuple[str, ...] = (),
+        inc: Optional[dict] = None
+    ) -> bool:
+        # An empty $set is an error
+        update = {"$set": fields} if fields else {}
+        if unset:
+            update["$unset"] = {field: "" for field in unset}
+        if inc:
+            update["$inc"] = inc
+        organizations = await self._collection()
+        result = await organizations.update_one({"_id": organization_id, **match}, update)
+        return result.matched_count == 1
+
+
+class MotorAdminUserRepository(AdminUserRepository):
+
+    async def _collection(self, read: str = PRIMARY):
+        master_db = await get_master_db(read)
+        return master_db.admin_users
+
+    async def find_by_email(self, email: str, projection: Optional[dict] = None, read: str = PRIMARY) -> Optional[dict]:
+        admin_users = await self._collection(read)
+        return await admin_users.find_one({"email": email}, projection=projection)
+
+    async def find_by_id(self, admin_id: ObjectId, projection: Optional[dict] = None, read: str = PRIMARY) -> Optional[dict]:
+        admin_users = await self._collection(read)
+        return await admin_users.find_one({"_id": admin_id}, projection=projection)
+
+    async def insert(self, document: dict) -> ObjectId:
+        admin_users = await self._collection()
+        result = await admin_users.insert_one(document)
+        return result.inserted_id
+
+    async def update(self, admin_id: ObjectId, fields: dict, expected: Optional[dict] = None):
+        admin_users = await self._collection()
+        await admin_users.update_one({"_id": admin_id, **(expected or {})}, {"$set": fields})
+
+    async def bump_token_version(self, admin_id: ObjectId) -> Optional[int]:
+        admin_users = await self._collection()
+        document = await admin_users.find_one_and_update(
+            {"_id": admin_id},
+            {"$inc": {"token_version": 1}},
+            projection={"token_version": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        return document["token_version"] if document else None
+
+    async def delete(self, admin_id: ObjectId) -> bool:
+        admin_users = await self._collection()
+        result = await admin_users.delete_one({"_id": admin_id})
+        return result.deleted_count == 1
+
+
+class MotorTenantRepository(TenantRepository):
+
+    async def create(self, collection_name: str, cluster: Optional[str], metadata: dict, template: dict):
+        tenant_db = await get_tenant_db(cluster)
+        # Collation can only be chosen when the collection is created
+        options = {"collation": template["collation"]} if template.get("collation") else {}
+        org_collection = await tenant_db.create_collection(collection_name, **options)
+        # Inserted before the validator is set, so the template need not allow it
+        await org_collection.insert_one({"_metadata": metadata})
+        await self.apply_template(collection_name, cluster, template)
+
+    async def apply_template(self, collection_name: str, cluster: Optional[str], template: dict):
+        tenant_db = await get_tenant_db(cluster)
+        # create_indexes would silently create a missing collection
+        if not await tenant_db.list_collection_names(filter={"name": collection_name}):
+            raise ValueError(f"Collection '{collection_name}' does not exist")
+        await tenant_db.command(
+            "collMod",
+            collection_name,
+            validator=template.get("validator") or {},
+            validationLevel=template.get("validation_level", "moderate")
+        )
+        if template.get("indexes"):
+            await tenant_db[collection_name].create_indexes([
+                IndexModel(
+                    [tuple(key) for key in index["keys"]],
+                    **{option: value for option, value in index.items() if option != "keys"}
+                )
+                for index in template["indexes"]
+            ])
+
+    async def drop(self, collection_name: str, cluster: Optional[str]):
+        org_collection = await get_org_collection(collection_name, cluster)
+        await org_collection.drop()
+
+    async def get_stats(self, organization_id: ObjectId) -> Optional[dict]:
+        master_db = await get_master_db()
+        return await master_db.tenant_stats.find_one({"_id": organization_id})
+
+    async def remove_stats(self, organization_id: ObjectId):
+        master_db = await get_master_db()
+        await master_db.tenant_stats.delete_one({"_id": organization_id})
+
+    async def ensure(self, collection_name: str, cluster: Optional[str], template: dict):
+        tenant_db = await get_tenant_db(cluster)
+        if not await tenant_db.list_collection_names(filter={"name": collection_name}):
+            options = {"collation": template["collation"]} if template.get("collation") else {}
+            await tenant_db.create_collection(collection_name, **options)
+        await self.apply_template(collection_name, cluster, template)
+
+    async def collection_stats(self, collection_name: str, cluster: Optional[str]) -> dict:
+        tenant_db = await get_tenant_db(cluster)
+        try:
+            coll_stats = await tenant_db.command("collStats", collection_name)
+        except OperationFailure:
+            # Older servers report a missing collection as an error
+            coll_stats = {}
+
+        # ObjectId _ids embed their creation time, so the newest one
+        # approximates the last insert without scanning the collection.
+        newest = await tenant_db[collection_name].find_one({}, projection={"_id": 1}, sort=[("_id", -1)])
+        last_write_at = None
+        if newest and isinstance(newest["_id"], ObjectId):
+            last_write_at = newest["_id"].generation_time.replace(tzinfo=None)
+        return {
+            "document_count": coll_stats.get("count", 0),
+            "data_size": coll_stats.get("size", 0),
+            "index_size": coll_stats.get("totalIndexSize", 0),
+            "last_write_at": last_write_at
+        }
+
+    async def save_stats(self, stats: List[dict]):
+        if not stats:
+            return
+        master_db = await get_master_db()
+        await master_db.tenant_stats.bulk_write(
+            [ReplaceOne({"_id": entry["_id"]}, entry, upsert=True) for entry in stats],
+            ordered=False
+        )
+
+    async def get_fleet_stats(self) -> Optional[dict]:
+        master_db = await get_master_db()
+        return await master_db.fleet_stats.find_one({"_id": FLEET_STATS_ID})
+
+    async def save_fleet_stats(self, fleet: dict):
+        master_db = await get_master_db()
+        await master_db.fleet_stats.replace_one({"_id": FLEET_STATS_ID}, dict(fleet, _id=FLEET_STATS_ID), upsert=True)
+
+
+class MotorTokenRevocationRepository(TokenRevocationRepository):
+
+    async def revoke(self, admin_id: ObjectId, token_version: int, expires_at: datetime):
+        master_db = await get_master_db()
+        await master_db.token_revocations.update_one(
+            {"_id": admin_id},
+            {"$max": {"token_version": token_version, "expires_at": expires_at}},
+            upsert=True
+        )
+
+    async def list_active(self, now: datetime) -> List[dict]:
+        # The TTL index removes expired entries, but only once a minute
+        master_db = await get_master_db()
+        cursor = master_db.token_revocations.find({"expires_at": {"$gt": now}}, projection={"token_version": 1})
+        return await cursor.to_list(length=None)
+
+
+class MotorAuditRepository(AuditRepository):
+
+    async def append(self, events: List[dict]):
+        master_db = await get_master_db()
+        await master_db.audit_log.insert_many(events, ordered=False)
+
+    async def list(self, organization_name: Optional[str], before: Optional[ObjectId], limit: int) -> List[dict]:
+        query = {}
+        if organization_name is not None:
+            query["organization_name"] = organization_name
+        if before is not None:
+            query["_id"] = {"$lt": before}
+        master_db = await get_master_db()
+        return await master_db.audit_log.find(query).sort("_id", -1).limit(limit).to_list(length=limit)
+
+
+def build_motor_repositories() -> Repositories:
+    return Repositories(
+        organizations=MotorOrganizationRepository(),
+        admin_users=MotorAdminUserRepository(),
+        tenants=MotorTenantRepository(),
+        token_revocations=MotorTokenRevocationRepository(),
+        audit=MotorAuditRepository()
+    )
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+
+class AuditEvent(BaseModel):
+    id: str
+    action: str  # e.g. org.create, org.update, org.delete, admin.login
+    organization_name: Optional[str] = None
+    actor: Optional[str] = None
+    details: dict = {}
+    at: datetime
+
+
+class AuditEventPage(BaseModel):
+    items: List[AuditEvent]
+    next_before: Optional[str] = None  # Pass back as `before` to fetch older events
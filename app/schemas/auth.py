@@ -6,8 +6,14 @@ class AdminLogin(BaseModel):
     password: str
 
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
 class TokenResponse(BaseModel):
     access_token: str
+    # Exchanged for a new access token at POST /admin/refresh
+    refresh_token: str
     token_type: str = "bearer"
     admin_id: str
     organization_id: str
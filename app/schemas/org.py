@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field
+from typing import Dict, List, Optional
 from datetime import datetime
 
 
@@ -14,6 +14,7 @@ class OrganizationUpdate(BaseModel):
     email: EmailStr
     password: str
     new_organization_name: Optional[str] = None  # Optional: rename organization
+    expected_version: Optional[int] = None  # Optional: reject update if org changed
 
 
 class OrganizationResponse(BaseModel):
@@ -22,11 +23,52 @@ class OrganizationResponse(BaseModel):
     admin_email: str
     created_at: datetime
     updated_at: datetime
+    version: int = 1
+    cluster: str = "default"  # Cluster holding the organization's collection
     
     class Config:
         from_attributes = True
 
 
+class OrganizationSearchResponse(BaseModel):
+    items: List[OrganizationResponse]
+    next_cursor: Optional[str] = None  # Pass back as `cursor` to fetch the next page
+
+
+class DeprovisionRequest(BaseModel):
+    organization_names: List[str] = Field(..., min_length=1, max_length=1000)
+
+
+class DeprovisionResponse(BaseModel):
+    deleted: List[str]
+    not_found: List[str]
+    failed: Dict[str, str] = {}  # Name -> reason, e.g. a concurrent update; safe to retry
+
+
+class TenantStatsResponse(BaseModel):
+    organization_name: str
+    collection_name: str
+    document_count: int
+    data_size: int  # Uncompressed BSON bytes
+    index_size: int
+    last_write_at: Optional[datetime] = None  # Creation time of the newest ObjectId _id
+    refreshed_at: datetime
+
+
+class ClusterStatsResponse(BaseModel):
+    tenants: int
+    data_size: int
+
+
+class FleetStatsResponse(BaseModel):
+    tenants: int
+    document_count: int
+    data_size: int
+    index_size: int
+    clusters: Dict[str, ClusterStatsResponse] = {}  # Totals per tenant cluster
+    refreshed_at: datetime
+
+
 class OrganizationGet(BaseModel):
     organization_name: str
 
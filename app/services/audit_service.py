@@ -0,0 +1,171 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Optional
+from bson import ObjectId
+from bson.errors import InvalidId
+from app.core.config import settings
+from app.core.metrics import registry
+from app.repositories import get_repositories
+
+logger = logging.getLogger(__name__)
+
+events_emitted = registry.counter("org_audit_events_emitted_total", "Audit events accepted into the queue", ["action"])
+events_dropped = registry.counter("org_audit_events_dropped_total", "Audit events dropped because the queue was full")
+events_written = registry.counter("org_audit_events_written_total", "Audit events written to master_db")
+flush_failures = registry.counter("org_audit_flush_failures_total", "Audit batches that failed to write")
+queue_depth = registry.gauge("org_audit_queue_depth", "Audit events waiting to be written")
+
+
+class AuditLog:
+    """
+    Write-behind audit log.
+
+    Services emit events into a bounded in-process queue and return
+    immediately; a background task appends them to the audit repository
+    (master_db.audit_log on MongoDB) in batches, flushing whenever a batch fills up or
+    audit_flush_seconds passes. When the queue is full, events are either
+    dropped and counted or the caller waits, depending on audit_overflow.
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # Events taken off the queue but not yet written; stop() flushes them
+        self._pending: List[dict] = []
+
+    @property
+    def queue(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=settings.audit_queue_size)
+        return self._queue
+
+    async def emit(
+        self,
+        action: str,
+        organization_name: Optional[str] = None,
+        actor: Optional[str] = None,
+        details: Optional[dict] = None
+    ):
+        """Queue an audit event without waiting for it to be stored."""
+        event = {
+            "action": action,
+            "organization_name": organization_name,
+            "actor": actor,
+            "details": details or {},
+            "at": datetime.utcnow()
+        }
+        if settings.audit_overflow == "block":
+            await self.queue.put(event)
+        else:
+            try:
+                self.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                events_dropped.inc()
+                return
+        events_emitted.inc(action=action)
+        queue_depth.set(self.queue.qsize())
+
+    def start(self):
+        """Start the background flusher on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="audit-log-flusher")
+
+    async def stop(self):
+        """Stop the flusher and write out every event still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        batch, self._pending = self._pending, []
+        while batch or not self.queue.empty():
+            await self._write(self._drain(settings.audit_batch_size, batch))
+            batch = []
+
+    def _drain(self, limit: int, batch: Optional[List[dict]] = None) -> List[dict]:
+        batch = batch if batch is not None else []
+        while len(batch) < limit and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        queue_depth.set(self.queue.qsize())
+        return batch
+
+    async def _fill_pending(self):
+        """Wait for the first event, then collect more until the batch fills or the flush interval ends."""
+        self._pending.append(await self.queue.get())
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.audit_flush_seconds
+        while len(self._pending) < settings.audit_batch_size:
+            self._drain(settings.audit_batch_size, self._pending)
+            remaining = deadline - loop.time()
+            if len(self._pending) >= settings.audit_batch_size or remaining <= 0:
+                break
+            try:
+                self._pending.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        queue_depth.set(self.queue.qsize())
+
+    async def _write(self, batch: List[dict]):
+        if not batch:
+            return
+        try:
+            await get_repositories().audit.append(batch)
+            events_written.inc(len(batch))
+        except Exception:
+            flush_failures.inc()
+            logger.exception("Failed to write %d audit events", len(batch))
+
+    async def _run(self):
+        while True:
+            await self._fill_pending()
+            await self._write(self._pending)
+            self._pending = []
+
+
+audit_log = AuditLog()
+
+
+class AuditService:
+    """Service for querying the audit log."""
+
+    @staticmethod
+    async def list_events(
+        organization_name: Optional[str] = None,
+        limit: int = 50,
+        before: Optional[str] = None
+    ) -> dict:
+        """
+        List audit events newest first.
+        Pages are keyed on _id, so pass the returned next_before to continue.
+        """
+        before_id = None
+        if before:
+            try:
+                before_id = ObjectId(before)
+            except InvalidId:
+                raise ValueError("Invalid audit cursor")
+
+        docs = await get_repositories().audit.list(organization_name, before_id, limit + 1)
+
+        next_before = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            next_before = str(docs[-1]["_id"])
+
+        return {
+            "items": [
+                {
+                    "id": str(doc["_id"]),
+                    "action": doc["action"],
+                    "organization_name": doc.get("organization_name"),
+                    "actor": doc.get("actor"),
+                    "details": doc.get("details", {}),
+                    "at": doc["at"]
+                }
+                for doc in docs
+            ],
+            "next_before": next_before
+        }
@@ -1,75 +1,241 @@
-from typing import Optional
+import time
+from typing import Dict, Optional
 from bson import ObjectId
-from datetime import timedelta
-from app.core.database import get_master_db
-from app.core.security import verify_password, create_access_token
+from datetime import datetime, timedelta
+from app.core.background import PeriodicTask
+from app.core.security import verify_password_async, create_access_token, decode_access_token
 from app.core.config import settings
+from app.core.database import recent_writes, serves_latest
+from app.core.metrics import registry
+from app.core.tracing import traced
+from app.models.master import AdminUser
+from app.repositories import get_repositories
+from app.services.audit_service import audit_log
+
+REFRESH_TOKEN_TYPE = "refresh"
+
+stateless_auth = registry.counter(
+    "org_auth_stateless_total", "Authenticated requests by how the token was verified", ["result"]
+)
+
+
+class TokenRevocations:
+    """
+    The lowest valid token version per admin, mirrored from the
+    token_revocations collection so stateless verification needs no I/O.
+    Revocations made by this instance apply at once; those made by other
+    instances once the next refresh has run.
+    """
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        # Revocations noted while a refresh is reading, re-applied to its result
+        self._noted: Optional[Dict[str, int]] = None
+        self._refreshed_at: Optional[float] = None
+
+    def note(self, admin_id: str, token_version: int):
+        self._versions[admin_id] = max(self._versions.get(admin_id, 0), token_version)
+        if self._noted is not None:
+            self._noted[admin_id] = max(self._noted.get(admin_id, 0), token_version)
+
+    def allows(self, admin_id: str, token_version: int) -> bool:
+        return token_version >= self._versions.get(admin_id, 0)
+
+    def current(self) -> bool:
+        """Whether the map was refreshed recently enough to verify tokens with."""
+        if self._refreshed_at is None:
+            return False
+        return time.monotonic() - self._refreshed_at <= 3 * settings.token_revocation_refresh_seconds
+
+    async def refresh(self):
+        self._noted = {}
+        try:
+            revocations = await get_repositories().token_revocations.list_active(datetime.utcnow())
+            versions = {str(doc["_id"]): doc["token_version"] for doc in revocations}
+            for admin_id, token_version in self._noted.items():
+                versions[admin_id] = max(versions.get(admin_id, 0), token_version)
+            self._versions = versions
+            self._refreshed_at = time.monotonic()
+        finally:
+            self._noted = None
+
+
+token_revocations = TokenRevocations()
+revocation_refresher = PeriodicTask(
+    "token-revocation-refresher", lambda: settings.token_revocation_refresh_seconds, token_revocations.refresh
+)
 
 
 class AuthService:
     """Service for handling authentication."""
     
     @staticmethod
+    @traced("AuthService.login")
     async def login(email: str, password: str) -> dict:
-        """Authenticate admin user and return JWT token."""
-        master_db = await get_master_db()
+        """
+        Authenticate admin user and return JWT token.
+        Reads from the primary, so a password just changed is in effect at once.
+        """
+        repos = get_repositories()
         
         # Find admin user
-        admin_doc = await master_db.admin_users.find_one({"email": email})
+        admin_doc = await repos.admin_users.find_by_email(email, projection=AdminUser.PROJECTION)
         if not admin_doc:
+            await audit_log.emit("admin.login_failed", actor=email, details={"reason": "unknown_email"})
             raise ValueError("Invalid email or password")
+        admin = AdminUser.from_dict(admin_doc)
         
         # Verify password
-        if not verify_password(password, admin_doc["hashed_password"]):
+        if not await verify_password_async(password, admin.hashed_password):
+            await audit_log.emit(
+                "admin.login_failed", admin.organization_name, actor=email, details={"reason": "bad_password"}
+            )
             raise ValueError("Invalid email or password")
         
-        # Get organization details
-        org_doc = await master_db.organizations.find_one(
-            {"organization_name": admin_doc["organization_name"]}
-        )
-        if not org_doc:
+        # Confirm the organization still exists and is not deleted. Admins
+        # left without organization_id by older partial creates are matched
+        # by name instead.
+        if admin.organization_id:
+            org_doc = await repos.organizations.find_by_id(
+                ObjectId(admin.organization_id), projection={"deleted_at": 1}
+            )
+        else:
+            org_doc = await repos.organizations.find_by_name(admin.organization_name, projection={"deleted_at": 1})
+        if not org_doc or "deleted_at" in org_doc:
             raise ValueError("Organization not found for admin user")
         
-        # Create JWT token
+        admin.organization_id = str(org_doc["_id"])
+        await audit_log.emit("admin.login", admin.organization_name, actor=email)
+        return AuthService._issue_tokens(admin)
+    
+    @staticmethod
+    def _issue_tokens(admin: AdminUser, refresh_token: Optional[str] = None) -> dict:
+        """Build the login response: an access token and, unless given, a refresh token."""
         token_data = {
-            "admin_id": str(admin_doc["_id"]),
-            "organization_id": str(org_doc["_id"]),
-            "organization_name": admin_doc["organization_name"],
-            "email": email
+            "admin_id": str(admin.id),
+            "organization_id": admin.organization_id,
+            "organization_name": admin.organization_name,
+            "email": admin.email,
+            "ver": admin.token_version
         }
         
-        expires_delta = timedelta(minutes=settings.jwt_expire_minutes)
+        if settings.auth_mode == "stateless":
+            expires_delta = timedelta(minutes=settings.access_token_expire_minutes)
+        else:
+            expires_delta = timedelta(minutes=settings.jwt_expire_minutes)
         access_token = create_access_token(token_data, expires_delta)
+        if refresh_token is None:
+            refresh_token = create_access_token(
+                {"admin_id": str(admin.id), "ver": admin.token_version, "type": REFRESH_TOKEN_TYPE},
+                timedelta(minutes=settings.refresh_token_expire_minutes)
+            )
         
         return {
             "access_token": access_token,
+            "refresh_token": refresh_token,
             "token_type": "bearer",
-            "admin_id": str(admin_doc["_id"]),
-            "organization_id": str(org_doc["_id"]),
-            "organization_name": admin_doc["organization_name"]
+            "admin_id": str(admin.id),
+            "organization_id": admin.organization_id,
+            "organization_name": admin.organization_name
         }
     
     @staticmethod
+    @traced("AuthService.refresh")
+    async def refresh(refresh_token: str) -> dict:
+        """
+        Issue a new access token for a refresh token.
+        The admin is read from the primary, so a refresh token revoked on
+        any instance is refused at once.
+        """
+        payload = decode_access_token(refresh_token)
+        if not payload or payload.get("type") != REFRESH_TOKEN_TYPE:
+            raise ValueError("Invalid refresh token")
+        admin_id = payload.get("admin_id")
+        if not isinstance(admin_id, str) or not ObjectId.is_valid(admin_id):
+            raise ValueError("Invalid refresh token")
+        
+        admin_doc = await get_repositories().admin_users.find_by_id(
+            ObjectId(admin_id), projection=AdminUser.PROFILE_PROJECTION
+        )
+        if not admin_doc:
+            raise ValueError("Invalid refresh token")
+        admin = AdminUser.from_dict(admin_doc)
+        if payload.get("ver", 0) < admin.token_version:
+            raise ValueError("Refresh token has been revoked")
+        
+        return AuthService._issue_tokens(admin, refresh_token=refresh_token)
+    
+    @staticmethod
+    @traced("AuthService.revoke_tokens")
+    async def revoke_tokens(admin_id: str):
+        """
+        Revoke every token issued to an admin so far, after a password,
+        email or organization name change, or before the admin is deleted.
+        """
+        repos = get_repositories()
+        token_version = await repos.admin_users.bump_token_version(ObjectId(admin_id))
+        if token_version is None:
+            return
+        # Kept until the longest-lived token issued before now has expired
+        lifetime = max(
+            settings.jwt_expire_minutes, settings.access_token_expire_minutes, settings.refresh_token_expire_minutes
+        )
+        await repos.token_revocations.revoke(
+            ObjectId(admin_id), token_version, datetime.utcnow() + timedelta(minutes=lifetime)
+        )
+        token_revocations.note(admin_id, token_version)
+    
+    @staticmethod
+    @traced("AuthService.get_current_admin")
     async def get_current_admin(token: str) -> Optional[dict]:
-        """Get current admin user from JWT token."""
-        from app.core.security import decode_access_token
+        """
+        Get current admin user from JWT token.
         
+        In stateless mode the token's own claims are trusted once its
+        version is checked against the revocation map, so no database is
+        read. Tokens without a version, and any token while the map is not
+        current, are verified by reading the admin as in lookup mode.
+        """
         payload = decode_access_token(token)
-        if not payload:
+        if not payload or payload.get("type") == REFRESH_TOKEN_TYPE:
+            return None
+        admin_id = payload.get("admin_id")
+        if not isinstance(admin_id, str) or not ObjectId.is_valid(admin_id):
             return None
         
-        master_db = await get_master_db()
-        admin_doc = await master_db.admin_users.find_one(
-            {"_id": ObjectId(payload.get("admin_id"))}
-        )
+        if settings.auth_mode == "stateless" and "ver" in payload and token_revocations.current():
+            if not token_revocations.allows(admin_id, payload["ver"]):
+                stateless_auth.inc(result="revoked")
+                return None
+            stateless_auth.inc(result="accepted")
+            return {
+                "admin_id": admin_id,
+                "email": payload["email"],
+                "organization_name": payload["organization_name"],
+                "organization_id": payload["organization_id"]
+            }
+        
+        # Runs on every authenticated request; skip the password hash, and
+        # read per READ_PREFERENCE unless this instance changed the admin
+        # recently. Admins missing from a secondary are looked up again on
+        # the primary, as they may have just been created.
+        admin_users = get_repositories().admin_users
+        read = recent_writes.route(admin_id)
+        admin_doc = await admin_users.find_by_id(ObjectId(admin_id), projection=AdminUser.PROFILE_PROJECTION, read=read)
+        if not admin_doc and not serves_latest(read):
+            admin_doc = await admin_users.find_by_id(ObjectId(admin_id), projection=AdminUser.PROFILE_PROJECTION)
         
         if not admin_doc:
             return None
+        admin = AdminUser.from_dict(admin_doc)
+        # Tokens issued before a revocation stay revoked when they are checked here
+        if payload.get("ver", 0) < admin.token_version:
+            return None
         
         return {
-            "admin_id": str(admin_doc["_id"]),
-            "email": admin_doc["email"],
-            "organization_name": admin_doc["organization_name"],
-            "organization_id": admin_doc["organization_id"]
+            "admin_id": str(admin.id),
+            "email": admin.email,
+            "organization_name": admin.organization_name,
+            "organization_id": admin.organization_id
         }
 
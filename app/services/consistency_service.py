@@ -0,0 +1,280 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+from bson import ObjectId
+from bson.errors import InvalidId
+from app.core.config import settings
+from app.core.database import DEFAULT_CLUSTER, cluster_names, get_master_db, get_tenant_db
+
+# Documents or collection names checked per query
+CHECK_BATCH_SIZE = 1000
+# Findings kept per category in the report; the counts are always exact
+REPORT_SAMPLE_LIMIT = 100
+# Records younger than this may belong to a create that is still running
+CHECK_GRACE_SECONDS = 300
+
+
+class ConsistencyReport:
+    """Counts of each kind of inconsistency, with a bounded sample of each."""
+
+    CATEGORIES = (
+        "orphaned_admins",
+        "stale_admin_names",
+        "organizations_without_admin",
+        "organizations_without_collection",
+        "unowned_collections",
+    )
+
+    def __init__(self, repair: bool):
+        self.repair = repair
+        self.started_at = datetime.utcnow()
+        self.counts = {category: 0 for category in self.CATEGORIES}
+        self.samples = {category: [] for category in self.CATEGORIES}
+        self.repaired = {category: 0 for category in self.CATEGORIES}
+        self.scanned = {"organizations": 0, "admin_users": 0, "collections": 0}
+
+    def add(self, category: str, finding: dict):
+        self.counts[category] += 1
+        if len(self.samples[category]) < REPORT_SAMPLE_LIMIT:
+            self.samples[category].append(finding)
+
+    def to_dict(self) -> dict:
+        return {
+            "repair": self.repair,
+            "started_at": self.started_at,
+            "finished_at": datetime.utcnow(),
+            "scanned": self.scanned,
+            "counts": self.counts,
+            "repaired": self.repaired,
+            "samples": self.samples,
+            "consistent": not any(self.counts.values())
+        }
+
+
+async def _for_each_batch(cursor, handle: Callable[[list], Awaitable[None]]):
+    """
+    Feed a cursor to handle() in batches, running at most
+    consistency_check_concurrency batches at once. The cursor is not read
+    further while every slot is busy, so memory stays bounded. The first
+    error raised by handle() stops the scan and is raised once the batches
+    already running have finished.
+    """
+    semaphore = asyncio.Semaphore(max(1, settings.consistency_check_concurrency))
+    tasks = set()
+    failures = []
+
+    async def run(batch: list):
+        try:
+            await handle(batch)
+        except Exception as exc:
+            # Kept here: finished tasks leave the set before the final gather
+            failures.append(exc)
+        finally:
+            semaphore.release()
+
+    async def submit(batch: list):
+        await semaphore.acquire()
+        task = asyncio.create_task(run(batch))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    batch = []
+    try:
+        async for item in cursor:
+            if failures:
+                break
+            batch.append(item)
+            if len(batch) >= CHECK_BATCH_SIZE:
+                await submit(batch)
+                batch = []
+        if batch and not failures:
+            await submit(batch)
+    finally:
+        await asyncio.gather(*tasks)
+    if failures:
+        raise failures[0]
+
+
+def _is_recent(object_id, cutoff: datetime) -> bool:
+    return isinstance(object_id, ObjectId) and object_id.generation_time.replace(tzinfo=None) > cutoff
+
+
+class ConsistencyService:
+    """Service cross-checking master metadata against the tenant collections."""
+
+    @staticmethod
+    async def _check_admins(master_db, report: ConsistencyReport, cutoff: datetime):
+        """Admins whose organization is gone, or whose copy of its name is out of date."""
+
+        async def handle(admins: list):
+            report.scanned["admin_users"] += len(admins)
+            org_ids = []
+            for admin in admins:
+                try:
+                    org_ids.append(ObjectId(admin.get("organization_id")))
+                except (InvalidId, TypeError):
+                    pass
+            orgs = {
+                org["_id"]: org
+                async for org in master_db.organizations.find(
+                    {"_id": {"$in": org_ids}}, projection={"organization_name": 1, "deleted_at": 1}
+                )
+            }
+
+            orphans = []
+            for admin in admins:
+                try:
+                    org = orgs.get(ObjectId(admin.get("organization_id")))
+                except (InvalidId, TypeError):
+                    org = None
+                # An admin left behind by a deletion is an orphan too
+                if org is None or "deleted_at" in org:
+                    if _is_recent(admin["_id"], cutoff):
+                        continue
+                    report.add("orphaned_admins", {
+                        "admin_id": str(admin["_id"]),
+                        "email": admin.get("email"),
+                        "organization_name": admin.get("organization_name")
+                    })
+                    orphans.append(admin["_id"])
+                elif admin.get("organization_name") != org["organization_name"]:
+                    report.add("stale_admin_names", {
+                        "admin_id": str(admin["_id"]),
+                        "organization_name": admin.get("organization_name"),
+                        "expected": org["organization_name"]
+                    })
+                    if report.repair:
+                        await master_db.admin_users.update_one(
+                            {"_id": admin["_id"]},
+                            {"$set": {"organization_name": org["organization_name"]}}
+                        )
+                        report.repaired["stale_admin_names"] += 1
+
+            if report.repair and orphans:
+                result = await master_db.admin_users.delete_many({"_id": {"$in": orphans}})
+                report.repaired["orphaned_admins"] += result.deleted_count
+
+        cursor = master_db.admin_users.find(
+            {}, projection={"email": 1, "organization_id": 1, "organization_name": 1}
+        ).batch_size(CHECK_BATCH_SIZE)
+        await _for_each_batch(cursor, handle)
+
+    @staticmethod
+    async def _check_organizations(master_db, report: ConsistencyReport, cutoff: datetime):
+        """Organizations whose admin or tenant collection is missing."""
+
+        async def handle(orgs: list):
+            report.scanned["organizations"] += len(orgs)
+            orgs = [org for org in orgs if not _is_recent(org["_id"], cutoff)]
+
+            admin_ids = []
+            for org in orgs:
+                try:
+                    admin_ids.append(ObjectId(org.get("admin_id")))
+                except (InvalidId, TypeError):
+                    pass
+            present_admins = {
+                str(admin["_id"])
+                async for admin in master_db.admin_users.find({"_id": {"$in": admin_ids}}, projection={"_id": 1})
+            }
+
+            by_cluster = {}
+            for org in orgs:
+                if org.get("admin_id") not in present_admins:
+                    report.add("organizations_without_admin", {
+                        "organization_id": str(org["_id"]),
+                        "organization_name": org["organization_name"]
+                    })
+                by_cluster.setdefault(org.get("cluster", DEFAULT_CLUSTER), []).append(org)
+
+            for cluster, cluster_orgs in by_cluster.items():
+                tenant_db = await get_tenant_db(cluster)
+                existing = set(await tenant_db.list_collection_names(
+                    filter={"name": {"$in": [org["collection_name"] for org in cluster_orgs]}}
+                ))
+                for org in cluster_orgs:
+                    if org["collection_name"] in existing:
+                        continue
+                    report.add("organizations_without_collection", {
+                        "organization_id": str(org["_id"]),
+                        "organization_name": org["organization_name"],
+                        "collection_name": org["collection_name"],
+                        "cluster": cluster
+                    })
+                    if report.repair:
+                        # Recreate the collection as create_organization would have
+                        await tenant_db[org["collection_name"]].insert_one({
+                            "_metadata": {
+                                "organization_name": org["organization_name"],
+                                "created_at": org.get("created_at"),
+                                "collection_name": org["collection_name"]
+                            }
+                        })
+                        # The template reconciler adds the indexes and validator
+                        await master_db.organizations.update_one(
+                            {"_id": org["_id"]}, {"$set": {"template_version": 0}}
+                        )
+                        report.repaired["organizations_without_collection"] += 1
+
+        # Deleted organizations are the reaper's to clean up
+        cursor = master_db.organizations.find(
+            {"deleted_at": {"$exists": False}},
+            projection={"organization_name": 1, "collection_name": 1, "admin_id": 1, "cluster": 1, "created_at": 1}
+        ).batch_size(CHECK_BATCH_SIZE)
+        await _for_each_batch(cursor, handle)
+
+    @staticmethod
+    async def _check_collections(master_db, report: ConsistencyReport, cluster: str):
+        """org_* collections on a cluster that no organization points at."""
+        tenant_db = await get_tenant_db(cluster)
+
+        async def handle(collections: list):
+            report.scanned["collections"] += len(collections)
+            names = [collection["name"] for collection in collections]
+            # Listing happens before the lookup, and create_organization inserts the
+            # organization before its collection, so a running create is never flagged.
+            # A collection is also owned by an organization moving onto this cluster.
+            owned = set()
+            async for org in master_db.organizations.find(
+                {"collection_name": {"$in": names}},
+                projection={"collection_name": 1, "cluster": 1, "moving_to": 1}
+            ):
+                if cluster in (org.get("cluster", DEFAULT_CLUSTER), org.get("moving_to")):
+                    owned.add(org["collection_name"])
+
+            for name in names:
+                if name in owned:
+                    continue
+                report.add("unowned_collections", {"collection_name": name, "cluster": cluster})
+                if report.repair:
+                    await tenant_db.drop_collection(name)
+                    report.repaired["unowned_collections"] += 1
+
+        cursor = await tenant_db.list_collections(filter={"name": {"$regex": "^org_"}}, nameOnly=True)
+        await _for_each_batch(cursor, handle)
+
+    @staticmethod
+    async def check(repair: bool = False) -> dict:
+        """
+        Cross-check organizations, admin_users and the tenant collections on every cluster.
+
+        Each source is streamed in batches and checked with one indexed
+        $in query per batch, with a bounded number of batches in flight,
+        so memory does not grow with the number of tenants. Records
+        younger than CHECK_GRACE_SECONDS are skipped so creates still in
+        progress are not reported.
+
+        With repair, orphaned admins and unowned collections are deleted,
+        stale admin names are corrected and missing collections are
+        recreated. Organizations without an admin are only reported.
+        """
+        master_db = await get_master_db()
+        report = ConsistencyReport(repair)
+        cutoff = report.started_at - timedelta(seconds=CHECK_GRACE_SECONDS)
+
+        await asyncio.gather(
+            ConsistencyService._check_admins(master_db, report, cutoff),
+            ConsistencyService._check_organizations(master_db, report, cutoff),
+            *(ConsistencyService._check_collections(master_db, report, cluster) for cluster in cluster_names())
+        )
+        return report.to_dict()
@@ -0,0 +1,315 @@
+import asyncio
+import json
+import logging
+import os
+from collections import deque
+from datetime import datetime
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+from pymongo.errors import OperationFailure
+from app.core.config import settings
+from app.core.database import get_master_db
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+events_published = registry.counter("org_events_published_total", "Organization change events published", ["type"])
+subscribers_connected = registry.gauge("org_events_subscribers", "Connected organization event subscribers")
+slow_consumers = registry.counter(
+    "org_events_slow_consumers_total", "Subscribers disconnected because their buffer filled up"
+)
+
+# Servers without change streams (standalone mongod) fail with this code
+CHANGE_STREAMS_UNSUPPORTED = 40573
+# The resume token has fallen off the oplog
+CHANGE_STREAM_HISTORY_LOST = 286
+# Queued to a subscriber that fell too far behind, in place of its backlog
+OVERFLOW = None
+# Queued to every subscriber when events may have been missed
+RESET = "reset"
+
+# Only writes that bump the version are user-visible changes; stats
+# backfills leave it alone and produce no event. A cluster move bumps it
+# when the collection is switched over, so it is reported as org.update.
+# Deletion is the tombstoning update, so removing the document later,
+# when the reaper reclaims it, is not reported again.
+CHANGE_PIPELINE = [{"$match": {"$or": [
+    {"operationType": {"$in": ["insert", "replace"]}},
+    {"operationType": "update", "updateDescription.updatedFields.version": {"$exists": True}}
+]}}]
+
+
+class TooManySubscribersError(Exception):
+    """Raised when events_max_subscribers streams are already open."""
+
+
+class Subscription:
+    """One connected stream, with its own bounded buffer."""
+
+    def __init__(self, organization_id: Optional[str]):
+        self.organization_id = organization_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.events_subscriber_buffer)
+
+    def matches(self, event: dict) -> bool:
+        return self.organization_id is None or event["organization_id"] == self.organization_id
+
+
+class OrganizationEventBus:
+    """
+    Fan-out of organization change events to stream subscribers.
+
+    Events come from a change stream on organizations when the server
+    supports it, which covers writes from every instance. Otherwise, the
+    bus publishes the events OrganizationService emits for writes made
+    by this instance. Recent events are kept so a reconnecting client
+    can resume from its Last-Event-ID. A subscriber whose buffer fills up
+    is disconnected rather than slowing the publisher or growing memory;
+    it can then reconnect and resume.
+    """
+
+    def __init__(self):
+        self._subscribers: set = set()
+        self._recent: Optional[deque] = None
+        # Local event ids carry a per-process prefix so ids from before a restart never match
+        self._epoch = os.urandom(4).hex()
+        self._sequence = 0
+        self._task: Optional[asyncio.Task] = None
+        self._listeners: List[Callable[[dict], None]] = []
+        self.source = "local"
+        # True while the change stream is open, i.e. every instance's writes
+        # are being seen; bumped generation marks each gap in coverage
+        self.live = False
+        self.generation = 0
+
+    @property
+    def _history(self) -> deque:
+        if self._recent is None:
+            self._recent = deque(maxlen=settings.events_history_size)
+        return self._recent
+
+    def add_listener(self, listener: Callable[[dict], None]):
+        """Call listener synchronously with every published event."""
+        self._listeners.append(listener)
+
+    def publish(self, event: dict):
+        """Record an event and queue it for every matching subscriber."""
+        self._history.append(event)
+        events_published.inc(type=event["type"])
+        for listener in self._listeners:
+            listener(event)
+        for subscription in list(self._subscribers):
+            if not subscription.matches(event):
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._disconnect_slow(subscription)
+
+    def _disconnect_slow(self, subscription: Subscription):
+        self.unsubscribe(subscription)
+        slow_consumers.inc()
+        # Replace the backlog with the overflow marker so the stream ends promptly
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(OVERFLOW)
+
+    def emit(
+        self,
+        event_type: str,
+        organization_id: str,
+        organization_name: Optional[str],
+        version: Optional[int] = None,
+        previous_name: Optional[str] = None
+    ):
+        """Publish a change made by this instance, unless the change stream will report it."""
+        if self.source == "change_stream":
+            return
+        self._sequence += 1
+        self.publish({
+            "id": f"{self._epoch}-{self._sequence}",
+            "type": event_type,
+            "organization_id": organization_id,
+            "organization_name": organization_name,
+            "version": version,
+            "previous_name": previous_name,
+            "at": datetime.utcnow()
+        })
+
+    def subscribe(
+        self,
+        organization_id: Optional[str] = None,
+        last_event_id: Optional[str] = None
+    ) -> Tuple[Subscription, List[dict], bool]:
+        """
+        Open a subscription, optionally resuming after last_event_id.
+
+        Returns the subscription, the missed events to replay, and whether
+        the resume point is no longer retained, in which case the client
+        must resynchronise from /org/get or /org/search.
+        """
+        if len(self._subscribers) >= settings.events_max_subscribers:
+            raise TooManySubscribersError("Too many event subscribers, retry shortly")
+
+        subscription = Subscription(organization_id)
+        replay: List[dict] = []
+        reset = False
+        if last_event_id:
+            history = list(self._history)
+            position = next((i for i, event in enumerate(history) if event["id"] == last_event_id), None)
+            if position is None:
+                reset = True
+            else:
+                replay = [event for event in history[position + 1:] if subscription.matches(event)]
+
+        self._subscribers.add(subscription)
+        subscribers_connected.set(len(self._subscribers))
+        return subscription, replay, reset
+
+    def reset(self):
+        """
+        Tell every subscriber that events were missed, so it resynchronises.
+        History is cleared too: resuming from an id before the gap would
+        otherwise replay a stream with a hole in it.
+        """
+        self._history.clear()
+        for subscription in list(self._subscribers):
+            try:
+                subscription.queue.put_nowait(RESET)
+            except asyncio.QueueFull:
+                self._disconnect_slow(subscription)
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+        subscribers_connected.set(len(self._subscribers))
+
+    @property
+    def full(self) -> bool:
+        return len(self._subscribers) >= settings.events_max_subscribers
+
+    @staticmethod
+    def format_event(event: dict) -> str:
+        """Render an event in the text/event-stream wire format."""
+        data = dict(event, at=event["at"].isoformat())
+        return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(data)}\n\n"
+
+    async def stream(
+        self,
+        organization_id: Optional[str] = None,
+        last_event_id: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Yield a subscriber's events as server-sent events until it disconnects.
+        A comment line is sent every events_keepalive_seconds so proxies keep
+        the connection open. The stream ends with an "overflow" event if the
+        subscriber fell too far behind, and carries a "reset" event when
+        changes were missed and the client must resynchronise.
+        """
+        try:
+            subscription, replay, reset = self.subscribe(organization_id, last_event_id)
+        except TooManySubscribersError:
+            yield "event: overflow\ndata: {}\n\n"
+            return
+        try:
+            if reset:
+                yield "event: reset\ndata: {}\n\n"
+            for event in replay:
+                yield self.format_event(event)
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.queue.get(), timeout=settings.events_keepalive_seconds
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is OVERFLOW:
+                    yield "event: overflow\ndata: {}\n\n"
+                    return
+                if event is RESET:
+                    yield "event: reset\ndata: {}\n\n"
+                    continue
+                yield self.format_event(event)
+        finally:
+            self.unsubscribe(subscription)
+
+    @staticmethod
+    def _from_change(change: dict) -> dict:
+        """Translate a change stream event."""
+        operation = change["operationType"]
+        document = change.get("fullDocument") or {}
+        updated_fields = change.get("updateDescription", {}).get("updatedFields", {})
+        organization_name = document.get("organization_name")
+        if operation == "insert":
+            event_type = "org.create"
+        elif "deleted_at" in updated_fields:
+            event_type = "org.delete"
+            organization_name = updated_fields.get("deleted_name")
+        elif "organization_name" in updated_fields:
+            event_type = "org.rename"
+        else:
+            event_type = "org.update"
+        return {
+            "id": change["_id"]["_data"],
+            "type": event_type,
+            "organization_id": str(change["documentKey"]["_id"]),
+            "organization_name": organization_name,
+            "version": document.get("version"),
+            "previous_name": None,
+            "at": change.get("wallTime") or datetime.utcnow()
+        }
+
+    async def _watch(self):
+        resume_token = None
+        while True:
+            try:
+                master_db = await get_master_db()
+                async with master_db.organizations.watch(
+                    CHANGE_PIPELINE, full_document="updateLookup", resume_after=resume_token
+                ) as stream:
+                    self.source = "change_stream"
+                    self.live = True
+                    self.generation += 1
+                    resume_token = stream.resume_token
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        self.publish(self._from_change(change))
+            except OperationFailure as e:
+                self._lost_coverage()
+                if e.code == CHANGE_STREAMS_UNSUPPORTED:
+                    logger.info("Change streams unavailable, publishing this instance's events only")
+                    self.source = "local"
+                    return
+                if e.code == CHANGE_STREAM_HISTORY_LOST:
+                    # Changes since the token are gone for good
+                    resume_token = None
+                    self.reset()
+                logger.warning("Organization change stream failed, resuming: %s", e)
+            except Exception as e:
+                self._lost_coverage()
+                logger.warning("Organization change stream failed, resuming: %s", e)
+            await asyncio.sleep(1)
+
+    def _lost_coverage(self):
+        if self.live:
+            self.live = False
+            self.generation += 1
+
+    def start(self):
+        """Start following the change stream, if events_source allows it."""
+        if settings.events_source == "local":
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._watch(), name="org-change-stream")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.source = "local"
+        self._lost_coverage()
+
+
+organization_events = OrganizationEventBus()
@@ -0,0 +1,104 @@
+from collections import defaultdict
+from typing import Dict, List
+from app.core.database import get_master_db
+from app.utils.naming import tenant_collection_name
+
+# Documents copied per insert_many when a legacy collection is shared
+COPY_BATCH_SIZE = 1000
+# Prefixed to a target's name while a shared collection is copied into it;
+# outside org_*, so the consistency check never takes it for a tenant
+COPY_PREFIX = "copying_"
+
+
+class TenantMigrationService:
+    """Service moving legacy org_<slug> collections to id-keyed org_<organization_id> names."""
+
+    @staticmethod
+    async def _copy_collection(master_db, source_name: str, target_name: str):
+        """
+        Copy into a scratch collection and rename it into place, so
+        target_name only ever exists once the copy is complete.
+        """
+        scratch_name = f"{COPY_PREFIX}{target_name}"
+        # Left over from an interrupted run: start that copy again
+        await master_db.drop_collection(scratch_name)
+        # Created up front so an empty source still yields a collection
+        await master_db.create_collection(scratch_name)
+        batch = []
+        async for doc in master_db[source_name].find({}).batch_size(COPY_BATCH_SIZE):
+            batch.append(doc)
+            if len(batch) >= COPY_BATCH_SIZE:
+                await master_db[scratch_name].insert_many(batch, ordered=False)
+                batch = []
+        if batch:
+            await master_db[scratch_name].insert_many(batch, ordered=False)
+        await master_db[scratch_name].rename(target_name)
+
+    @staticmethod
+    async def migrate_legacy_collections(dry_run: bool = False) -> dict:
+        """
+        Rename every organization's legacy collection to org_<organization_id>.
+
+        A renameCollection within one database only rewrites metadata, so
+        each tenant moves in O(1) regardless of size. The organization
+        document is repointed after its collection is renamed; if a run is
+        interrupted between the two steps, the next run sees the new
+        collection already in place and just repoints the document.
+
+        Legacy collections shared by several organizations (names that
+        slugified to the same string) are copied to every owner but the
+        last, which receives the original by rename. Copies are built under
+        a scratch name and renamed into place when complete, so a run
+        interrupted mid-copy leaves no partial target for the next run to
+        mistake for a finished one. Each owner then has its own
+        collection, and the shared ones are reported for review.
+        """
+        master_db = await get_master_db()
+        owners: Dict[str, List[dict]] = defaultdict(list)
+        async for org_doc in master_db.organizations.find(
+            {}, projection={"organization_name": 1, "collection_name": 1}
+        ):
+            target = tenant_collection_name(str(org_doc["_id"]))
+            if org_doc["collection_name"] != target:
+                owners[org_doc["collection_name"]].append(org_doc)
+
+        existing = set(await master_db.list_collection_names(filter={"name": {"$regex": "^org_"}}))
+        report = {"migrated": [], "shared": [], "missing": [], "dry_run": dry_run}
+
+        for legacy_name, org_docs in owners.items():
+            if len(org_docs) > 1:
+                report["shared"].append({
+                    "collection_name": legacy_name,
+                    "organizations": [org_doc["organization_name"] for org_doc in org_docs]
+                })
+
+            for index, org_doc in enumerate(org_docs):
+                target = tenant_collection_name(str(org_doc["_id"]))
+                is_last_owner = index == len(org_docs) - 1
+                entry = {"organization_name": org_doc["organization_name"], "from": legacy_name, "to": target}
+
+                if dry_run:
+                    report["migrated"].append(entry)
+                    continue
+
+                if target not in existing:
+                    if legacy_name not in existing:
+                        report["missing"].append(entry)
+                    elif is_last_owner:
+                        await master_db[legacy_name].rename(target)
+                        existing.discard(legacy_name)
+                    else:
+                        await TenantMigrationService._copy_collection(master_db, legacy_name, target)
+                    existing.add(target)
+
+                await master_db[target].update_many(
+                    {"_metadata": {"$exists": True}},
+                    {"$set": {"_metadata.collection_name": target}}
+                )
+                await master_db.organizations.update_one(
+                    {"_id": org_doc["_id"], "collection_name": legacy_name},
+                    {"$set": {"collection_name": target}}
+                )
+                report["migrated"].append(entry)
+
+        return report
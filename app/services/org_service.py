@@ -1,231 +1,615 @@
-from typing import Optional
+import asyncio
+import base64
+import json
+import logging
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from datetime import datetime
 from bson import ObjectId
-from app.core.database import get_master_db, get_org_collection
-from app.core.security import hash_password
+from bson.errors import InvalidId
+from pymongo.errors import DuplicateKeyError
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.database import PRIMARY, STALE_OK, recent_writes, serves_latest
+from app.core.metrics import registry
+from app.core.tracing import traced
+from app.core.security import hash_password_async, verify_password_async
 from app.models.master import Organization, AdminUser
-from app.utils.naming import slugify_org_name
+from app.repositories import get_repositories
+from app.services.stats_service import StatsService
+from app.services.placement_service import PlacementService
+from app.services.template_service import current_template
+from app.services.audit_service import audit_log
+from app.services.auth_service import AuthService
+from app.services.event_service import organization_events
+from app.utils.naming import (
+    TOMBSTONE_PREFIX,
+    name_trigrams,
+    normalize_org_name,
+    tenant_collection_name,
+    tombstone_name
+)
+
+logger = logging.getLogger(__name__)
+
+tenants_reclaimed = registry.counter(
+    "org_tenants_reclaimed_total", "Deleted organizations whose collection and records were reclaimed"
+)
+
+# Fields returned by search: the model's fields plus the cursor sort key
+SEARCH_PROJECTION = {**Organization.PROJECTION, "name_normalized": 1}
+
+
+class ETagCache:
+    """
+    Organization name -> ETag, for answering conditional GETs without a read.
+
+    Entries are dropped by organization change events. Those only cover
+    every instance's writes while the change stream is live, so entries
+    are used only then, and never across a gap in coverage.
+    """
+
+    def __init__(self, max_size: Optional[int] = None):
+        # None: etag_cache_size, read when first needed
+        self._max_size = max_size
+        # name -> (organization_id, etag, event bus generation)
+        self._entries: OrderedDict = OrderedDict()
+        self._names_by_id = {}
+        self.invalidations = 0
+
+    def get(self, organization_name: str) -> Optional[str]:
+        entry = self._entries.get(organization_name)
+        if entry is None or not organization_events.live or entry[2] != organization_events.generation:
+            return None
+        self._entries.move_to_end(organization_name)
+        return entry[1]
+
+    def put(self, organization_name: str, organization_id: str, etag: str, invalidations_seen: int):
+        """Store an ETag read when invalidations was invalidations_seen; stale reads are ignored."""
+        if not organization_events.live or self.invalidations != invalidations_seen:
+            return
+        self._entries[organization_name] = (organization_id, etag, organization_events.generation)
+        self._entries.move_to_end(organization_name)
+        self._names_by_id[organization_id] = organization_name
+        max_size = self._max_size if self._max_size is not None else settings.etag_cache_size
+        while len(self._entries) > max_size:
+            _, (evicted_id, _, _) = self._entries.popitem(last=False)
+            self._names_by_id.pop(evicted_id, None)
+
+    def invalidate(self, event: dict):
+        self.invalidations += 1
+        name = self._names_by_id.pop(event["organization_id"], None)
+        if name is not None:
+            self._entries.pop(name, None)
+
+
+etag_cache = ETagCache()
+organization_events.add_listener(etag_cache.invalidate)
+
+
+class ConcurrentUpdateError(ValueError):
+    """Raised when an organization was modified by another writer."""
+
+
+class QuotaExceededError(ValueError):
+    """Raised when an organization has used up its storage quota."""
 
 
 class OrganizationService:
     """Service for managing organizations and their dynamic collections."""
     
     @staticmethod
+    @traced("OrganizationService.create_organization")
     async def create_organization(organization_name: str, email: str, password: str) -> dict:
         """Create a new organization with dynamic collection."""
-        master_db = await get_master_db()
+        OrganizationService._check_name_allowed(organization_name)
+        repos = get_repositories()
         
-        # Check if organization already exists
-        existing_org = await master_db.organizations.find_one(
-            {"organization_name": organization_name}
-        )
+        # Early rejection only, so stale reads will do: the unique indexes
+        # catch anything these checks miss
+        existing_org = await repos.organizations.find_by_name(organization_name, projection={"_id": 1}, read=STALE_OK)
         if existing_org:
             raise ValueError(f"Organization '{organization_name}' already exists")
         
-        # Check if email already exists
-        existing_admin = await master_db.admin_users.find_one({"email": email})
+        existing_admin = await repos.admin_users.find_by_email(email, projection={"_id": 1}, read=STALE_OK)
         if existing_admin:
             raise ValueError(f"Email '{email}' is already registered")
         
-        # Generate collection name
-        collection_name = slugify_org_name(organization_name)
+        # The id is generated up front so the collection can be named after it
+        org_object_id = ObjectId()
+        org_id = str(org_object_id)
+        collection_name = tenant_collection_name(org_id)
+        cluster = await PlacementService.choose_cluster()
+        template = current_template()
         
-        # DEBUG: Verify password before hashing
-        import sys
+        # Verify password before hashing; only its type and length are logged
         if not isinstance(password, str):
-            error_msg = f"DEBUG: org_service.create_organization received non-string password. Type: {type(password)}, Value: {str(password)[:100]}"
-            print(error_msg, file=sys.stderr)
+            logger.debug("create_organization: received non-string password of type %s", type(password).__name__)
             raise ValueError(f"Password must be a string. Received: {type(password).__name__}")
         
         if len(password) > 100:
-            error_msg = f"DEBUG: org_service received suspiciously long password. Length: {len(password)} chars. First 100: {password[:100]}"
-            print(error_msg, file=sys.stderr)
+            logger.debug("create_organization: suspiciously long password of %d chars", len(password))
             raise ValueError(f"Password appears incorrect. Length: {len(password)} chars. Expected short password string.")
         
         # Hash password - ensure we're passing ONLY the password string
         password_to_hash = str(password).strip()
-        hashed_password = hash_password(password_to_hash)
+        hashed_password = await hash_password_async(password_to_hash)
         
         # Create admin user first
         admin_user = AdminUser(
             email=email,
             hashed_password=hashed_password,
             organization_name=organization_name,
-            organization_id=""  # Will be set after insertion
+            organization_id=org_id
         )
-        admin_result = await master_db.admin_users.insert_one(admin_user.to_dict())
-        admin_id = str(admin_result.inserted_id)
+        try:
+            admin_id = str(await repos.admin_users.insert(admin_user.to_dict()))
+        except DuplicateKeyError:
+            raise ValueError(f"Email '{email}' is already registered")
         
         # Create organization document
         org = Organization(
             organization_name=organization_name,
             collection_name=collection_name,
             admin_email=email,
-            admin_id=admin_id
+            admin_id=admin_id,
+            cluster=cluster,
+            id=org_object_id,
+            template_version=template["version"]
         )
-        org_result = await master_db.organizations.insert_one(org.to_dict())
-        org_id = str(org_result.inserted_id)
+        try:
+            await repos.organizations.insert(org.to_dict())
+        except DuplicateKeyError:
+            await repos.admin_users.delete(ObjectId(admin_id))
+            raise ValueError(f"Organization '{organization_name}' already exists")
+        recent_writes.mark(organization_name, admin_id)
         
-        # Update admin user with organization_id
-        await master_db.admin_users.update_one(
-            {"_id": ObjectId(admin_id)},
-            {"$set": {"organization_id": org_id}}
-        )
+        # Create dynamic collection from the current template, with a metadata document
+        await repos.tenants.create(collection_name, cluster, {
+            "organization_name": organization_name,
+            "created_at": org.created_at,
+            "collection_name": collection_name
+        }, template)
         
-        # Create dynamic collection (initialize with empty document or schema)
-        org_collection = await get_org_collection(organization_name)
-        # Initialize collection with a metadata document
-        await org_collection.insert_one({
-            "_metadata": {
-                "organization_name": organization_name,
-                "created_at": org.created_at,
-                "collection_name": collection_name
-            }
-        })
+        await audit_log.emit("org.create", organization_name, actor=email, details={"organization_id": org_id})
+        organization_events.emit("org.create", org_id, organization_name, version=org.version)
         
+        return OrganizationService._to_response_dict(org)
+    
+    @staticmethod
+    def _check_name_allowed(organization_name: str):
+        if organization_name.startswith(TOMBSTONE_PREFIX):
+            raise ValueError(f"Organization names cannot start with '{TOMBSTONE_PREFIX}'")
+    
+    @staticmethod
+    def _to_response_dict(org: Organization) -> dict:
+        """Shape an organization into the service's return dict."""
         return {
-            "organization_id": org_id,
-            "organization_name": organization_name,
-            "collection_name": collection_name,
-            "admin_email": email,
-            "admin_id": admin_id,
-            "created_at": org.created_at
+            "organization_id": str(org.id),
+            "organization_name": org.organization_name,
+            "collection_name": org.collection_name,
+            "admin_email": org.admin_email,
+            "admin_id": org.admin_id,
+            "created_at": org.created_at,
+            "updated_at": org.updated_at,
+            "version": org.version,
+            "cluster": org.cluster,
+            "moving_to": org.moving_to,
+            "move_fenced": org.move_fenced,
+            "scheduling": org.scheduling
         }
     
     @staticmethod
-    async def get_organization(organization_name: str) -> Optional[dict]:
-        """Get organization details from master database."""
-        master_db = await get_master_db()
-        org_doc = await master_db.organizations.find_one(
-            {"organization_name": organization_name}
-        )
+    def etag(organization_id: str, version: int) -> str:
+        """Strong ETag for an organization; every visible change bumps its version."""
+        return f'"{organization_id}-{version}"'
+    
+    @staticmethod
+    @traced("OrganizationService.get_organization")
+    async def get_organization(organization_name: str, fresh: bool = False) -> Optional[dict]:
+        """
+        Get organization details from master database.
+        
+        Served per READ_PREFERENCE unless fresh is set or this instance
+        wrote the organization recently. A miss on a secondary is retried
+        on the primary, so replication lag never turns into a 404.
+        """
+        invalidations_seen = etag_cache.invalidations
+        organizations = get_repositories().organizations
+        read = PRIMARY if fresh else recent_writes.route(organization_name)
+        org_doc = await organizations.find_by_name(organization_name, projection=Organization.PROJECTION, read=read)
+        if not org_doc and not serves_latest(read):
+            read = PRIMARY
+            org_doc = await organizations.find_by_name(organization_name, projection=Organization.PROJECTION)
         
         if not org_doc:
             return None
         
+        org = OrganizationService._to_response_dict(Organization.from_dict(org_doc))
+        org["etag"] = OrganizationService.etag(org["organization_id"], org["version"])
+        # A lagging read could cache an ETag that no later event invalidates
+        if serves_latest(read):
+            etag_cache.put(organization_name, org["organization_id"], org["etag"], invalidations_seen)
+        return org
+    
+    @staticmethod
+    @traced("OrganizationService.get_organization_etag")
+    async def get_organization_etag(organization_name: str) -> Optional[str]:
+        """
+        Get just the organization's current ETag: from the cache when
+        possible, otherwise by reading only its _id and version from the
+        primary, since a stale ETag would wrongly answer 304.
+        """
+        etag = etag_cache.get(organization_name)
+        if etag is not None:
+            return etag
+        
+        invalidations_seen = etag_cache.invalidations
+        org_doc = await get_repositories().organizations.find_by_name(
+            organization_name, projection={"version": 1}
+        )
+        if not org_doc:
+            return None
+        
+        organization_id = str(org_doc["_id"])
+        etag = OrganizationService.etag(organization_id, org_doc.get("version") or 1)
+        etag_cache.put(organization_name, organization_id, etag, invalidations_seen)
+        return etag
+    
+    @staticmethod
+    def _encode_search_cursor(org_doc: dict) -> str:
+        """Encode the sort key of the last result as an opaque page cursor."""
+        raw = json.dumps([org_doc["name_normalized"], str(org_doc["_id"])])
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+    
+    @staticmethod
+    def _decode_search_cursor(cursor: str) -> Tuple[str, ObjectId]:
+        """Decode a page cursor produced by _encode_search_cursor."""
+        try:
+            name, org_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            return name, ObjectId(org_id)
+        except (ValueError, TypeError, InvalidId):
+            raise ValueError("Invalid search cursor")
+    
+    @staticmethod
+    @traced("OrganizationService.search_organizations")
+    async def search_organizations(
+        query: str,
+        mode: str = "prefix",
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> dict:
+        """
+        Search organizations by partial name.
+        
+        Prefix mode is a range scan over the name_normalized index. Substring
+        mode narrows candidates with the name_trigrams index and confirms the
+        match on name_normalized; queries shorter than a trigram fall back to
+        prefix search. Results are ordered by normalized name and paginated
+        with a keyset cursor, so deep pages cost the same as the first one.
+        """
+        normalized_query = normalize_org_name(query)
+        if not normalized_query:
+            raise ValueError("Search query cannot be empty")
+        
+        if mode not in ("prefix", "substring"):
+            raise ValueError(f"Unknown search mode '{mode}'")
+        if len(normalized_query) < 3:
+            mode = "prefix"
+        
+        after = OrganizationService._decode_search_cursor(cursor) if cursor else None
+        
+        # Fetch one extra document to know whether another page exists
+        docs = await get_repositories().organizations.search(
+            normalized_query, mode, after, limit + 1, projection=SEARCH_PROJECTION, read=STALE_OK
+        )
+        
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            next_cursor = OrganizationService._encode_search_cursor(docs[-1])
+        
         return {
-            "organization_id": str(org_doc["_id"]),
-            "organization_name": org_doc["organization_name"],
-            "collection_name": org_doc["collection_name"],
-            "admin_email": org_doc["admin_email"],
-            "admin_id": org_doc["admin_id"],
-            "created_at": org_doc["created_at"],
-            "updated_at": org_doc["updated_at"]
+            "items": [OrganizationService._to_response_dict(Organization.from_dict(doc)) for doc in docs],
+            "next_cursor": next_cursor
         }
     
     @staticmethod
+    @traced("OrganizationService.backfill_search_fields")
+    async def backfill_search_fields(batch_size: int = 500) -> int:
+        """Populate search fields on organizations created before search existed."""
+        organizations = get_repositories().organizations
+        
+        updated = 0
+        updates = []
+        async for org_doc in organizations.iter_missing_search_fields(batch_size):
+            normalized_name = normalize_org_name(org_doc["organization_name"])
+            updates.append((org_doc["_id"], {
+                "name_normalized": normalized_name,
+                "name_trigrams": name_trigrams(normalized_name)
+            }))
+            if len(updates) >= batch_size:
+                await organizations.set_fields_many(updates)
+                updated += len(updates)
+                updates = []
+        if updates:
+            await organizations.set_fields_many(updates)
+            updated += len(updates)
+        return updated
+    
+    @staticmethod
+    @traced("OrganizationService.update_organization")
     async def update_organization(
         organization_name: str,
         new_email: Optional[str] = None,
         new_password: Optional[str] = None,
-        new_organization_name: Optional[str] = None
+        new_organization_name: Optional[str] = None,
+        expected_version: Optional[int] = None,
+        actor: Optional[str] = None
     ) -> dict:
-        """Update organization details."""
-        master_db = await get_master_db()
+        """
+        Update organization details.
+        
+        The organization document is changed with a single write guarded by
+        its version, so concurrent writers cannot silently overwrite
+        each other. The admin user is updated first, with one combined
+        update, and restored if the organization write then fails, so a
+        rejected update leaves neither document changed.
+        
+        Raises:
+            ValueError: If the organization, new name or new email is invalid
+            ConcurrentUpdateError: If the organization changed concurrently
+                or does not match expected_version
+        """
+        repos = get_repositories()
         
         # Get existing organization
-        org_doc = await master_db.organizations.find_one(
-            {"organization_name": organization_name}
-        )
+        org_doc = await repos.organizations.find_by_name(organization_name, projection=Organization.PROJECTION)
         if not org_doc:
             raise ValueError(f"Organization '{organization_name}' does not exist")
+        org = Organization.from_dict(org_doc)
         
-        org_id = str(org_doc["_id"])
-        old_collection_name = org_doc["collection_name"]
-        update_data = {}
-        
-        # Handle organization name change (requires collection migration)
-        if new_organization_name and new_organization_name != organization_name:
-            # Check if new name already exists
-            existing = await master_db.organizations.find_one(
-                {"organization_name": new_organization_name}
-            )
-            if existing:
-                raise ValueError(f"Organization '{new_organization_name}' already exists")
-            
-            new_collection_name = slugify_org_name(new_organization_name)
-            update_data["organization_name"] = new_organization_name
-            update_data["collection_name"] = new_collection_name
-            
-            # Migrate data from old collection to new collection
-            old_collection = await get_org_collection(organization_name)
-            new_collection = await get_org_collection(new_organization_name)
-            
-            # Copy all documents from old to new collection
-            async for doc in old_collection.find({}):
-                doc.pop("_id", None)  # Remove _id to allow MongoDB to generate new one
-                await new_collection.insert_one(doc)
-            
-            # Drop old collection
-            await old_collection.drop()
-            
-            # Update organization name in admin_users
-            await master_db.admin_users.update_many(
-                {"organization_name": organization_name},
-                {"$set": {"organization_name": new_organization_name}}
+        # The raw value: None must still match documents created before versioning
+        current_version = org_doc.get("version")
+        if expected_version is not None and expected_version != (current_version or 1):
+            raise ConcurrentUpdateError(
+                f"Organization '{organization_name}' is at version {current_version or 1}, "
+                f"expected {expected_version}"
             )
         
-        # Update email if provided
-        if new_email:
-            # Check if email already exists for different org
-            existing_admin = await master_db.admin_users.find_one({
-                "email": new_email,
-                "organization_name": {"$ne": organization_name}
-            })
+        org_update = {"updated_at": datetime.utcnow()}
+        admin_update = {}
+        renaming = bool(new_organization_name and new_organization_name != organization_name)
+        
+        # Renaming only changes metadata; the collection is keyed by the
+        # immutable organization id, so no data moves.
+        if renaming:
+            OrganizationService._check_name_allowed(new_organization_name)
+            normalized_name = normalize_org_name(new_organization_name)
+            org_update["organization_name"] = new_organization_name
+            org_update["name_normalized"] = normalized_name
+            org_update["name_trigrams"] = name_trigrams(normalized_name)
+            admin_update["organization_name"] = new_organization_name
+        
+        # Only an actual email change needs the cross-organization check
+        if new_email and new_email != org.admin_email:
+            existing_admin = await repos.admin_users.find_by_email(new_email, projection={"_id": 1})
             if existing_admin:
                 raise ValueError(f"Email '{new_email}' is already registered to another organization")
-            
-            update_data["admin_email"] = new_email
-            await master_db.admin_users.update_one(
-                {"organization_id": org_id},
-                {"$set": {"email": new_email}}
-            )
+            org_update["admin_email"] = new_email
+            admin_update["email"] = new_email
+        
+        admin_id = ObjectId(org.admin_id)
+        admin_doc = None
+        if admin_update or new_password:
+            admin_doc = await repos.admin_users.find_by_id(
+                admin_id, projection={"email": 1, "organization_name": 1, "hashed_password": 1}
+            ) or {}
         
-        # Update password if provided
-        if new_password:
-            hashed_password = hash_password(new_password)
-            await master_db.admin_users.update_one(
-                {"organization_id": org_id},
-                {"$set": {"hashed_password": hashed_password}}
+        # Every update carries a password; resending the current one changes
+        # nothing, so it neither rehashes nor revokes the caller's tokens
+        if new_password and not await verify_password_async(new_password, admin_doc.get("hashed_password", "")):
+            admin_update["hashed_password"] = await hash_password_async(new_password)
+        
+        previous_admin = {}
+        if admin_update:
+            previous_admin = {field: admin_doc[field] for field in admin_update if field in admin_doc}
+            try:
+                await repos.admin_users.update(admin_id, admin_update)
+            except DuplicateKeyError:
+                raise ValueError(f"Email '{new_email}' is already registered to another organization")
+        
+        async def restore_admin():
+            # Only while the admin still holds our values, so a concurrent
+            # update that wrote it since is not undone
+            if previous_admin:
+                await repos.admin_users.update(admin_id, previous_admin, expected=admin_update)
+        
+        # Matching on the version we read makes the write conditional
+        try:
+            updated_doc = await repos.organizations.update_versioned(
+                org.id, current_version, org_update, projection=Organization.PROJECTION
             )
+        except DuplicateKeyError:
+            await restore_admin()
+            raise ValueError(f"Organization '{new_organization_name}' already exists")
+        except Exception:
+            await restore_admin()
+            raise
         
-        # Update organization metadata
-        if update_data:
-            update_data["updated_at"] = org_doc.get("updated_at")
-            await master_db.organizations.update_one(
-                {"_id": ObjectId(org_id)},
-                {"$set": update_data}
+        if updated_doc is None:
+            await restore_admin()
+            raise ConcurrentUpdateError(
+                f"Organization '{organization_name}' was modified concurrently, retry the update"
             )
+        updated = Organization.from_dict(updated_doc)
+        recent_writes.mark(organization_name, updated.organization_name, org.admin_id)
+        
+        if admin_update:
+            # Issued tokens carry the old name and email, or were issued against the old password
+            await AuthService.revoke_tokens(org.admin_id)
         
-        # Return updated organization
-        return await OrganizationService.get_organization(
-            new_organization_name if new_organization_name else organization_name
+        await audit_log.emit(
+            "org.update",
+            updated.organization_name,
+            actor=actor,
+            details={
+                "fields": [field for field in ("organization_name", "admin_email") if field in org_update]
+                + (["password"] if "hashed_password" in admin_update else []),
+                "previous_name": organization_name if renaming else None,
+                "version": updated.version
+            }
+        )
+        organization_events.emit(
+            "org.rename" if renaming else "org.update",
+            str(updated.id),
+            updated.organization_name,
+            version=updated.version,
+            previous_name=organization_name if renaming else None
         )
+        
+        return OrganizationService._to_response_dict(updated)
+    
+    @staticmethod
+    @traced("OrganizationService.check_quota")
+    async def check_quota(organization_id: str):
+        """
+        Enforce the configured per-tenant quotas.
+        Uses the stats stored by the background refresher, so the check costs
+        one indexed read and may lag real usage by one refresh interval.
+        """
+        if not settings.tenant_max_documents and not settings.tenant_max_data_bytes:
+            return
+        
+        stats = await StatsService.get_tenant_stats(organization_id)
+        if not stats:
+            return
+        
+        if settings.tenant_max_documents and stats["document_count"] >= settings.tenant_max_documents:
+            raise QuotaExceededError(
+                f"Organization '{stats['organization_name']}' has reached its limit of "
+                f"{settings.tenant_max_documents} documents"
+            )
+        if settings.tenant_max_data_bytes and stats["data_size"] >= settings.tenant_max_data_bytes:
+            raise QuotaExceededError(
+                f"Organization '{stats['organization_name']}' has reached its limit of "
+                f"{settings.tenant_max_data_bytes} bytes of data"
+            )
     
     @staticmethod
-    async def delete_organization(organization_name: str) -> bool:
-        """Delete organization and its collection."""
-        master_db = await get_master_db()
+    @traced("OrganizationService.delete_organization")
+    async def delete_organization(organization_name: str, actor: Optional[str] = None) -> bool:
+        """
+        Delete an organization.
+        
+        One conditional write tombstones the organization document: it
+        takes a placeholder name, so the real name is free at once and
+        every read by name treats the organization as gone. The admin is
+        removed so the email is free too. Dropping the tenant collection,
+        which can be slow, is left to reap_tombstones.
+        
+        Raises:
+            ValueError: If the organization does not exist
+            ConcurrentUpdateError: If the organization changed concurrently
+                or is being moved to another cluster
+        """
+        repos = get_repositories()
         
         # Get organization
-        org_doc = await master_db.organizations.find_one(
-            {"organization_name": organization_name}
-        )
+        org_doc = await repos.organizations.find_by_name(organization_name, projection=Organization.PROJECTION)
         if not org_doc:
             raise ValueError(f"Organization '{organization_name}' does not exist")
+        org = Organization.from_dict(org_doc)
+        org_id = str(org.id)
+        if org.moving_to:
+            raise ConcurrentUpdateError(
+                f"Organization '{organization_name}' is being moved to another cluster, retry shortly"
+            )
         
-        org_id = str(org_doc["_id"])
-        admin_id = org_doc["admin_id"]
-        collection_name = org_doc["collection_name"]
+        now = datetime.utcnow()
+        tombstoned = await repos.organizations.update_versioned(org.id, org_doc.get("version"), {
+            "organization_name": tombstone_name(org_id),
+            # Empty search fields keep the organization out of every search
+            "name_normalized": "",
+            "name_trigrams": [],
+            "deleted_name": organization_name,
+            "deleted_at": now,
+            "updated_at": now
+        }, projection={"_id": 1})
+        if tombstoned is None:
+            raise ConcurrentUpdateError(
+                f"Organization '{organization_name}' was modified concurrently, retry the delete"
+            )
         
-        # Drop organization collection
-        org_collection = await get_org_collection(organization_name)
-        await org_collection.drop()
+        recent_writes.mark(organization_name, org.admin_id)
+        # The reaper revokes and deletes the admin again, should this fail
+        await AuthService.revoke_tokens(org.admin_id)
+        await repos.admin_users.delete(ObjectId(org.admin_id))
+        await audit_log.emit("org.delete", organization_name, actor=actor, details={"organization_id": org_id})
+        organization_events.emit("org.delete", org_id, organization_name)
         
-        # Delete admin user
-        await master_db.admin_users.delete_one({"_id": ObjectId(admin_id)})
+        return True
+    
+    @staticmethod
+    @traced("OrganizationService.deprovision_organizations")
+    async def deprovision_organizations(organization_names: List[str], actor: Optional[str] = None) -> dict:
+        """
+        Delete many organizations, e.g. when offboarding. Each is tombstoned
+        as by delete_organization, deprovision_concurrency at a time; the
+        reaper reclaims their collections at its own throttled pace.
+        """
+        semaphore = asyncio.Semaphore(max(1, settings.deprovision_concurrency))
+        result = {"deleted": [], "not_found": [], "failed": {}}
         
-        # Delete organization metadata
-        await master_db.organizations.delete_one({"_id": ObjectId(org_id)})
+        async def deprovision(organization_name: str):
+            async with semaphore:
+                try:
+                    await OrganizationService.delete_organization(organization_name, actor=actor)
+                except ConcurrentUpdateError as e:
+                    result["failed"][organization_name] = str(e)
+                except ValueError:
+                    result["not_found"].append(organization_name)
+                else:
+                    result["deleted"].append(organization_name)
         
-        return True
+        await asyncio.gather(*(deprovision(name) for name in dict.fromkeys(organization_names)))
+        return result
+    
+    @staticmethod
+    @traced("OrganizationService.reap_tombstones")
+    async def reap_tombstones() -> int:
+        """
+        Reclaim deleted organizations, oldest first: drop the tenant
+        collection, then delete the admin, the stats and finally the
+        organization document, so a run that fails part way is simply
+        repeated. Handles at most reaper_batch_size organizations per run,
+        with drops paced to reaper_drops_per_second. Organizations still
+        being moved between clusters are left for a later run.
+        """
+        repos = get_repositories()
+        tombstones = await repos.organizations.list_tombstoned(
+            settings.reaper_batch_size, projection=Organization.PROJECTION
+        )
+        pause = 1.0 / settings.reaper_drops_per_second if settings.reaper_drops_per_second > 0 else 0.0
+        
+        reclaimed = 0
+        for org_doc in tombstones:
+            org = Organization.from_dict(org_doc)
+            if org.moving_to:
+                continue
+            if reclaimed:
+                await asyncio.sleep(pause)
+            await repos.tenants.drop(org.collection_name, org.cluster)
+            await AuthService.revoke_tokens(org.admin_id)
+            await repos.admin_users.delete(ObjectId(org.admin_id))
+            await StatsService.remove_tenant_stats(str(org.id))
+            await repos.organizations.delete(org.id)
+            tenants_reclaimed.inc()
+            reclaimed += 1
+            await audit_log.emit("org.reclaim", org.deleted_name, details={"organization_id": str(org.id)})
+        return reclaimed
+
 
+tenant_reaper = PeriodicTask(
+    "tenant-reaper", lambda: settings.reaper_interval_seconds, OrganizationService.reap_tombstones
+)
@@ -0,0 +1,237 @@
+import asyncio
+from datetime import datetime
+from typing import Callable, Dict, Optional
+from pymongo import ReplaceOne
+from app.core.config import settings
+from app.core.database import DEFAULT_CLUSTER, cluster_names, get_org_collection
+from app.core.tenant_scheduler import tenant_scheduler
+from app.repositories import get_repositories
+from app.services.stats_service import StatsService
+from app.services.audit_service import audit_log
+from app.services.template_service import current_template
+
+# Documents copied per bulk write while moving a tenant
+MOVE_BATCH_SIZE = 1000
+
+# Tenants placed on each cluster since the last stats refresh; counted so a
+# burst of creates between refreshes is spread out instead of all landing
+# on the same least-loaded cluster.
+_recent_placements = {"refreshed_at": None, "counts": {}}
+
+
+class PlacementService:
+    """Service deciding which cluster holds each tenant, and moving tenants between clusters."""
+
+    @staticmethod
+    async def choose_cluster() -> str:
+        """
+        Pick the cluster for a new tenant according to TENANT_PLACEMENT_POLICY.
+
+        least_loaded reads the per-cluster data sizes kept by the stats
+        refresh, so placing a tenant costs one read of the fleet document.
+        Tenants placed since that refresh are counted at the fleet's average
+        tenant size; clusters without stats yet count as empty.
+        """
+        policy = settings.tenant_placement_policy
+        clusters = cluster_names()
+        if policy == "pinned":
+            if settings.tenant_pinned_cluster not in clusters:
+                raise ValueError(f"Pinned cluster '{settings.tenant_pinned_cluster}' is not configured")
+            return settings.tenant_pinned_cluster
+        if policy != "least_loaded":
+            raise ValueError(f"Unknown placement policy '{policy}'")
+        if len(clusters) == 1:
+            return clusters[0]
+
+        fleet = await StatsService.get_fleet_stats() or {}
+        refreshed_at = fleet.get("refreshed_at")
+        if _recent_placements["refreshed_at"] != refreshed_at:
+            _recent_placements["refreshed_at"] = refreshed_at
+            _recent_placements["counts"] = {}
+        placed: Dict[str, int] = _recent_placements["counts"]
+
+        cluster_stats = fleet.get("clusters", {})
+        tenants = sum(stats["tenants"] for stats in cluster_stats.values())
+        average_size = sum(stats["data_size"] for stats in cluster_stats.values()) / tenants if tenants else 0
+
+        def load(name: str) -> tuple:
+            stats = cluster_stats.get(name, {"tenants": 0, "data_size": 0})
+            pending = placed.get(name, 0)
+            return (stats["data_size"] + pending * average_size, stats["tenants"] + pending)
+
+        chosen = min(clusters, key=load)
+        placed[chosen] = placed.get(chosen, 0) + 1
+        return chosen
+
+    @staticmethod
+    async def _copy_batch(target, documents: list, scheduling: Optional[dict]):
+        # Upserting by _id makes every copy idempotent, so a move can be re-run.
+        # Existing documents are copied as they are, even if the template's
+        # validator would now reject them. Copies share the tenant's scheduler
+        # slots with its imports and exports.
+        async with tenant_scheduler.slot(target.name, scheduling):
+            await target.bulk_write(
+                [ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in documents],
+                ordered=False,
+                bypass_document_validation=True
+            )
+
+    @staticmethod
+    async def _prepare_target(collection_name: str, target_cluster: str, template: dict):
+        """Create the target collection from the template, as a new tenant's would be."""
+        await get_repositories().tenants.ensure(collection_name, target_cluster, template)
+
+    @staticmethod
+    async def _copy_all(
+        source, target, progress: Optional[Callable[[int], None]], scheduling: Optional[dict]
+    ) -> int:
+        copied = 0
+        batch = []
+        async for doc in source.find({}).sort("_id", 1).batch_size(MOVE_BATCH_SIZE):
+            batch.append(doc)
+            if len(batch) >= MOVE_BATCH_SIZE:
+                await PlacementService._copy_batch(target, batch, scheduling)
+                copied += len(batch)
+                batch = []
+                if progress:
+                    progress(copied)
+        if batch:
+            await PlacementService._copy_batch(target, batch, scheduling)
+            copied += len(batch)
+        return copied
+
+    @staticmethod
+    async def _copy_missing(source, target, scheduling: Optional[dict]) -> int:
+        """Copy documents present in source but not in target, comparing _ids batch by batch."""
+        copied = 0
+
+        async def copy_ids(ids: list):
+            found = await target.find({"_id": {"$in": ids}}, projection={"_id": 1}).to_list(length=None)
+            present = {doc["_id"] for doc in found}
+            missing = [doc_id for doc_id in ids if doc_id not in present]
+            if missing:
+                documents = await source.find({"_id": {"$in": missing}}).to_list(length=None)
+                await PlacementService._copy_batch(target, documents, scheduling)
+            return len(missing)
+
+        ids = []
+        async for doc in source.find({}, projection={"_id": 1}).batch_size(MOVE_BATCH_SIZE):
+            ids.append(doc["_id"])
+            if len(ids) >= MOVE_BATCH_SIZE:
+                copied += await copy_ids(ids)
+                ids = []
+        if ids:
+            copied += await copy_ids(ids)
+        return copied
+
+    @staticmethod
+    async def _drop_source(repos, org_doc: dict, source_cluster: str):
+        """Drop the collection a finished move left on its source cluster, then forget it."""
+        await repos.tenants.drop(org_doc["collection_name"], source_cluster)
+        await repos.organizations.update_where(
+            org_doc["_id"], {"moved_from": source_cluster}, {}, unset=("moved_from",)
+        )
+
+    @staticmethod
+    async def move_tenant(
+        organization_name: str,
+        target_cluster: str,
+        progress: Optional[Callable[[int], None]] = None
+    ) -> dict:
+        """
+        Move an organization's collection to another cluster while it stays readable.
+
+        1. Record moving_to, create the target from the current tenant
+           template, then bulk-copy the collection while reads and
+           imports carry on.
+        2. Fence imports with move_fenced, then wait
+           TENANT_MOVE_FENCE_SECONDS for imports already running to finish.
+        3. Copy whatever was written during the first pass.
+        4. Point the organization at the target cluster, recording the
+           source as moved_from, then drop the source and clear moved_from.
+
+        Reads go to the source until step 4, and imports are rejected only
+        during steps 2-3. Tenant writes are insert-only, so comparing _ids
+        is enough to catch up. Every step is idempotent: a failed move can
+        be re-run with the same arguments, and a re-run after the switch
+        only drops the source left behind.
+        """
+        if target_cluster not in cluster_names():
+            raise ValueError(f"Unknown cluster '{target_cluster}'")
+
+        repos = get_repositories()
+        org_doc = await repos.organizations.find_by_name(organization_name)
+        if not org_doc:
+            raise ValueError(f"Organization '{organization_name}' does not exist")
+
+        source_cluster = org_doc.get("cluster", DEFAULT_CLUSTER)
+        if source_cluster == target_cluster and org_doc.get("moved_from"):
+            # A previous run switched clusters but stopped before dropping the source
+            await PlacementService._drop_source(repos, org_doc, org_doc["moved_from"])
+            await audit_log.emit(
+                "org.move", organization_name, details={"from": org_doc["moved_from"], "to": target_cluster}
+            )
+            return {
+                "organization_name": organization_name,
+                "from": org_doc["moved_from"],
+                "to": target_cluster,
+                "copied": 0,
+                "caught_up": 0
+            }
+        if source_cluster == target_cluster:
+            raise ValueError(f"Organization '{organization_name}' is already on cluster '{target_cluster}'")
+        if org_doc.get("moving_to") not in (None, target_cluster):
+            raise ValueError(f"Organization '{organization_name}' is already moving to '{org_doc['moving_to']}'")
+
+        collection_name = org_doc["collection_name"]
+        # The documents themselves are copied with the driver: moves need MongoDB
+        source = await get_org_collection(collection_name, source_cluster)
+        target = await get_org_collection(collection_name, target_cluster)
+
+        # moving_to marks the target copy as owned, and keeps other moves out
+        claimed = await repos.organizations.update_where(
+            org_doc["_id"],
+            {"cluster": org_doc.get("cluster"), "moving_to": {"$in": [None, target_cluster]}},
+            {"moving_to": target_cluster}
+        )
+        if not claimed:
+            raise ValueError(f"Organization '{organization_name}' changed before the move started, re-run it")
+        template = current_template()
+        await PlacementService._prepare_target(collection_name, target_cluster, template)
+        copied = await PlacementService._copy_all(source, target, progress, org_doc.get("scheduling"))
+
+        await repos.organizations.update_where(
+            org_doc["_id"], {"moving_to": target_cluster}, {"move_fenced": True}
+        )
+        await asyncio.sleep(settings.tenant_move_fence_seconds)
+        caught_up = await PlacementService._copy_missing(source, target, org_doc.get("scheduling"))
+
+        switched = await repos.organizations.update_where(
+            org_doc["_id"],
+            {"moving_to": target_cluster},
+            {
+                "cluster": target_cluster,
+                "moved_from": source_cluster,
+                "template_version": template["version"],
+                "updated_at": datetime.utcnow()
+            },
+            unset=("moving_to", "move_fenced"),
+            # The cluster is part of the organization's representation
+            inc={"version": 1}
+        )
+        if not switched:
+            raise ValueError(f"Organization '{organization_name}' changed during the move, re-run it")
+        await PlacementService._drop_source(repos, org_doc, source_cluster)
+
+        await audit_log.emit(
+            "org.move",
+            organization_name,
+            details={"from": source_cluster, "to": target_cluster, "documents": copied + caught_up}
+        )
+        return {
+            "organization_name": organization_name,
+            "from": source_cluster,
+            "to": target_cluster,
+            "copied": copied,
+            "caught_up": caught_up
+        }
@@ -0,0 +1,151 @@
+import asyncio
+import heapq
+import time
+from datetime import datetime
+from typing import Optional
+from bson import ObjectId
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.database import DEFAULT_CLUSTER
+from app.core.metrics import registry
+from app.repositories import get_repositories
+
+# Organizations are processed, and their stats written, in batches of this size
+STATS_BATCH_SIZE = 500
+
+# Per-organization gauges cover only the stats_metrics_top_tenants largest
+# tenants, so /metrics does not grow with the fleet
+tenant_documents = registry.gauge(
+    "org_tenant_documents", "Documents in each of the largest tenant collections", ["organization"]
+)
+tenant_data_bytes = registry.gauge(
+    "org_tenant_data_bytes", "Uncompressed data size of each of the largest tenant collections", ["organization"]
+)
+tenant_index_bytes = registry.gauge(
+    "org_tenant_index_bytes", "Total index size of each of the largest tenant collections", ["organization"]
+)
+fleet_tenants = registry.gauge("org_fleet_tenants", "Organizations included in the last stats refresh")
+fleet_documents = registry.gauge("org_fleet_documents", "Documents across all tenant collections")
+fleet_data_bytes = registry.gauge("org_fleet_data_bytes", "Data size across all tenant collections")
+fleet_index_bytes = registry.gauge("org_fleet_index_bytes", "Index size across all tenant collections")
+refresh_duration = registry.gauge("org_stats_refresh_duration_seconds", "Duration of the last stats refresh")
+refresh_timestamp = registry.gauge("org_stats_refresh_timestamp_seconds", "Unix time of the last stats refresh")
+
+
+class StatsService:
+    """Service for gathering and serving per-tenant usage statistics."""
+
+    @staticmethod
+    async def collect_tenant_stats(org_doc: dict) -> dict:
+        """Gather storage figures for one organization's collection on its cluster."""
+        collection_name = org_doc["collection_name"]
+        cluster = org_doc.get("cluster", DEFAULT_CLUSTER)
+        figures = await get_repositories().tenants.collection_stats(collection_name, cluster)
+        return {
+            "_id": org_doc["_id"],
+            "organization_name": org_doc["organization_name"],
+            "collection_name": collection_name,
+            "cluster": cluster,
+            **figures,
+            "refreshed_at": datetime.utcnow()
+        }
+
+    @staticmethod
+    async def refresh_all() -> dict:
+        """
+        Recompute stats for every organization and store them in master_db.
+
+        Organizations are streamed in batches; within a batch at most
+        stats_concurrency collStats commands run at once, and the results
+        are written back with one bulk upsert per batch. Totals are also
+        kept per cluster, which is what least-loaded placement reads.
+        """
+        started = time.monotonic()
+        repos = get_repositories()
+        semaphore = asyncio.Semaphore(max(1, settings.stats_concurrency))
+
+        async def collect(org_doc: dict) -> dict:
+            async with semaphore:
+                return await StatsService.collect_tenant_stats(org_doc)
+
+        totals = {"tenants": 0, "document_count": 0, "data_size": 0, "index_size": 0, "clusters": {}}
+        published = []
+        top = max(0, settings.stats_metrics_top_tenants)
+
+        def keep_largest(results: list) -> list:
+            return heapq.nlargest(top, published + results, key=lambda entry: entry[2])
+
+        cursor = repos.organizations.iter_live(
+            STATS_BATCH_SIZE, projection={"organization_name": 1, "collection_name": 1, "cluster": 1}
+        )
+        batch = []
+        async for org_doc in cursor:
+            batch.append(org_doc)
+            if len(batch) >= STATS_BATCH_SIZE:
+                published = keep_largest(await StatsService._refresh_batch(repos, batch, collect, totals))
+                batch = []
+        if batch:
+            published = keep_largest(await StatsService._refresh_batch(repos, batch, collect, totals))
+
+        fleet = dict(totals, refreshed_at=datetime.utcnow())
+        await repos.tenants.save_fleet_stats(fleet)
+
+        # Republish per-tenant gauges from scratch so deleted tenants, and
+        # tenants no longer among the largest, disappear
+        for gauge in (tenant_documents, tenant_data_bytes, tenant_index_bytes):
+            gauge.clear()
+        for name, documents, data_size, index_size in published:
+            tenant_documents.set(documents, organization=name)
+            tenant_data_bytes.set(data_size, organization=name)
+            tenant_index_bytes.set(index_size, organization=name)
+        fleet_tenants.set(totals["tenants"])
+        fleet_documents.set(totals["document_count"])
+        fleet_data_bytes.set(totals["data_size"])
+        fleet_index_bytes.set(totals["index_size"])
+        refresh_duration.set(time.monotonic() - started)
+        refresh_timestamp.set(time.time())
+
+        return fleet
+
+    @staticmethod
+    async def _refresh_batch(repos, batch: list, collect, totals: dict) -> list:
+        """Collect and store stats for one batch, folding them into totals."""
+        results = await asyncio.gather(*(collect(org_doc) for org_doc in batch))
+        await repos.tenants.save_stats(results)
+
+        published = []
+        for stats in results:
+            totals["tenants"] += 1
+            totals["document_count"] += stats["document_count"]
+            totals["data_size"] += stats["data_size"]
+            totals["index_size"] += stats["index_size"]
+            cluster_totals = totals["clusters"].setdefault(stats["cluster"], {"tenants": 0, "data_size": 0})
+            cluster_totals["tenants"] += 1
+            cluster_totals["data_size"] += stats["data_size"]
+            published.append((
+                stats["organization_name"],
+                stats["document_count"],
+                stats["data_size"],
+                stats["index_size"]
+            ))
+        return published
+
+    @staticmethod
+    async def get_tenant_stats(organization_id: str) -> Optional[dict]:
+        """Get the last stored stats for one organization."""
+        return await get_repositories().tenants.get_stats(ObjectId(organization_id))
+
+    @staticmethod
+    async def get_fleet_stats() -> Optional[dict]:
+        """Get the last stored fleet-wide totals."""
+        return await get_repositories().tenants.get_fleet_stats()
+
+    @staticmethod
+    async def remove_tenant_stats(organization_id: str):
+        """Drop stored stats for a deleted organization."""
+        await get_repositories().tenants.remove_stats(ObjectId(organization_id))
+
+
+stats_refresher = PeriodicTask(
+    "tenant-stats-refresher", lambda: settings.stats_refresh_seconds, StatsService.refresh_all
+)
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.metrics import registry
+from app.models.master import Organization
+from app.repositories import get_repositories
+
+logger = logging.getLogger(__name__)
+
+# Failures kept in the progress report; the count is always exact
+PROGRESS_ERROR_LIMIT = 20
+
+templates_applied = registry.counter(
+    "org_tenant_templates_applied_total", "Tenant collections brought up to the current template"
+)
+template_failures = registry.counter(
+    "org_tenant_template_failures_total", "Tenant collections the template could not be applied to"
+)
+tenants_outdated = registry.gauge(
+    "org_tenants_template_outdated", "Tenants below the current template version at the last count"
+)
+
+# State of the current or last reconciliation, served by GET /admin/templates
+reconcile_progress = {
+    "version": None,
+    "running": False,
+    "started_at": None,
+    "finished_at": None,
+    "total": 0,
+    "applied": 0,
+    "failed": 0,
+    "errors": []
+}
+
+
+def current_template() -> dict:
+    """
+    The tenant collection template from TENANT_TEMPLATE, with defaults filled in.
+
+    Shape: {"version": int, "indexes": [{"keys": [[field, direction], ...],
+    "name": ..., <create_index options>}], "validator": {...} or None,
+    "validation_level": "moderate", "collation": {...} or None}.
+    Raises ValueError for a malformed template.
+    """
+    template = settings.tenant_template
+    version = template.get("version", 0)
+    if not isinstance(version, int) or version < 0:
+        raise ValueError("TENANT_TEMPLATE version must be a non-negative integer")
+    indexes = template.get("indexes", [])
+    for index in indexes:
+        if not index.get("keys") or not index.get("name"):
+            raise ValueError("Every TENANT_TEMPLATE index needs keys and a name")
+    return {
+        "version": version,
+        "indexes": indexes,
+        "validator": template.get("validator"),
+        "validation_level": template.get("validation_level", "moderate"),
+        "collation": template.get("collation")
+    }
+
+
+class TemplateService:
+    """Service keeping tenant collections on the current collection template."""
+
+    @staticmethod
+    async def reconcile() -> dict:
+        """
+        Apply the current template to every tenant below its version.
+
+        Organizations are walked in _id order in batches of
+        template_reconcile_batch_size, with at most
+        template_reconcile_concurrency collections changed at once, and
+        each organization records the version it reached. Failures are
+        logged and retried on the next run. Indexes and the validator are
+        applied; the collation only takes effect for new tenants, since
+        MongoDB cannot change the collation of an existing collection.
+        Removing an index from the template does not drop it.
+        """
+        template = current_template()
+        repos = get_repositories()
+        version = template["version"]
+        semaphore = asyncio.Semaphore(max(1, settings.template_reconcile_concurrency))
+
+        total = await repos.organizations.count_template_outdated(version)
+        tenants_outdated.set(total)
+        reconcile_progress.update(
+            version=version, running=True, started_at=datetime.utcnow(), finished_at=None,
+            total=total, applied=0, failed=0, errors=[]
+        )
+
+        async def apply(org: Organization) -> Optional[Organization]:
+            async with semaphore:
+                try:
+                    await repos.tenants.apply_template(org.collection_name, org.cluster, template)
+                except Exception as e:
+                    logger.warning("Could not apply tenant template to %s: %s", org.collection_name, e)
+                    template_failures.inc()
+                    reconcile_progress["failed"] += 1
+                    if len(reconcile_progress["errors"]) < PROGRESS_ERROR_LIMIT:
+                        reconcile_progress["errors"].append({
+                            "organization_id": str(org.id),
+                            "collection_name": org.collection_name,
+                            "error": str(e)
+                        })
+                    return None
+                return org
+
+        try:
+            after = None
+            while True:
+                batch = await repos.organizations.list_template_outdated(
+                    version, after, settings.template_reconcile_batch_size, projection=Organization.PROJECTION
+                )
+                if not batch:
+                    break
+                after = batch[-1]["_id"]
+                # Tenants mid-move get the template once the move completes
+                orgs = [Organization.from_dict(doc) for doc in batch if not doc.get("moving_to")]
+                done = [org for org in await asyncio.gather(*(apply(org) for org in orgs)) if org]
+                await repos.organizations.set_fields_many(
+                    [(org.id, {"template_version": version}) for org in done]
+                )
+                templates_applied.inc(len(done))
+                reconcile_progress["applied"] += len(done)
+        finally:
+            reconcile_progress.update(running=False, finished_at=datetime.utcnow())
+            tenants_outdated.set(reconcile_progress["total"] - reconcile_progress["applied"])
+        return dict(reconcile_progress)
+
+
+template_reconciler = PeriodicTask(
+    "tenant-template-reconciler", lambda: settings.template_reconcile_seconds, TemplateService.reconcile
+)
@@ -0,0 +1,220 @@
+import struct
+import zlib
+from typing import AsyncIterator, List, Optional
+from bson import json_util
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from pymongo.errors import BulkWriteError
+from app.core.database import get_org_collection
+from app.core.tenant_scheduler import tenant_scheduler
+
+# Documents are fetched and inserted in batches of this many
+TRANSFER_BATCH_SIZE = 1000
+# Stream chunks are flushed once they reach this many bytes
+CHUNK_BYTES = 1024 * 1024
+# BSON caps documents at 16MB; anything claiming more is corrupt input
+MAX_DOCUMENT_BYTES = 16 * 1024 * 1024
+DUPLICATE_KEY_ERROR = 11000
+
+RAW_CODEC_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+
+EXPORT_FORMATS = {
+    "bson": ("application/octet-stream", "bson"),
+    "ndjson": ("application/gzip", "ndjson.gz"),
+}
+
+
+class BSONFrameReader:
+    """
+    Incrementally split a byte stream into BSON documents.
+    Each BSON document starts with its own little-endian int32 length,
+    so concatenated documents need no extra framing.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[RawBSONDocument]:
+        """Add bytes and return every document that is now complete."""
+        self._buffer.extend(data)
+        documents = []
+        offset = 0
+        while len(self._buffer) - offset >= 4:
+            (length,) = struct.unpack_from("<i", self._buffer, offset)
+            if length < 5 or length > MAX_DOCUMENT_BYTES:
+                raise ValueError(f"Invalid BSON document length {length}")
+            if len(self._buffer) - offset < length:
+                break
+            documents.append(RawBSONDocument(bytes(self._buffer[offset:offset + length]), RAW_CODEC_OPTIONS))
+            offset += length
+        del self._buffer[:offset]
+        return documents
+
+    def close(self):
+        """Fail if the stream ended in the middle of a document."""
+        if self._buffer:
+            raise ValueError("Stream ended with an incomplete BSON document")
+
+
+class NDJSONLineReader:
+    """
+    Incrementally gunzip a byte stream and parse newline-delimited Extended JSON.
+    Input is inflated at most CHUNK_BYTES at a time and lines are capped at
+    MAX_DOCUMENT_BYTES, so a small gzip bomb cannot take unbounded memory.
+    """
+
+    def __init__(self):
+        # wbits=31 selects the gzip container
+        self._decompressor = zlib.decompressobj(wbits=31)
+        self._buffer = b""
+
+    def _parse(self, lines: List[bytes]) -> List[dict]:
+        if any(len(line) > MAX_DOCUMENT_BYTES for line in lines):
+            raise ValueError(f"NDJSON line longer than {MAX_DOCUMENT_BYTES} bytes")
+        return [json_util.loads(line) for line in lines if line.strip()]
+
+    def _split(self, data: bytes) -> List[dict]:
+        *lines, self._buffer = (self._buffer + data).split(b"\n")
+        if len(self._buffer) > MAX_DOCUMENT_BYTES:
+            raise ValueError(f"NDJSON line longer than {MAX_DOCUMENT_BYTES} bytes")
+        return self._parse(lines)
+
+    def feed(self, data: bytes) -> List[dict]:
+        """Add compressed bytes and return every document that is now complete."""
+        documents = []
+        while data:
+            try:
+                documents.extend(self._split(self._decompressor.decompress(data, CHUNK_BYTES)))
+            except zlib.error as e:
+                raise ValueError(f"Invalid gzip stream: {e}")
+            # Input left over once CHUNK_BYTES were produced
+            data = self._decompressor.unconsumed_tail
+        return documents
+
+    def close(self) -> List[dict]:
+        """Return the final line if the stream did not end with a newline."""
+        documents = self._split(self._decompressor.flush())
+        lines, self._buffer = [self._buffer], b""
+        return documents + self._parse(lines)
+
+
+async def _scheduled_batches(cursor, collection_name: str, scheduling: Optional[dict]) -> AsyncIterator[list]:
+    """Fetch cursor batches, each under one tenant scheduler slot that is released before the batch is used."""
+    while True:
+        async with tenant_scheduler.slot(collection_name, scheduling):
+            batch = await cursor.to_list(length=TRANSFER_BATCH_SIZE)
+        if not batch:
+            return
+        yield batch
+
+
+class TenantTransferService:
+    """Service for streaming tenant collections in and out of the service."""
+
+    @staticmethod
+    async def export_collection(
+        collection_name: str,
+        export_format: str = "bson",
+        cluster: Optional[str] = None,
+        scheduling: Optional[dict] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream the organization's collection as raw BSON or gzip'd NDJSON.
+
+        BSON export hands the server's bytes straight through as
+        RawBSONDocument, without decoding into dicts. Chunks are produced
+        only as fast as the response consumes them, so memory stays bounded
+        by one cursor batch plus one chunk. Each batch is fetched through
+        the tenant scheduler, with the organization's overrides.
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format '{export_format}'")
+        collection = await get_org_collection(collection_name, cluster)
+        raw_collection = collection.with_options(codec_options=RAW_CODEC_OPTIONS)
+        cursor = raw_collection.find({}).batch_size(TRANSFER_BATCH_SIZE)
+        batches = _scheduled_batches(cursor, collection_name, scheduling)
+
+        if export_format == "bson":
+            chunk = bytearray()
+            async for batch in batches:
+                for doc in batch:
+                    chunk.extend(doc.raw)
+                    if len(chunk) >= CHUNK_BYTES:
+                        yield bytes(chunk)
+                        chunk.clear()
+            if chunk:
+                yield bytes(chunk)
+        else:
+            compressor = zlib.compressobj(wbits=31)
+            chunk = bytearray()
+            async for batch in batches:
+                for doc in batch:
+                    line = json_util.dumps(doc, json_options=json_util.CANONICAL_JSON_OPTIONS)
+                    chunk.extend(compressor.compress(line.encode("utf-8") + b"\n"))
+                    if len(chunk) >= CHUNK_BYTES:
+                        yield bytes(chunk)
+                        chunk.clear()
+            chunk.extend(compressor.flush())
+            yield bytes(chunk)
+
+    @staticmethod
+    async def _insert_batch(collection, documents: list) -> tuple:
+        """Insert a batch, counting documents whose _id already exists as skipped."""
+        try:
+            result = await collection.insert_many(documents, ordered=False)
+            return len(result.inserted_ids), 0
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if any(error.get("code") != DUPLICATE_KEY_ERROR for error in errors):
+                raise
+            return e.details.get("nInserted", 0), len(errors)
+
+    @staticmethod
+    async def import_collection(
+        collection_name: str,
+        stream: AsyncIterator[bytes],
+        import_format: str = "bson",
+        cluster: Optional[str] = None,
+        scheduling: Optional[dict] = None
+    ) -> dict:
+        """
+        Load documents from a BSON or gzip'd NDJSON byte stream.
+
+        The stream is parsed as it arrives and written in insert_many
+        batches; the next chunk is not read until the current batch is
+        stored, which keeps memory bounded and pushes back on the client.
+        Documents whose _id already exists are skipped, so an interrupted
+        import can simply be re-run. Each insert_many goes through the
+        tenant scheduler, so a large import cannot take the whole pool.
+        """
+        if import_format == "bson":
+            reader = BSONFrameReader()
+        elif import_format == "ndjson":
+            reader = NDJSONLineReader()
+        else:
+            raise ValueError(f"Unknown import format '{import_format}'")
+
+        collection = await get_org_collection(collection_name, cluster)
+        imported = 0
+        skipped = 0
+        batch = []
+
+        async for data in stream:
+            batch.extend(reader.feed(data))
+            while len(batch) >= TRANSFER_BATCH_SIZE:
+                async with tenant_scheduler.slot(collection_name, scheduling):
+                    inserted, duplicates = await TenantTransferService._insert_batch(
+                        collection, batch[:TRANSFER_BATCH_SIZE]
+                    )
+                imported += inserted
+                skipped += duplicates
+                del batch[:TRANSFER_BATCH_SIZE]
+
+        batch.extend(reader.close() or [])
+        if batch:
+            async with tenant_scheduler.slot(collection_name, scheduling):
+                inserted, duplicates = await TenantTransferService._insert_batch(collection, batch)
+            imported += inserted
+            skipped += duplicates
+
+        return {"imported": imported, "skipped": skipped}
@@ -1,10 +1,20 @@
 import re
 
 
+def tenant_collection_name(organization_id: str) -> str:
+    """
+    Collection name for an organization's data.
+    Pattern: org_<organization_id>. Keyed by the immutable id, so renaming
+    an organization never moves its data.
+    """
+    return f"org_{organization_id}"
+
+
 def slugify_org_name(organization_name: str) -> str:
     """
-    Convert organization name to a safe collection name.
-    Pattern: org_<slugged_name>
+    Convert organization name to the legacy collection name.
+    Pattern: org_<slugged_name>. Only used to recognise collections created
+    before tenant collections were keyed by organization id.
     """
     # Convert to lowercase
     slug = organization_name.lower()
@@ -18,3 +28,30 @@ def slugify_org_name(organization_name: str) -> str:
     slug = slug.strip('_')
     return f"org_{slug}"
 
+
+
+def normalize_org_name(organization_name: str) -> str:
+    """
+    Normalize organization name for case-insensitive search.
+    Lowercases and collapses runs of whitespace into single spaces.
+    """
+    return " ".join(organization_name.lower().split())
+
+
+def name_trigrams(normalized_name: str) -> list:
+    """
+    Build the sorted, de-duplicated trigram tokens of a normalized name.
+    Names shorter than three characters yield no tokens.
+    """
+    return sorted({normalized_name[i:i + 3] for i in range(len(normalized_name) - 2)})
+
+
+TOMBSTONE_PREFIX = "<deleted:"
+
+
+def tombstone_name(organization_id: str) -> str:
+    """
+    Name held by a deleted organization until it is reclaimed.
+    Unique per organization, so the real name is free for reuse at once.
+    """
+    return f"{TOMBSTONE_PREFIX}{organization_id}>"
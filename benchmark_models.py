@@ -0,0 +1,108 @@
+"""
+Micro-benchmark of the organization read path: decoding a document and
+shaping it for a response, before and after the slotted models.
+Run: python benchmark_models.py [--iterations N]
+
+"before" decodes the full stored document, as an unprojected find_one
+returns it, into a plain __dict__ class. "after" decodes only
+Organization.PROJECTION into the slotted dataclass. No database is needed;
+the documents are encoded locally exactly as the server would send them.
+"""
+import argparse
+import sys
+import timeit
+import tracemalloc
+from datetime import datetime
+import bson
+from bson import ObjectId
+from app.models.master import Organization
+from app.utils.naming import tenant_collection_name
+
+
+class PlainOrganization:
+    """The previous model: a regular class with a per-instance __dict__."""
+
+    def __init__(self, organization_name, collection_name, admin_email, admin_id,
+                 created_at=None, updated_at=None, version=1, cluster="default", id=None):
+        self.organization_name = organization_name
+        self.collection_name = collection_name
+        self.admin_email = admin_email
+        self.admin_id = admin_id
+        self.created_at = created_at or datetime.utcnow()
+        self.updated_at = updated_at or datetime.utcnow()
+        self.version = version
+        self.cluster = cluster
+        self.id = id
+
+
+def sample_documents():
+    org_id = ObjectId()
+    org = Organization(
+        organization_name="Northwind Traders International Holdings",
+        collection_name=tenant_collection_name(str(org_id)),
+        admin_email="admin@northwind.example.com",
+        admin_id=str(ObjectId()),
+        id=org_id
+    )
+    full = org.to_dict()
+    projected = {key: value for key, value in full.items() if key == "_id" or key in Organization.PROJECTION}
+    return bson.encode(full), bson.encode(projected)
+
+
+def read_before(raw: bytes):
+    doc = bson.decode(raw)
+    return PlainOrganization(
+        doc["organization_name"], doc["collection_name"], doc["admin_email"], doc["admin_id"],
+        doc.get("created_at"), doc.get("updated_at"), doc.get("version", 1), doc.get("cluster", "default"),
+        doc["_id"]
+    )
+
+
+def read_after(raw: bytes):
+    return Organization.from_dict(bson.decode(raw))
+
+
+def retained_bytes(read, raw: bytes, count: int) -> float:
+    """Bytes per instance still allocated while count instances are held."""
+    tracemalloc.start()
+    baseline = tracemalloc.take_snapshot()
+    held = [read(raw) for _ in range(count)]
+    current = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in current.compare_to(baseline, "filename"))
+    del held
+    return size / count
+
+
+def peak_bytes(read, raw: bytes, count: int) -> float:
+    """Peak bytes allocated per read while reads are discarded immediately."""
+    tracemalloc.start()
+    for _ in range(count):
+        read(raw)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=100000)
+    args = parser.parse_args()
+
+    full_raw, projected_raw = sample_documents()
+    cases = [("before", read_before, full_raw), ("after", read_after, projected_raw)]
+
+    print(f"Document bytes on the wire: before {len(full_raw)}, after {len(projected_raw)}")
+    print()
+    print(f"{'':8} {'us/read':>10} {'bytes held/instance':>22} {'peak bytes':>12} {'instance size':>15}")
+    for label, read, raw in cases:
+        seconds = min(timeit.repeat(lambda: read(raw), number=args.iterations, repeat=3))
+        held = retained_bytes(read, raw, 10000)
+        peak = peak_bytes(read, raw, 1000)
+        instance = read(raw)
+        size = sys.getsizeof(instance) + (sys.getsizeof(instance.__dict__) if hasattr(instance, "__dict__") else 0)
+        print(f"{label:8} {seconds / args.iterations * 1e6:>10.2f} {held:>22.0f} {peak:>12} {size:>15}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Throughput of OrganizationService and AuthService on the in-memory
+repositories, with no database.
+Run: python benchmark_services.py [--organizations N] [--operations N]
+
+Organizations are seeded straight into the repositories so password
+hashing, which is deliberately slow, does not dominate the numbers; the
+measured operations never hash a password. JWT_SECRET and MONGO_URI must
+still be set, as for the app, but MongoDB is never contacted.
+"""
+import os
+
+os.environ["REPOSITORY_BACKEND"] = "memory"
+
+import argparse
+import asyncio
+import time
+from bson import ObjectId
+from app.core.security import create_access_token
+from app.models.master import AdminUser, Organization
+from app.repositories import get_repositories
+from app.services.auth_service import AuthService
+from app.services.org_service import OrganizationService
+from app.utils.naming import name_trigrams, normalize_org_name, tenant_collection_name
+
+
+async def seed(count: int) -> list:
+    """Insert count organizations with their admins; returns (name, token) pairs."""
+    repos = get_repositories()
+    seeded = []
+    for i in range(count):
+        name = f"Benchmark Org {i:06d}"
+        org_id = ObjectId()
+        email = f"admin{i}@bench.example.com"
+        admin_id = await repos.admin_users.insert(AdminUser(
+            email=email, hashed_password="unused", organization_name=name, organization_id=str(org_id)
+        ).to_dict())
+        document = Organization(
+            organization_name=name,
+            collection_name=tenant_collection_name(str(org_id)),
+            admin_email=email,
+            admin_id=str(admin_id),
+            id=org_id
+        ).to_dict()
+        normalized_name = normalize_org_name(name)
+        document.update(name_normalized=normalized_name, name_trigrams=name_trigrams(normalized_name))
+        await repos.organizations.insert(document)
+        token = create_access_token({"admin_id": str(admin_id), "organization_id": str(org_id), "email": email})
+        seeded.append((name, token))
+    return seeded
+
+
+async def measure(label: str, operations: int, operation):
+    start = time.perf_counter()
+    for i in range(operations):
+        await operation(i)
+    elapsed = time.perf_counter() - start
+    print(f"{label:28} {operations / elapsed:>12,.0f} ops/s {elapsed / operations * 1e6:>10.1f} us/op")
+
+
+async def run(organizations: int, operations: int):
+    seeded = await seed(organizations)
+    print(f"Seeded {organizations} organizations")
+    print()
+
+    async def get(i):
+        await OrganizationService.get_organization(seeded[i % organizations][0])
+
+    async def get_etag(i):
+        await OrganizationService.get_organization_etag(seeded[i % organizations][0])
+
+    async def search_prefix(i):
+        # Drop the last two digits: each query matches up to 100 organizations
+        await OrganizationService.search_organizations(seeded[i % organizations][0][:-2], limit=20)
+
+    async def current_admin(i):
+        await AuthService.get_current_admin(seeded[i % organizations][1])
+
+    async def update(i):
+        await OrganizationService.update_organization(seeded[i % organizations][0])
+
+    await measure("get_organization", operations, get)
+    await measure("get_organization_etag", operations, get_etag)
+    await measure("search_organizations", operations, search_prefix)
+    await measure("get_current_admin", operations, current_admin)
+    await measure("update_organization", operations, update)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--organizations", type=int, default=10000)
+    parser.add_argument("--operations", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(run(args.organizations, args.operations))
+
+
+if __name__ == "__main__":
+    main()
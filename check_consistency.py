@@ -0,0 +1,54 @@
+"""
+Cross-check organizations, admin users and tenant collections for orphans.
+Run: python check_consistency.py [--repair]
+"""
+import argparse
+import asyncio
+from app.core.database import close_database
+from app.services.consistency_service import ConsistencyService
+
+DESCRIPTIONS = {
+    "orphaned_admins": "admin users whose organization is gone",
+    "stale_admin_names": "admin users with an outdated organization name",
+    "organizations_without_admin": "organizations whose admin user is gone",
+    "organizations_without_collection": "organizations whose collection is missing",
+    "unowned_collections": "org_* collections no organization points at",
+}
+
+
+async def run(repair: bool):
+    try:
+        report = await ConsistencyService.check(repair=repair)
+    finally:
+        await close_database()
+
+    scanned = report["scanned"]
+    print(
+        f"Scanned {scanned['organizations']} organizations, {scanned['admin_users']} admin users "
+        f"and {scanned['collections']} collections"
+    )
+    print()
+    for category, count in report["counts"].items():
+        status = "[OK]" if count == 0 else "[!]"
+        line = f"{status} {count} {DESCRIPTIONS[category]}"
+        if repair and count:
+            line += f" ({report['repaired'][category]} repaired)"
+        print(line)
+        for finding in report["samples"][category]:
+            print(f"    {finding}")
+
+    print()
+    print("=" * 60)
+    print("Consistent" if report["consistent"] else ("Repair finished" if repair else "Run with --repair to fix"))
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repair", action="store_true", help="Fix what can be fixed instead of only reporting")
+    args = parser.parse_args()
+    asyncio.run(run(args.repair))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Populate MongoDB with a synthetic fleet of organizations for capacity tests.
+Run: python generate_fleet.py --organizations N [--max-documents N] [--seed N] [--drop]
+
+Each organization gets an admin user and a tenant collection whose size
+follows a Zipf distribution: a few tenants are very large and most are
+small, as in production. Everything is written with unordered insert_many
+batches from parallel workers, and every admin shares one password hash
+computed up front, so bcrypt never limits throughput. The same seed gives
+the same names, sizes and documents.
+
+Intended for a local or disposable MongoDB (MONGO_URI): never run it
+against production. Tenant collections are provisioned like the app's own,
+from the current TENANT_TEMPLATE (collation, validator and indexes) with a
+metadata document, and record its version; benchmark index builds by
+bumping TENANT_TEMPLATE's version afterwards.
+"""
+import argparse
+import asyncio
+import random
+import re
+import time
+from datetime import datetime, timedelta
+from bson import ObjectId
+from app.core.config import settings
+from app.core.database import close_database, ensure_indexes, get_master_db, get_tenant_db
+from app.core.security import hash_password
+from app.models.master import AdminUser, Organization
+from app.repositories import get_repositories
+from app.services.template_service import current_template
+from app.utils.naming import tenant_collection_name
+
+# Organizations (with their admins) per insert_many, and tenant documents per insert_many
+ORGANIZATION_BATCH_SIZE = 1000
+DOCUMENT_BATCH_SIZE = 1000
+KINDS = ("invoice", "order", "ticket", "contact", "event", "note")
+TAGS = ("priority", "archived", "internal", "external", "review", "billing", "support", "sales")
+
+
+def zipf_sizes(count: int, max_documents: int, exponent: float, rng: random.Random) -> list:
+    """Tenant sizes for count organizations: max_documents / rank**exponent, ranks shuffled."""
+    sizes = [int(max_documents / rank ** exponent) for rank in range(1, count + 1)]
+    rng.shuffle(sizes)
+    return sizes
+
+
+def organization_name(prefix: str, index: int) -> str:
+    return f"{prefix} {index:07d}"
+
+
+def tenant_documents(rng: random.Random, count: int, start: datetime) -> list:
+    """count plausible tenant documents; the fields vary enough to make indexes meaningful."""
+    return [
+        {
+            "kind": rng.choice(KINDS),
+            "title": f"{rng.choice(KINDS)} {rng.randrange(1_000_000):06d}",
+            "amount": round(rng.lognormvariate(4, 1.2), 2),
+            "status": rng.choice(("open", "open", "open", "closed", "pending")),
+            "tags": rng.sample(TAGS, rng.randint(0, 3)),
+            "created_at": start + timedelta(seconds=rng.randrange(365 * 24 * 3600))
+        }
+        for _ in range(count)
+    ]
+
+
+async def drop_fleet(prefix: str, workers: int) -> int:
+    """Delete every organization named with prefix, with its admin and collection."""
+    master_db = await get_master_db()
+    query = {"organization_name": {"$regex": f"^{re.escape(prefix)} [0-9]+$"}}
+    orgs = await master_db.organizations.find(
+        query, projection={"collection_name": 1, "cluster": 1, "admin_id": 1}
+    ).to_list(length=None)
+    semaphore = asyncio.Semaphore(workers)
+
+    async def drop(org_doc: dict):
+        async with semaphore:
+            tenant_db = await get_tenant_db(org_doc.get("cluster"))
+            await tenant_db.drop_collection(org_doc["collection_name"])
+
+    await asyncio.gather(*(drop(org_doc) for org_doc in orgs))
+    await master_db.admin_users.delete_many({"_id": {"$in": [ObjectId(org["admin_id"]) for org in orgs]}})
+    await master_db.organizations.delete_many(query)
+    return len(orgs)
+
+
+async def generate(args) -> dict:
+    rng = random.Random(args.seed)
+    sizes = zipf_sizes(args.organizations, args.max_documents, args.zipf_exponent, rng)
+    # One hash for every admin: hashing per admin would take hours at this scale
+    hashed_password = hash_password(args.password)
+    master_db = await get_master_db()
+    tenant_db = await get_tenant_db()
+    tenants_repo = get_repositories().tenants
+    template = current_template()
+    start = datetime(2024, 1, 1)
+    totals = {"organizations": 0, "documents": 0}
+    started = time.monotonic()
+
+    async def write_batch(first: int, last: int):
+        # Each batch has its own generator, so output does not depend on worker timing
+        batch_rng = random.Random(f"{args.seed}:{first}")
+        admins, orgs, tenants = [], [], []
+        for index in range(first, last):
+            name = organization_name(args.prefix, index)
+            org_id, admin_id = ObjectId(), ObjectId()
+            email = f"admin{index}@{args.prefix.lower().replace(' ', '-')}.example.com"
+            admins.append(AdminUser(
+                email=email,
+                hashed_password=hashed_password,
+                organization_name=name,
+                organization_id=str(org_id),
+                id=admin_id
+            ).to_dict())
+            org = Organization(
+                organization_name=name,
+                collection_name=tenant_collection_name(str(org_id)),
+                admin_email=email,
+                admin_id=str(admin_id),
+                id=org_id,
+                template_version=template["version"]
+            )
+            orgs.append(org.to_dict())
+            tenants.append((org, sizes[index]))
+
+        await master_db.admin_users.insert_many(admins, ordered=False)
+        await master_db.organizations.insert_many(orgs, ordered=False)
+        for org, size in tenants:
+            # Provisioned as create_organization does, so the template applies from the start
+            await tenants_repo.create(org.collection_name, org.cluster, {
+                "organization_name": org.organization_name,
+                "created_at": org.created_at,
+                "collection_name": org.collection_name
+            }, template)
+            collection = tenant_db[org.collection_name]
+            for offset in range(0, size, DOCUMENT_BATCH_SIZE):
+                documents = tenant_documents(batch_rng, min(DOCUMENT_BATCH_SIZE, size - offset), start)
+                await collection.insert_many(documents, ordered=False, bypass_document_validation=True)
+            totals["documents"] += size
+
+        totals["organizations"] += last - first
+        elapsed = time.monotonic() - started
+        print(
+            f"    {totals['organizations']:>9,} organizations {totals['documents']:>12,} documents "
+            f"{totals['organizations'] / elapsed:>9,.0f} orgs/s {totals['documents'] / elapsed:>11,.0f} docs/s"
+        )
+
+    batches = [
+        (first, min(first + ORGANIZATION_BATCH_SIZE, args.organizations))
+        for first in range(0, args.organizations, ORGANIZATION_BATCH_SIZE)
+    ]
+    # Workers take batches in order; big tenants are spread evenly by the shuffle
+    pending = iter(batches)
+
+    async def worker():
+        for first, last in pending:
+            await write_batch(first, last)
+
+    await asyncio.gather(*(worker() for _ in range(args.workers)))
+    totals["seconds"] = time.monotonic() - started
+    return totals
+
+
+async def run(args):
+    try:
+        await ensure_indexes()
+        master_db = await get_master_db()
+        if args.drop:
+            dropped = await drop_fleet(args.prefix, args.workers)
+            print(f"[OK] Dropped {dropped} organization(s) named '{args.prefix} <n>'")
+        elif await master_db.organizations.find_one({"organization_name": organization_name(args.prefix, 0)}):
+            print(f"[X] A fleet named '{args.prefix} <n>' already exists; re-run with --drop to replace it")
+            return
+
+        print(f"Generating {args.organizations:,} organizations into {settings.master_db} (seed {args.seed})")
+        totals = await generate(args)
+    finally:
+        await close_database()
+
+    print()
+    print("=" * 60)
+    print(
+        f"{totals['organizations']:,} organizations and {totals['documents']:,} documents "
+        f"in {totals['seconds']:.1f}s"
+    )
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--organizations", type=int, default=10000)
+    parser.add_argument("--max-documents", type=int, default=100000, help="Documents in the largest tenant")
+    parser.add_argument("--zipf-exponent", type=float, default=1.1, help="Higher skews sizes further")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=8, help="Batches written concurrently")
+    parser.add_argument("--prefix", default="Fleet", help="Organizations are named '<prefix> <n>'")
+    parser.add_argument("--password", default="fleetpass123", help="Password of every generated admin")
+    parser.add_argument("--drop", action="store_true", help="Delete an existing fleet with this prefix first")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Move legacy org_<slug> tenant collections to id-keyed org_<organization_id> names.
+Run: python migrate_tenant_collections.py [--dry-run]
+"""
+import argparse
+import asyncio
+from app.core.database import close_database
+from app.services.migration_service import TenantMigrationService
+
+
+async def run(dry_run: bool):
+    try:
+        report = await TenantMigrationService.migrate_legacy_collections(dry_run=dry_run)
+    finally:
+        await close_database()
+
+    action = "Would migrate" if dry_run else "Migrated"
+    for entry in report["migrated"]:
+        print(f"[OK] {action} '{entry['organization_name']}': {entry['from']} -> {entry['to']}")
+    for entry in report["missing"]:
+        print(f"[!] '{entry['organization_name']}' had no collection {entry['from']}; now points at {entry['to']}")
+    for entry in report["shared"]:
+        names = ", ".join(entry["organizations"])
+        print(f"[!] {entry['collection_name']} was shared by: {names}. Each now has its own copy; review their data.")
+
+    print()
+    print("=" * 60)
+    print(f"{action} {len(report['migrated'])} organization(s)")
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without changing it")
+    args = parser.parse_args()
+    asyncio.run(run(args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
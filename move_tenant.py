@@ -0,0 +1,40 @@
+"""
+Move an organization's tenant collection to another cluster.
+Run: python move_tenant.py <organization_name> <cluster>
+"""
+import argparse
+import asyncio
+from app.core.database import close_database
+from app.services.audit_service import audit_log
+from app.services.placement_service import PlacementService
+
+
+async def run(organization_name: str, cluster: str):
+    audit_log.start()
+    try:
+        result = await PlacementService.move_tenant(
+            organization_name,
+            cluster,
+            progress=lambda copied: print(f"    copied {copied} documents...")
+        )
+    except ValueError as e:
+        print(f"[!] {e}")
+        return
+    finally:
+        await audit_log.stop()
+        await close_database()
+
+    print(f"[OK] Moved '{result['organization_name']}' from {result['from']} to {result['to']}")
+    print(f"    {result['copied']} documents copied online, {result['caught_up']} caught up while fenced")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("organization_name")
+    parser.add_argument("cluster", help="Cluster name from TENANT_CLUSTERS, or 'default'")
+    args = parser.parse_args()
+    asyncio.run(run(args.organization_name, args.cluster))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+import os
+from httpx import AsyncClient
+
+# Run the suite against the in-memory repositories; no MongoDB is needed
+os.environ.setdefault("REPOSITORY_BACKEND", "memory")
+
+
+async def create_and_login(client: AsyncClient, name: str, email: str) -> dict:
+    """Create an organization through the API and log its admin in, returning the login response."""
+    response = await client.post(
+        "/org/create",
+        json={"organization_name": name, "email": email, "password": "securepass123"}
+    )
+    assert response.status_code == 201
+    response = await client.post("/admin/login", json={"email": email, "password": "securepass123"})
+    assert response.status_code == 200
+    return response.json()
+
+
+def auth_headers(tokens: dict) -> dict:
+    """Authorization headers carrying the access token from a login response."""
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
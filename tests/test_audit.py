@@ -0,0 +1,18 @@
+import pytest
+from app.core.config import settings
+from app.services.audit_service import AuditLog, events_dropped
+
+
+@pytest.mark.asyncio
+async def test_audit_log_drops_when_queue_full(monkeypatch):
+    """Test events beyond the queue bound are dropped and counted."""
+    monkeypatch.setattr(settings, "audit_queue_size", 2)
+    monkeypatch.setattr(settings, "audit_overflow", "drop")
+    log = AuditLog()
+    dropped_before = events_dropped.value()
+    
+    for _ in range(3):
+        await log.emit("org.update", "TestOrg", actor="admin@testorg.com")
+    
+    assert log.queue.qsize() == 2
+    assert events_dropped.value() == dropped_before + 1
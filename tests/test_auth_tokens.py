@@ -0,0 +1,96 @@
+import pytest
+from bson import ObjectId
+from httpx import AsyncClient
+from app.main import app
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.models.master import AdminUser
+from app.repositories import get_repositories
+from app.services.auth_service import token_revocations
+from tests.conftest import create_and_login
+
+
+@pytest.mark.asyncio
+async def test_stateless_tokens_skip_lookup_until_revoked(monkeypatch):
+    """Test stateless mode authenticates from the claims alone and honours revocations."""
+    monkeypatch.setattr(settings, "auth_mode", "stateless")
+    admin_users = get_repositories().admin_users
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        tokens = await create_and_login(client, "StatelessOrg", "admin@stateless.com")
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        await token_revocations.refresh()
+        
+        find_by_id = admin_users.find_by_id
+        
+        async def no_lookup(admin_id, projection=None, **kwargs):
+            # The update itself reads the admin's current fields; only the auth lookup is refused
+            if projection == AdminUser.PROFILE_PROJECTION:
+                raise AssertionError("admin looked up for a stateless token")
+            return await find_by_id(admin_id, projection, **kwargs)
+        
+        # Any update sets the password, which revokes the tokens issued so far
+        update = {"organization_name": "StatelessOrg", "email": "admin@stateless.com", "password": "newpass12345"}
+        with monkeypatch.context() as patched:
+            patched.setattr(admin_users, "find_by_id", no_lookup)
+            assert (await client.put("/org/update", json=update, headers=headers)).status_code == 200
+        assert (await client.put("/org/update", json=update, headers=headers)).status_code == 401
+        
+        # Another instance learns of the revocation from the next refresh
+        token_revocations._versions.clear()
+        await token_revocations.refresh()
+        assert (await client.put("/org/update", json=update, headers=headers)).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_refresh_tokens_issue_access_tokens_until_revoked():
+    """Test a refresh token is exchanged for an access token, is not an access token itself, and is revoked by delete."""
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        tokens = await create_and_login(client, "RefreshOrg", "admin@refresh.com")
+        
+        response = await client.post("/admin/refresh", json={"refresh_token": tokens["refresh_token"]})
+        assert response.status_code == 200
+        assert response.json()["organization_name"] == "RefreshOrg"
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        
+        refresh_headers = {"Authorization": f"Bearer {tokens['refresh_token']}"}
+        response = await client.delete("/org/delete", params={"organization_name": "RefreshOrg"}, headers=refresh_headers)
+        assert response.status_code == 401
+        
+        response = await client.delete("/org/delete", params={"organization_name": "RefreshOrg"}, headers=headers)
+        assert response.status_code == 200
+        response = await client.post("/admin/refresh", json={"refresh_token": tokens["refresh_token"]})
+        assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_revoked_tokens_are_refused_without_a_current_map(monkeypatch):
+    """Test the database fallback also checks the token version, and a malformed admin_id is a 401."""
+    monkeypatch.setattr(settings, "auth_mode", "stateless")
+    monkeypatch.setattr(token_revocations, "_refreshed_at", None)
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        tokens = await create_and_login(client, "StaleMapOrg", "admin@stalemap.com")
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        await get_repositories().admin_users.bump_token_version(ObjectId(tokens["admin_id"]))
+        
+        update = {"organization_name": "StaleMapOrg", "email": "admin@stalemap.com", "password": "newpass12345"}
+        assert (await client.put("/org/update", json=update, headers=headers)).status_code == 401
+        
+        forged = create_access_token({"organization_name": "StaleMapOrg", "admin_id": "not-an-id", "ver": 0})
+        response = await client.put("/org/update", json=update, headers={"Authorization": f"Bearer {forged}"})
+        assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_update_revokes_tokens_only_when_credentials_change():
+    """Test an update resending the same password keeps the caller's token, and a new password revokes it."""
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        tokens = await create_and_login(client, "SteadyOrg", "admin@steady.com")
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        unchanged = {"organization_name": "SteadyOrg", "email": "admin@steady.com", "password": "securepass123"}
+        
+        assert (await client.put("/org/update", json=unchanged, headers=headers)).status_code == 200
+        assert (await client.put("/org/update", json=unchanged, headers=headers)).status_code == 200
+        
+        changed = dict(unchanged, password="newpass12345")
+        assert (await client.put("/org/update", json=changed, headers=headers)).status_code == 200
+        assert (await client.put("/org/update", json=changed, headers=headers)).status_code == 401
@@ -0,0 +1,70 @@
+import asyncio
+import pytest
+from httpx import AsyncClient
+from app.main import app
+from app.core.config import settings
+from app.services import consistency_service
+from app.services.consistency_service import ConsistencyReport, REPORT_SAMPLE_LIMIT, _for_each_batch
+
+
+async def as_cursor(items):
+    for item in items:
+        yield item
+
+
+@pytest.mark.asyncio
+async def test_batches_run_with_bounded_concurrency(monkeypatch):
+    """Test every item is handled once, in batches, with a capped number in flight."""
+    monkeypatch.setattr(settings, "consistency_check_concurrency", 2)
+    monkeypatch.setattr(consistency_service, "CHECK_BATCH_SIZE", 10)
+    seen = []
+    in_flight = 0
+    peak = 0
+    
+    async def handle(batch):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        seen.extend(batch)
+        in_flight -= 1
+    
+    await _for_each_batch(as_cursor(range(95)), handle)
+    
+    assert sorted(seen) == list(range(95))
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_fails_the_scan(monkeypatch):
+    """Test an error in one batch is raised rather than lost with its finished task."""
+    monkeypatch.setattr(settings, "consistency_check_concurrency", 2)
+    monkeypatch.setattr(consistency_service, "CHECK_BATCH_SIZE", 10)
+    
+    async def handle(batch):
+        if 20 in batch:
+            raise RuntimeError("batch failed")
+        await asyncio.sleep(0.01)
+    
+    with pytest.raises(RuntimeError, match="batch failed"):
+        await _for_each_batch(as_cursor(range(95)), handle)
+
+
+def test_report_keeps_exact_counts_and_bounded_samples():
+    """Test findings beyond the sample limit are counted but not stored."""
+    report = ConsistencyReport(repair=False)
+    for i in range(REPORT_SAMPLE_LIMIT + 5):
+        report.add("unowned_collections", {"collection_name": f"org_{i}"})
+    
+    result = report.to_dict()
+    assert result["counts"]["unowned_collections"] == REPORT_SAMPLE_LIMIT + 5
+    assert len(result["samples"]["unowned_collections"]) == REPORT_SAMPLE_LIMIT
+    assert result["consistent"] is False
+
+
+@pytest.mark.asyncio
+async def test_consistency_check_requires_operator():
+    """Test the consistency endpoint is rejected without the operator key."""
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post("/admin/consistency")
+        assert response.status_code == 403
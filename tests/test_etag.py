@@ -0,0 +1,40 @@
+from app.api.routes.org import _etag_matches
+from app.services.event_service import organization_events
+from app.services.org_service import ETagCache, OrganizationService
+
+
+def test_etag_matching():
+    """Test If-None-Match handles lists, weak validators and wildcards."""
+    etag = OrganizationService.etag("abc", 3)
+    assert etag == '"abc-3"'
+    assert _etag_matches('"abc-2", W/"abc-3"', etag)
+    assert _etag_matches("*", etag)
+    assert not _etag_matches('"abc-2"', etag)
+
+
+def test_etag_cache_trusts_entries_only_while_change_stream_is_live(monkeypatch):
+    """Test cached ETags are served only with live change events, and dropped by them."""
+    cache = ETagCache(max_size=2)
+    monkeypatch.setattr(organization_events, "live", False)
+    cache.put("TestOrg", "org-1", '"org-1-1"', cache.invalidations)
+    assert cache.get("TestOrg") is None
+    
+    monkeypatch.setattr(organization_events, "live", True)
+    cache.put("TestOrg", "org-1", '"org-1-1"', cache.invalidations)
+    assert cache.get("TestOrg") == '"org-1-1"'
+    
+    # A gap in change stream coverage invalidates every entry
+    monkeypatch.setattr(organization_events, "generation", organization_events.generation + 1)
+    assert cache.get("TestOrg") is None
+    
+    seen = cache.invalidations
+    cache.put("TestOrg", "org-1", '"org-1-1"', seen)
+    cache.invalidate({"organization_id": "org-1"})
+    assert cache.get("TestOrg") is None
+    # A read that started before the invalidation must not repopulate the cache
+    cache.put("TestOrg", "org-1", '"org-1-1"', seen)
+    assert cache.get("TestOrg") is None
+    
+    for i in range(3):
+        cache.put(f"Org{i}", f"org-{i}", f'"org-{i}-1"', cache.invalidations)
+    assert cache.get("Org0") is None and cache.get("Org2") == '"org-2-1"'
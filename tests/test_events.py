@@ -0,0 +1,68 @@
+import asyncio
+import pytest
+from httpx import AsyncClient
+from app.main import app
+from app.core.config import settings
+from app.services.event_service import OrganizationEventBus
+
+
+@pytest.mark.asyncio
+async def test_subscriber_resumes_from_last_event_id():
+    """Test a reconnecting subscriber gets only the events it missed, or a reset if they are gone."""
+    bus = OrganizationEventBus()
+    for version in range(1, 4):
+        bus.emit("org.update", "org-1", "TestOrg", version=version)
+    first_id = bus._history[0]["id"]
+    
+    subscription, replay, reset = bus.subscribe(last_event_id=first_id)
+    assert [event["version"] for event in replay] == [2, 3]
+    assert reset is False
+    
+    bus.emit("org.rename", "org-1", "Renamed", version=4, previous_name="TestOrg")
+    assert subscription.queue.get_nowait()["type"] == "org.rename"
+    
+    _, replay, reset = bus.subscribe(last_event_id="unknown-1")
+    assert replay == [] and reset is True
+
+
+@pytest.mark.asyncio
+async def test_reset_reaches_live_subscribers():
+    """Test subscribers are told to resynchronise when change stream history is lost."""
+    bus = OrganizationEventBus()
+    bus.emit("org.update", "org-1", "TestOrg", version=1)
+    first_id = bus._history[0]["id"]
+    stream = bus.stream(organization_id="org-1")
+    pending = asyncio.ensure_future(stream.__anext__())
+    await asyncio.sleep(0)
+    
+    bus.reset()
+    
+    assert (await pending).startswith("event: reset")
+    _, replay, reset = bus.subscribe(last_event_id=first_id)
+    assert replay == [] and reset is True
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_is_disconnected(monkeypatch):
+    """Test a subscriber whose buffer fills up gets an overflow event and is dropped."""
+    monkeypatch.setattr(settings, "events_subscriber_buffer", 2)
+    bus = OrganizationEventBus()
+    stream = bus.stream(organization_id="org-1")
+    # Start the generator so it subscribes, then let events pile up unread
+    first = asyncio.ensure_future(stream.__anext__())
+    await asyncio.sleep(0)
+    for version in range(1, 5):
+        bus.emit("org.update", "org-1", "TestOrg", version=version)
+    bus.emit("org.update", "org-2", "OtherOrg", version=1)
+    
+    assert (await first).startswith("event: overflow")
+    assert bus._subscribers == set()
+
+
+@pytest.mark.asyncio
+async def test_event_stream_requires_auth():
+    """Test the event stream is rejected without a token or operator key."""
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/org/events")
+        assert response.status_code == 401
@@ -0,0 +1,42 @@
+import asyncio
+import pytest
+from app.core.load_shedding import (
+    ConcurrencyLimiter,
+    ShedError,
+    classify_request,
+    AUTH_HASHING,
+    BULK_TRANSFER,
+    METADATA_READ,
+    TENANT_MIGRATION
+)
+
+
+def test_classify_request():
+    """Test requests map to the expected route classes."""
+    assert classify_request("POST", "/admin/login") == AUTH_HASHING
+    assert classify_request("GET", "/org/get") == METADATA_READ
+    assert classify_request("PUT", "/org/update") == TENANT_MIGRATION
+    assert classify_request("GET", "/org/Acme/export") == BULK_TRANSFER
+    assert classify_request("POST", "/org/Acme/import") == BULK_TRANSFER
+    assert classify_request("GET", "/health") is None
+    assert classify_request("GET", "/org/events") is None
+
+
+@pytest.mark.asyncio
+async def test_limiter_sheds_on_full_queue_and_deadline():
+    """Test requests beyond the limit queue, then shed when full or late."""
+    limiter = ConcurrencyLimiter("test", limit=1, max_queue=1, deadline_seconds=0.05)
+    await limiter.acquire()
+    
+    waiting = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    with pytest.raises(ShedError) as full:
+        await limiter.acquire()
+    assert full.value.reason == "queue_full"
+    
+    with pytest.raises(ShedError) as late:
+        await waiting
+    assert late.value.reason == "deadline"
+    
+    limiter.release()
+    assert limiter.active == 0
@@ -0,0 +1,31 @@
+import asyncio
+import time
+import pytest
+from app.core.config import settings
+from app.core.loop_monitor import LoopMonitor
+
+
+def block_the_loop(seconds):
+    time.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_monitor_records_blocking_stack(monkeypatch):
+    """Test a blocking call is caught with the stack that blocked the loop."""
+    monkeypatch.setattr(settings, "loop_monitor_interval_ms", 10.0)
+    monkeypatch.setattr(settings, "loop_stall_threshold_ms", 50.0)
+    monitor = LoopMonitor()
+    monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        block_the_loop(0.2)
+        await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+    
+    summary = monitor.summary()
+    assert summary["samples"] > 0
+    assert summary["offenders"]
+    offender = summary["offenders"][0]
+    assert "block_the_loop" in "".join(offender["stack"])
+    assert offender["blocked_ms"] >= 100
@@ -0,0 +1,45 @@
+import threading
+from app.core.metrics import MetricsRegistry
+
+
+def test_registry_renders_prometheus_text():
+    """Test counters, gauges and histograms render in exposition format."""
+    registry = MetricsRegistry()
+    requests = registry.counter("test_requests_total", "Requests", ["route"])
+    depth = registry.gauge("test_queue_depth", "Queue depth")
+    latency = registry.histogram("test_latency_seconds", "Latency", buckets=(0.1, 1.0))
+    
+    requests.inc(route="/org/get")
+    requests.inc(2, route="/org/get")
+    depth.set(4)
+    latency.observe(0.05)
+    latency.observe(0.5)
+    
+    text = registry.render()
+    assert 'test_requests_total{route="/org/get"} 3' in text
+    assert "test_queue_depth 4" in text
+    assert 'test_latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{le="+Inf"} 2' in text
+    assert "test_latency_seconds_count 2" in text
+    assert registry.counter("test_requests_total", "Requests", ["route"]) is requests
+
+
+def test_metrics_are_safe_to_update_from_threads():
+    """Test concurrent updates from driver-style threads are all counted."""
+    registry = MetricsRegistry()
+    reads = registry.counter("test_reads_total", "Reads", ["server"])
+    latency = registry.histogram("test_read_seconds", "Read latency", ["server"])
+    
+    def work():
+        for _ in range(5000):
+            reads.inc(server="RSPrimary")
+            latency.observe(0.01, server="RSPrimary")
+    
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert reads.value(server="RSPrimary") == 40000
+    assert latency.count(server="RSPrimary") == 40000
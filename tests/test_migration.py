@@ -0,0 +1,172 @@
+import copy
+import pytest
+from bson import ObjectId
+from app.services import migration_service
+from app.services.migration_service import TenantMigrationService
+from app.utils.naming import tenant_collection_name
+
+
+def matches(document: dict, query: dict) -> bool:
+    for field, condition in query.items():
+        if isinstance(condition, dict) and "$exists" in condition:
+            if (field in document) != condition["$exists"]:
+                return False
+        elif document.get(field) != condition:
+            return False
+    return True
+
+
+async def as_cursor(items):
+    for item in items:
+        yield item
+
+
+class FakeCursor:
+    """Just enough of a Motor cursor for the migration: async iteration and batch_size."""
+
+    def __init__(self, documents: list):
+        self.documents = documents
+
+    def batch_size(self, size: int):
+        return self
+
+    def __aiter__(self):
+        return as_cursor(self.documents)
+
+
+class FakeCollection:
+    def __init__(self, db: "FakeDatabase", name: str):
+        self.db = db
+        self.name = name
+
+    @property
+    def documents(self) -> list:
+        return self.db.collections.setdefault(self.name, [])
+
+    def find(self, query: dict, projection: dict = None):
+        return FakeCursor([copy.deepcopy(doc) for doc in self.documents if matches(doc, query)])
+
+    async def insert_many(self, documents: list, ordered: bool = True):
+        self.documents.extend(copy.deepcopy(documents))
+
+    async def update_many(self, query: dict, update: dict):
+        for doc in self.documents:
+            if matches(doc, query):
+                for path, value in update["$set"].items():
+                    *parents, field = path.split(".")
+                    target = doc
+                    for parent in parents:
+                        target = target[parent]
+                    target[field] = value
+
+    async def update_one(self, query: dict, update: dict):
+        for doc in self.documents:
+            if matches(doc, query):
+                doc.update(update["$set"])
+                return
+
+    async def rename(self, new_name: str):
+        assert new_name not in self.db.collections, f"{new_name} already exists"
+        self.db.collections[new_name] = self.db.collections.pop(self.name)
+
+
+class FakeDatabase:
+    """The master database's collections as lists of documents, keyed by name."""
+
+    def __init__(self, collections: dict):
+        self.collections = collections
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        return FakeCollection(self, name)
+
+    @property
+    def organizations(self) -> FakeCollection:
+        return self["organizations"]
+
+    async def list_collection_names(self, filter: dict = None):
+        return [name for name in self.collections if name.startswith("org_")]
+
+    async def drop_collection(self, name: str):
+        self.collections.pop(name, None)
+
+    async def create_collection(self, name: str):
+        assert name not in self.collections, f"{name} already exists"
+        self.collections[name] = []
+
+
+@pytest.fixture
+def legacy_fleet(monkeypatch):
+    """Acme on its own legacy collection, and two organizations sharing org_globex."""
+    acme, globex, globex_two = ObjectId(), ObjectId(), ObjectId()
+    db = FakeDatabase({
+        "organizations": [
+            {"_id": acme, "organization_name": "Acme", "collection_name": "org_acme"},
+            {"_id": globex, "organization_name": "Globex", "collection_name": "org_globex"},
+            {"_id": globex_two, "organization_name": "Globex!", "collection_name": "org_globex"}
+        ],
+        "org_acme": [{"_metadata": {"collection_name": "org_acme"}}, {"sku": "a-1"}],
+        "org_globex": [{"_metadata": {"collection_name": "org_globex"}}, {"sku": "g-1"}]
+    })
+
+    async def get_master_db():
+        return db
+
+    monkeypatch.setattr(migration_service, "get_master_db", get_master_db)
+    return db, {"Acme": acme, "Globex": globex, "Globex!": globex_two}
+
+
+@pytest.mark.asyncio
+async def test_dry_run_reports_without_changing_anything(legacy_fleet):
+    """Test a dry run lists every move and the shared collection but leaves the database alone."""
+    db, _ = legacy_fleet
+    before = copy.deepcopy(db.collections)
+
+    report = await TenantMigrationService.migrate_legacy_collections(dry_run=True)
+
+    assert report["dry_run"]
+    assert sorted(entry["organization_name"] for entry in report["migrated"]) == ["Acme", "Globex", "Globex!"]
+    assert report["shared"] == [{"collection_name": "org_globex", "organizations": ["Globex", "Globex!"]}]
+    assert db.collections == before
+
+
+@pytest.mark.asyncio
+async def test_migration_gives_each_owner_its_collection_and_reruns_as_a_no_op(legacy_fleet):
+    """Test legacy collections are renamed or copied to id-keyed names, and a second run changes nothing."""
+    db, ids = legacy_fleet
+
+    report = await TenantMigrationService.migrate_legacy_collections()
+
+    assert len(report["migrated"]) == 3 and not report["missing"]
+    assert "org_acme" not in db.collections and "org_globex" not in db.collections
+    for name, org_id in ids.items():
+        target = tenant_collection_name(str(org_id))
+        assert [doc["sku"] for doc in db.collections[target] if "sku" in doc] == ["g-1" if "Globex" in name else "a-1"]
+        assert db.collections[target][0]["_metadata"]["collection_name"] == target
+    assert all(
+        org_doc["collection_name"] == tenant_collection_name(str(org_doc["_id"]))
+        for org_doc in db.collections["organizations"]
+    )
+    assert not any(name.startswith(migration_service.COPY_PREFIX) for name in db.collections)
+
+    after = copy.deepcopy(db.collections)
+    report = await TenantMigrationService.migrate_legacy_collections()
+
+    assert report["migrated"] == [] and report["shared"] == []
+    assert db.collections == after
+
+
+@pytest.mark.asyncio
+async def test_existing_target_is_only_repointed(legacy_fleet):
+    """Test a run interrupted after the rename is finished by repointing the organization."""
+    db, ids = legacy_fleet
+    target = tenant_collection_name(str(ids["Acme"]))
+    db.collections[target] = db.collections.pop("org_acme")
+
+    report = await TenantMigrationService.migrate_legacy_collections()
+
+    assert "Acme" in [entry["organization_name"] for entry in report["migrated"]]
+    assert not report["missing"]
+    assert [doc.get("sku") for doc in db.collections[target]] == [None, "a-1"]
+    assert db.collections[target][0]["_metadata"]["collection_name"] == target
+    acme = next(org_doc for org_doc in db.collections["organizations"] if org_doc["_id"] == ids["Acme"])
+    assert acme["collection_name"] == target
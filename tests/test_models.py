@@ -0,0 +1,37 @@
+import pytest
+from bson import ObjectId
+from app.models.master import Organization, AdminUser
+
+
+def test_admin_user_from_dict_keeps_organization_id():
+    """Test the organization id comes from the document, not the admin's own _id."""
+    admin_id, org_id = ObjectId(), str(ObjectId())
+    admin = AdminUser.from_dict({
+        "_id": admin_id,
+        "email": "admin@testorg.com",
+        "organization_name": "TestOrg",
+        "organization_id": org_id
+    })
+    
+    assert admin.organization_id == org_id
+    assert admin.id == admin_id
+    assert admin.hashed_password == ""
+
+
+def test_organization_is_slotted_and_round_trips():
+    """Test models carry no __dict__ and survive a to_dict/from_dict round trip."""
+    org = Organization(
+        organization_name="Test Org",
+        collection_name="org_1",
+        admin_email="admin@testorg.com",
+        admin_id="1",
+        id=ObjectId()
+    )
+    
+    assert not hasattr(org, "__dict__")
+    with pytest.raises(AttributeError):
+        org.unknown = 1
+    
+    document = org.to_dict()
+    assert document["name_trigrams"]
+    assert Organization.from_dict(document) == org
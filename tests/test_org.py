@@ -1,6 +1,11 @@
 import pytest
+from datetime import datetime
 from httpx import AsyncClient
+from pymongo.errors import DuplicateKeyError
 from app.main import app
+from app.repositories import get_repositories
+from app.services.stats_service import StatsService
+from tests.conftest import auth_headers, create_and_login
 
 
 @pytest.mark.asyncio
@@ -31,3 +36,173 @@ async def test_admin_login():
         )
         assert response.status_code in [200, 401]  # 200 success or 401 unauthorized
 
+
+
+@pytest.mark.asyncio
+async def test_update_organization_requires_auth():
+    """Test organization update without a token is rejected."""
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.put(
+            "/org/update",
+            json={
+                "organization_name": "TestOrg",
+                "email": "admin@testorg.com",
+                "password": "securepass123",
+                "expected_version": 1
+            }
+        )
+        assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_update_with_stale_version_conflicts():
+    """Test an update whose expected_version is not the current one is rejected with 409."""
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        headers = auth_headers(await create_and_login(client, "StaleOrg", "admin@staleorg.com"))
+        response = await client.put(
+            "/org/update",
+            json={
+                "organization_name": "StaleOrg",
+                "email": "admin@staleorg.com",
+                "password": "securepass123",
+                "expected_version": 2
+            },
+            headers=headers
+        )
+        assert response.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_update_bumps_version_from_the_written_document(monkeypatch):
+    """Test an update bumps version and updated_at, answering from the document the write returned."""
+    organizations = get_repositories().organizations
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        headers = auth_headers(await create_and_login(client, "VersionedOrg", "admin@versionedorg.com"))
+        created = await organizations.find_by_name("VersionedOrg")
+        update_versioned = organizations.update_versioned
+        
+        async def no_read(*args, **kwargs):
+            raise AssertionError("organization read again after the update")
+        
+        async def update_then_forbid_reads(*args, **kwargs):
+            updated = await update_versioned(*args, **kwargs)
+            monkeypatch.setattr(organizations, "find_by_name", no_read)
+            monkeypatch.setattr(organizations, "find_by_id", no_read)
+            return updated
+        
+        monkeypatch.setattr(organizations, "update_versioned", update_then_forbid_reads)
+        response = await client.put(
+            "/org/update",
+            json={
+                "organization_name": "VersionedOrg",
+                "email": "admin@versionedorg.com",
+                "password": "newpass12345",
+                "expected_version": 1
+            },
+            headers=headers
+        )
+        assert response.status_code == 200
+        assert response.json()["version"] == 2
+        assert datetime.fromisoformat(response.json()["updated_at"]) > created["updated_at"]
+
+
+@pytest.mark.asyncio
+async def test_failed_update_leaves_organization_and_admin_consistent(monkeypatch):
+    """Test an update rejected at either write changes neither the organization nor its admin."""
+    repos = get_repositories()
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        headers = auth_headers(await create_and_login(client, "SplitOrg", "admin@splitorg.com"))
+        before = await repos.organizations.find_by_name("SplitOrg")
+        admin_before = await repos.admin_users.find_by_email("admin@splitorg.com")
+        update = {
+            "organization_name": "SplitOrg",
+            "email": "new@splitorg.com",
+            "password": "newpass12345",
+            "expected_version": 1
+        }
+        
+        async def duplicate_email(*args, **kwargs):
+            raise DuplicateKeyError("E11000 duplicate key error")
+        
+        with monkeypatch.context() as patched:
+            patched.setattr(repos.admin_users, "update", duplicate_email)
+            assert (await client.put("/org/update", json=update, headers=headers)).status_code == 400
+        
+        async def lost_race(*args, **kwargs):
+            return None
+        
+        with monkeypatch.context() as patched:
+            patched.setattr(repos.organizations, "update_versioned", lost_race)
+            assert (await client.put("/org/update", json=update, headers=headers)).status_code == 409
+        
+        after = await repos.organizations.find_by_name("SplitOrg")
+        admin_after = await repos.admin_users.find_by_id(admin_before["_id"])
+        assert (after["admin_email"], after["version"]) == (before["admin_email"], before["version"])
+        assert admin_after["email"] == "admin@splitorg.com"
+        assert admin_after["hashed_password"] == admin_before["hashed_password"]
+
+
+@pytest.mark.asyncio
+async def test_search_organizations_rejects_bad_cursor():
+    """Test organization search with a malformed cursor."""
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get(
+            "/org/search",
+            params={"q": "acme", "cursor": "not-a-cursor"}
+        )
+        assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_fleet_stats_require_operator():
+    """Test fleet-wide stats are rejected without the operator key."""
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/org/stats")
+        assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_stats_refresh_runs_on_the_repositories():
+    """Test the stats refresh stores per-tenant and fleet stats without a database."""
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        await create_and_login(client, "CountedOrg", "admin@countedorg.com")
+    org = await get_repositories().organizations.find_by_name("CountedOrg")
+    
+    fleet = await StatsService.refresh_all()
+    
+    stats = await StatsService.get_tenant_stats(str(org["_id"]))
+    assert stats["document_count"] == 1  # the _metadata document
+    assert (await StatsService.get_fleet_stats())["tenants"] == fleet["tenants"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_health_probes():
+    """Test liveness always passes and readiness reports before any check ran."""
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        live = await client.get("/health/live")
+        assert live.status_code == 200
+        
+        ready = await client.get("/health/ready")
+        assert ready.status_code in [200, 503]
+        assert "status" in ready.json()
+
+
+def test_pool_saturation_is_per_cluster(monkeypatch):
+    """Test each cluster's pools are measured against that cluster's own maxPoolSize."""
+    from types import SimpleNamespace
+    from app.core import health
+    from app.core.database import PoolMonitor
+
+    def client(max_pool_size):
+        return SimpleNamespace(options=SimpleNamespace(pool_options=SimpleNamespace(max_pool_size=max_pool_size)))
+
+    monitors = {"default": PoolMonitor(), "east": PoolMonitor()}
+    monitors["default"].checked_out.update({("a", 27017): 30, ("b", 27017): 10})
+    monitors["east"].checked_out.update({("c", 27017): 9})
+    monkeypatch.setattr(health, "pool_monitors", monitors)
+    
+    pool = health.HealthMonitor()._pool_status({"default": client(100), "east": client(10)})
+    
+    assert pool["clusters"]["default"]["saturation"] == 0.3
+    assert pool["clusters"]["east"] == {"checked_out": 9, "max_pool_size": 10, "saturation": 0.9}
+    assert pool["saturation"] == 0.9 and pool["max_pool_size"] == 10
@@ -0,0 +1,71 @@
+import pytest
+from datetime import datetime
+from app.core.config import settings
+from app.repositories import get_repositories
+from app.services import placement_service
+from app.services.placement_service import PlacementService
+from app.services.stats_service import StatsService
+
+
+@pytest.mark.asyncio
+async def test_least_loaded_placement_spreads_between_refreshes(monkeypatch):
+    """Test new tenants go to the emptiest cluster, counting ones placed since the last refresh."""
+    monkeypatch.setattr(settings, "tenant_clusters", {"east": "mongodb://east", "west": "mongodb://west"})
+    monkeypatch.setattr(settings, "tenant_placement_policy", "least_loaded")
+    fleet = {
+        "refreshed_at": datetime.utcnow(),
+        "clusters": {
+            "default": {"tenants": 2, "data_size": 2000},
+            "east": {"tenants": 1, "data_size": 1000},
+            "west": {"tenants": 1, "data_size": 900}
+        }
+    }
+
+    async def get_fleet_stats():
+        return fleet
+
+    monkeypatch.setattr(StatsService, "get_fleet_stats", get_fleet_stats)
+    
+    # The average tenant is 975 bytes, so one placement on west outweighs east's lead
+    placed = [await PlacementService.choose_cluster() for _ in range(3)]
+    assert placed == ["west", "east", "west"]
+
+
+@pytest.mark.asyncio
+async def test_pinned_placement(monkeypatch):
+    """Test the pinned policy always uses the configured cluster and rejects unknown ones."""
+    monkeypatch.setattr(settings, "tenant_clusters", {"east": "mongodb://east"})
+    monkeypatch.setattr(settings, "tenant_placement_policy", "pinned")
+    monkeypatch.setattr(settings, "tenant_pinned_cluster", "east")
+    assert await PlacementService.choose_cluster() == "east"
+    
+    monkeypatch.setattr(settings, "tenant_pinned_cluster", "north")
+    with pytest.raises(ValueError):
+        await PlacementService.choose_cluster()
+
+
+@pytest.mark.asyncio
+async def test_move_refuses_a_tenant_claimed_by_another_move(monkeypatch):
+    """Test a move started concurrently with another fails before preparing or copying anything."""
+    monkeypatch.setattr(settings, "tenant_clusters", {"east": "mongodb://east", "west": "mongodb://west"})
+    organizations = get_repositories().organizations
+    org_id = await organizations.insert(
+        {"organization_name": "Contended", "collection_name": "org_contended", "cluster": "default"}
+    )
+
+    async def get_org_collection(collection_name, cluster):
+        # Another move claims the tenant after this one read the organization
+        await organizations.update_where(org_id, {}, {"moving_to": "west"})
+        return object()
+
+    async def must_not_run(*args):
+        raise AssertionError("the move went ahead without its claim")
+
+    monkeypatch.setattr(placement_service, "get_org_collection", get_org_collection)
+    monkeypatch.setattr(PlacementService, "_prepare_target", must_not_run)
+    monkeypatch.setattr(PlacementService, "_copy_all", must_not_run)
+    
+    with pytest.raises(ValueError):
+        await PlacementService.move_tenant("Contended", "east")
+    assert (await organizations.find_by_id(org_id))["moving_to"] == "west"
+    await organizations.delete(org_id)
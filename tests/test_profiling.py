@@ -0,0 +1,26 @@
+import time
+import pytest
+from app.core.profiling import ProfileStore, StackSampler
+
+
+def busy_for(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_sampler_collapses_busy_stacks():
+    """Test the sampler attributes samples to the busy function."""
+    sampler = StackSampler(0.001)
+    sampler.start()
+    busy_for(0.05)
+    await sampler.stop()
+    
+    store = ProfileStore(size=1)
+    profile = store.add(store.next_id(), "GET", "/org/get", 200, 0.05, sampler)
+    collapsed = store.collapsed(profile)
+    
+    assert sampler.samples > 0
+    assert "busy_for" in collapsed
+    assert store.list()[0]["path"] == "/org/get"
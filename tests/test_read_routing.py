@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+import pytest
+from pymongo.read_preferences import Primary, SecondaryPreferred
+from app.core.config import settings
+from app.core import database
+from app.core.database import PRIMARY, STALE_OK, RecentWrites, ReadRoutingMonitor, reads_served
+
+
+def test_stale_ok_reads_follow_settings(monkeypatch):
+    """Test the configured mode and staleness bound are used, and unknown modes rejected."""
+    monkeypatch.setattr(settings, "read_preference", "secondaryPreferred")
+    monkeypatch.setattr(settings, "read_max_staleness_seconds", 120)
+    preference = database.stale_ok_read_preference()
+    assert isinstance(preference, SecondaryPreferred) and preference.max_staleness == 120
+    
+    monkeypatch.setattr(settings, "read_preference", "primary")
+    assert isinstance(database.stale_ok_read_preference(), Primary)
+    monkeypatch.setattr(settings, "read_preference", "secondaryMostly")
+    with pytest.raises(ValueError):
+        database.stale_ok_read_preference()
+
+
+@pytest.mark.asyncio
+async def test_get_master_db_routes_stale_ok_reads_only(monkeypatch):
+    """Test only STALE_OK reads get the relaxed read preference."""
+    monkeypatch.setattr(settings, "read_preference", "secondaryPreferred")
+    monkeypatch.setattr(database.db, "stale_ok_master_db", None)
+    
+    primary_db = await database.get_master_db(PRIMARY)
+    stale_ok_db = await database.get_master_db(STALE_OK)
+    assert primary_db.read_preference == Primary()
+    assert isinstance(stale_ok_db.read_preference, SecondaryPreferred)
+    assert await database.get_master_db(STALE_OK) is stale_ok_db
+
+
+def test_recent_writes_stay_on_primary_for_the_window(monkeypatch):
+    """Test keys written recently route to the primary until the window passes."""
+    writes = RecentWrites(max_size=2)
+    writes.mark("Acme")
+    monkeypatch.setattr(settings, "read_preference", "primary")
+    assert writes.route("Acme") == STALE_OK
+    
+    monkeypatch.setattr(settings, "read_preference", "secondaryPreferred")
+    writes.mark("Acme", None, "admin-1")
+    assert writes.route("Acme") == PRIMARY and writes.route("other") == STALE_OK
+    writes.mark("Globex")
+    assert writes.route("Acme") == STALE_OK
+    
+    monkeypatch.setattr(settings, "read_your_writes_seconds", 0)
+    assert writes.route("Globex") == STALE_OK
+
+
+def test_read_routing_monitor_counts_reads_by_server_type():
+    """Test read commands are counted against the server type that served them."""
+    monitor = ReadRoutingMonitor()
+    address = ("replica-2", 27017)
+    monitor.description_changed(SimpleNamespace(
+        server_address=address, new_description=SimpleNamespace(server_type_name="RSSecondary")
+    ))
+    before = reads_served.value(server="RSSecondary")
+    monitor.started(SimpleNamespace(command_name="find", connection_id=address))
+    monitor.started(SimpleNamespace(command_name="insert", connection_id=address))
+    assert reads_served.value(server="RSSecondary") == before + 1
@@ -0,0 +1,93 @@
+import pytest
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+from app.repositories.memory import build_memory_repositories
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_enforces_unique_names_and_emails():
+    """Test inserts and updates hitting a unique index raise DuplicateKeyError."""
+    repos = build_memory_repositories()
+    first = await repos.organizations.insert({"organization_name": "Acme", "version": 1})
+    await repos.organizations.insert({"organization_name": "Globex", "version": 1})
+    with pytest.raises(DuplicateKeyError):
+        await repos.organizations.insert({"organization_name": "Acme"})
+    with pytest.raises(DuplicateKeyError):
+        await repos.organizations.update_versioned(first, 1, {"organization_name": "Globex"})
+    # A failed update changes nothing, including the version
+    assert await repos.organizations.find_by_name("Acme", projection={"version": 1}) == {"_id": first, "version": 1}
+    
+    admin = await repos.admin_users.insert({"email": "a@acme.com"})
+    await repos.admin_users.insert({"email": "b@acme.com"})
+    with pytest.raises(DuplicateKeyError):
+        await repos.admin_users.update(admin, {"email": "b@acme.com"})
+    await repos.admin_users.delete(admin)
+    await repos.admin_users.insert({"email": "a@acme.com"})
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_versioned_update():
+    """Test updates apply only at the expected version, and None matches unversioned documents."""
+    organizations = build_memory_repositories().organizations
+    org_id = await organizations.insert({"organization_name": "Acme"})
+    
+    updated = await organizations.update_versioned(org_id, None, {"admin_email": "x@acme.com"})
+    assert updated["version"] == 1 and updated["admin_email"] == "x@acme.com"
+    assert await organizations.update_versioned(org_id, None, {"admin_email": "y@acme.com"}) is None
+    updated = await organizations.update_versioned(org_id, 1, {"organization_name": "Acme2"}, {"version": 1})
+    assert updated == {"_id": org_id, "version": 2}
+    assert await organizations.find_by_name("Acme") is None
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_search_pages_in_index_order():
+    """Test prefix and substring search follow (name_normalized, _id) order across pages."""
+    organizations = build_memory_repositories().organizations
+    for name in ["acme west", "acme east", "beta acme", "acme", "gamma"]:
+        await organizations.insert({"organization_name": name, "name_normalized": name})
+    
+    first = await organizations.search("acme", "prefix", None, 2)
+    assert [doc["name_normalized"] for doc in first] == ["acme", "acme east"]
+    after = (first[-1]["name_normalized"], first[-1]["_id"])
+    rest = await organizations.search("acme", "prefix", after, 10)
+    assert [doc["name_normalized"] for doc in rest] == ["acme west"]
+    
+    found = await organizations.search("acme", "substring", None, 10, projection={"name_normalized": 1})
+    assert [doc["name_normalized"] for doc in found] == ["acme", "acme east", "acme west", "beta acme"]
+    
+    # Renames move the document in the search order
+    await organizations.update_versioned(first[0]["_id"], None, {"name_normalized": "zeta"})
+    assert [doc["name_normalized"] for doc in await organizations.search("acme", "prefix", None, 10)] == [
+        "acme east", "acme west"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_conditional_update():
+    """Test update_where applies only on a match, with $in, unset and inc."""
+    organizations = build_memory_repositories().organizations
+    org_id = await organizations.insert({"organization_name": "Acme", "cluster": "default", "version": 1})
+    
+    assert not await organizations.update_where(org_id, {"cluster": "other"}, {"moving_to": "east"})
+    assert await organizations.update_where(org_id, {"moving_to": {"$in": [None, "east"]}}, {"moving_to": "east"})
+    assert not await organizations.update_where(org_id, {"moving_to": {"$in": [None, "west"]}}, {"moving_to": "west"})
+    assert await organizations.update_where(
+        org_id, {"moving_to": "east"}, {"cluster": "east"}, unset=("moving_to",), inc={"version": 1}
+    )
+    assert await organizations.find_by_id(org_id, projection={"cluster": 1, "moving_to": 1, "version": 1}) == {
+        "_id": org_id, "cluster": "east", "version": 2
+    }
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_audit_pages_newest_first():
+    """Test audit events list newest first, per organization, and page on _id."""
+    audit = build_memory_repositories().audit
+    await audit.append([{"action": "org.create", "organization_name": name} for name in ("Acme", "Globex", "Acme")])
+    
+    newest = await audit.list("Acme", None, 1)
+    assert len(newest) == 1 and isinstance(newest[0]["_id"], ObjectId)
+    older = await audit.list("Acme", newest[0]["_id"], 10)
+    assert [event["organization_name"] for event in older] == ["Acme"]
+    assert older[0]["_id"] < newest[0]["_id"]
+    assert len(await audit.list(None, None, 10)) == 3
@@ -0,0 +1,26 @@
+from verify_setup import measure_startup
+
+# Far above a normal cold start; catches heavy work creeping back into import time
+TIME_TO_FIRST_REQUEST_LIMIT_MS = 5000
+
+
+def test_cold_start_defers_heavy_work():
+    """Test importing the app loads no crypto or driver client module and a first request is answered in time."""
+    timings = measure_startup()
+    assert timings["status"] == 200
+    assert timings["loaded_eagerly"] == []
+    assert timings["total_ms"] < TIME_TO_FIRST_REQUEST_LIMIT_MS
+
+
+def test_settings_load_on_first_use(monkeypatch):
+    """Test the settings proxy loads once and forwards reads and writes to the instance."""
+    from app.core import config
+    
+    monkeypatch.setattr(config, "_settings", None)
+    monkeypatch.setenv("ETAG_CACHE_SIZE", "7")
+    assert config.settings.etag_cache_size == 7
+    loaded = config.get_settings()
+    assert config.get_settings() is loaded
+    
+    config.settings.etag_cache_size = 9
+    assert loaded.etag_cache_size == 9
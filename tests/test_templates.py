@@ -0,0 +1,48 @@
+import pytest
+from httpx import AsyncClient
+from app.main import app
+from app.core.config import settings
+from app.models.master import Organization
+from app.repositories import get_repositories
+from app.services.org_service import OrganizationService
+from app.services.template_service import TemplateService, current_template
+
+
+def test_template_rejects_indexes_without_name(monkeypatch):
+    """Test a malformed template is refused instead of half-applied."""
+    monkeypatch.setattr(settings, "tenant_template", {"version": 1, "indexes": [{"keys": [["sku", 1]]}]})
+    with pytest.raises(ValueError):
+        current_template()
+
+
+@pytest.mark.asyncio
+async def test_new_tenants_get_template_and_reconciler_upgrades_the_rest(monkeypatch):
+    """Test provisioning applies the template and the reconciler brings older tenants up to it."""
+    repos = get_repositories()
+    monkeypatch.setattr(settings, "tenant_template", {"version": 1})
+    created = await OrganizationService.create_organization("TemplateOrg", "admin@templateorg.com", "securepass123")
+    key = (created["cluster"], created["collection_name"])
+    assert repos.tenants.templates[key] == 1
+    
+    monkeypatch.setattr(settings, "tenant_template", {
+        "version": 2,
+        "indexes": [{"keys": [["sku", 1]], "name": "sku_1", "unique": True}]
+    })
+    monkeypatch.setattr(settings, "template_reconcile_batch_size", 1)
+    progress = await TemplateService.reconcile()
+    
+    assert progress["version"] == 2 and not progress["running"]
+    assert progress["applied"] >= 1 and progress["failed"] == 0
+    assert repos.tenants.templates[key] == 2
+    org_doc = await repos.organizations.find_by_name("TemplateOrg", projection=Organization.PROJECTION)
+    assert org_doc["template_version"] == 2
+    assert await repos.organizations.count_template_outdated(2) == 0
+    await OrganizationService.delete_organization("TemplateOrg")
+
+
+@pytest.mark.asyncio
+async def test_template_status_requires_operator():
+    """Test the template status endpoint is rejected without the operator key."""
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/admin/templates")
+        assert response.status_code == 403
@@ -0,0 +1,73 @@
+import asyncio
+import pytest
+from app.core.metrics import registry
+from app.core.tenant_scheduler import TenantScheduler
+
+
+async def run_batches(scheduler: TenantScheduler, tenant: str, count: int, started: list, scheduling=None):
+    async def batch():
+        async with scheduler.slot(tenant, scheduling):
+            started.append(tenant)
+            await asyncio.sleep(0.001)
+    return [asyncio.create_task(batch()) for _ in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_noisy_tenant_cannot_starve_others():
+    """Test a tenant queueing many batches is capped and a later tenant is served next."""
+    scheduler = TenantScheduler(capacity=3, max_concurrency=2)
+    started = []
+    noisy = await run_batches(scheduler, "org_noisy", 10, started)
+    await asyncio.sleep(0)
+    assert scheduler.summary()["tenants"]["org_noisy"] == {
+        "active": 2, "queued": 8, "max_concurrency": 2, "weight": 1.0
+    }
+    
+    quiet = await run_batches(scheduler, "org_quiet", 2, started)
+    await asyncio.gather(*noisy, *quiet)
+    assert started.index("org_quiet") == 2
+    assert len(started) - started[::-1].index("org_quiet") - 1 <= 4
+    assert scheduler.active == 0 and scheduler.summary()["tenants"] == {}
+
+
+@pytest.mark.asyncio
+async def test_backlogged_tenants_share_by_weight():
+    """Test slots go to backlogged tenants in proportion to their weights."""
+    scheduler = TenantScheduler(capacity=1, max_concurrency=1)
+    started = []
+    heavy = await run_batches(scheduler, "org_heavy", 12, started, {"weight": 3})
+    light = await run_batches(scheduler, "org_light", 12, started)
+    await asyncio.gather(*heavy, *light)
+    assert started[:8].count("org_heavy") == 6
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiters_release_their_place():
+    """Test cancelling queued batches leaves no slots or queue entries behind, and capacity 0 disables the scheduler."""
+    scheduler = TenantScheduler(capacity=1, max_concurrency=1)
+    started = []
+    tasks = await run_batches(scheduler, "org_a", 3, started)
+    await asyncio.sleep(0)
+    tasks[1].cancel()
+    tasks[2].cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    assert started == ["org_a"]
+    assert scheduler.active == 0 and scheduler.summary()["tenants"] == {}
+    
+    unlimited = TenantScheduler(capacity=0)
+    async with unlimited.slot("org_a"):
+        async with unlimited.slot("org_a"):
+            assert unlimited.active == 0
+
+
+@pytest.mark.asyncio
+async def test_idle_tenants_leave_no_metric_series():
+    """Test a tenant's labelled series are dropped once it has nothing running or queued."""
+    scheduler = TenantScheduler(capacity=1, max_concurrency=1)
+    started = []
+    batches = await run_batches(scheduler, "org_transient", 3, started)
+    await asyncio.sleep(0)
+    assert 'tenant="org_transient"' in registry.render()
+    
+    await asyncio.gather(*batches)
+    assert 'tenant="org_transient"' not in registry.render()
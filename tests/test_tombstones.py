@@ -0,0 +1,51 @@
+import pytest
+from httpx import AsyncClient
+from app.main import app
+from app.core.config import settings
+from app.repositories import get_repositories
+from app.services.org_service import OrganizationService
+from tests.conftest import auth_headers, create_and_login
+
+
+@pytest.mark.asyncio
+async def test_delete_tombstones_then_reaper_reclaims(monkeypatch):
+    """Test a deleted organization is gone at once and reclaimed by the reaper later."""
+    monkeypatch.setattr(settings, "reaper_drops_per_second", 0)
+    repos = get_repositories()
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        headers = auth_headers(await create_and_login(client, "TombstoneOrg", "admin@tombstone.com"))
+        org = await OrganizationService.get_organization("TombstoneOrg")
+        
+        response = await client.delete("/org/delete", params={"organization_name": "TombstoneOrg"}, headers=headers)
+        assert response.status_code == 200
+        assert (await client.get("/org/get", params={"organization_name": "TombstoneOrg"})).status_code == 404
+        assert (await client.get("/org/search", params={"q": "tombstone"})).json()["items"] == []
+        response = await client.post(
+            "/admin/login", json={"email": "admin@tombstone.com", "password": "securepass123"}
+        )
+        assert response.status_code == 401
+        
+        # The collection survives until the reaper runs
+        tenant_key = (org["cluster"], org["collection_name"])
+        assert tenant_key in repos.tenants.collections
+        assert await OrganizationService.reap_tombstones() >= 1
+        assert tenant_key not in repos.tenants.collections
+        assert await repos.organizations.list_tombstoned(10) == []
+        
+        # Both the name and the email are free for reuse
+        await create_and_login(client, "TombstoneOrg", "admin@tombstone.com")
+
+
+@pytest.mark.asyncio
+async def test_deprovision_requires_operator_and_reports_each_name(monkeypatch):
+    """Test bulk deprovisioning tombstones existing organizations and reports missing ones."""
+    monkeypatch.setattr(settings, "ops_api_key", "ops-secret")
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        body = {"organization_names": ["OffboardOrg", "NoSuchOrg"]}
+        assert (await client.post("/admin/deprovision", json=body)).status_code == 403
+        
+        await create_and_login(client, "OffboardOrg", "admin@offboard.com")
+        response = await client.post("/admin/deprovision", json=body, headers={"X-Ops-Key": "ops-secret"})
+        assert response.status_code == 200
+        assert response.json() == {"deleted": ["OffboardOrg"], "not_found": ["NoSuchOrg"], "failed": {}}
+        assert await OrganizationService.get_organization("OffboardOrg") is None
@@ -0,0 +1,66 @@
+import pytest
+from app.core.tracing import (
+    Span,
+    TracingMiddleware,
+    _current_span,
+    parse_traceparent,
+    span_processor,
+    traced
+)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+
+
+def test_parse_traceparent():
+    """Test W3C traceparent parsing and rejection of malformed headers."""
+    assert parse_traceparent(f"00-{TRACE_ID}-00f067aa0ba902b7-01") == (TRACE_ID, "00f067aa0ba902b7", True)
+    assert parse_traceparent(f"00-{TRACE_ID}-00f067aa0ba902b7-00")[2] is False
+    assert parse_traceparent("00-xyz-00f067aa0ba902b7-01") is None
+    assert parse_traceparent(None) is None
+
+
+@pytest.mark.asyncio
+async def test_traced_creates_child_spans_only_when_sampled():
+    """Test @traced nests under the current span and is a no-op without one."""
+    @traced("test.work")
+    async def work():
+        return _current_span.get()
+    
+    assert await work() is None
+    
+    root = Span("root", TRACE_ID)
+    token = _current_span.set(root)
+    try:
+        child = await work()
+    finally:
+        _current_span.reset(token)
+    
+    assert child.name == "test.work"
+    assert child.trace_id == TRACE_ID
+    assert child.parent_id == root.span_id
+    assert child in span_processor._take()
+
+
+@pytest.mark.asyncio
+async def test_middleware_propagates_traceparent():
+    """Test a sampled incoming traceparent continues the trace in the response."""
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+    
+    messages = []
+    
+    async def send(message):
+        messages.append(message)
+    
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/org/get",
+        "headers": [(b"traceparent", f"00-{TRACE_ID}-00f067aa0ba902b7-01".encode())]
+    }
+    await TracingMiddleware(app)(scope, None, send)
+    
+    headers = dict(messages[0]["headers"])
+    assert headers[b"traceparent"].decode().startswith(f"00-{TRACE_ID}-")
+    assert any(span.name == "GET /org/get" for span in span_processor._take())
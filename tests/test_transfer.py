@@ -0,0 +1,45 @@
+import gzip
+import bson
+import pytest
+from bson import json_util
+from app.services import transfer_service
+from app.services.transfer_service import BSONFrameReader, NDJSONLineReader
+
+
+def test_bson_frame_reader_splits_across_chunks():
+    """Test BSON documents are reassembled regardless of chunk boundaries."""
+    docs = [{"_id": i, "name": f"doc-{i}"} for i in range(3)]
+    data = b"".join(bson.encode(doc) for doc in docs)
+    
+    reader = BSONFrameReader()
+    parsed = []
+    for i in range(0, len(data), 7):
+        parsed.extend(reader.feed(data[i:i + 7]))
+    reader.close()
+    
+    assert [dict(doc) for doc in parsed] == docs
+
+
+def test_ndjson_line_reader_parses_gzip_stream():
+    """Test gzip'd NDJSON is parsed incrementally."""
+    docs = [{"_id": i, "name": f"doc-{i}"} for i in range(3)]
+    data = gzip.compress("\n".join(json_util.dumps(doc) for doc in docs).encode("utf-8"))
+    
+    reader = NDJSONLineReader()
+    parsed = []
+    for i in range(0, len(data), 5):
+        parsed.extend(reader.feed(data[i:i + 5]))
+    parsed.extend(reader.close())
+    
+    assert parsed == docs
+
+
+def test_ndjson_line_reader_rejects_oversized_lines(monkeypatch):
+    """Test a line that never ends is refused once it passes the document cap."""
+    monkeypatch.setattr(transfer_service, "MAX_DOCUMENT_BYTES", 1024)
+    monkeypatch.setattr(transfer_service, "CHUNK_BYTES", 256)
+    data = gzip.compress(b"x" * 100_000)
+    
+    reader = NDJSONLineReader()
+    with pytest.raises(ValueError):
+        reader.feed(data)
@@ -2,9 +2,46 @@
 Quick verification script to check if setup is correct.
 Run: python verify_setup.py
 """
+import json
+import subprocess
 import sys
 import os
 
+# Time from interpreter start to the first answered request, in ms; override with STARTUP_BUDGET_MS
+STARTUP_BUDGET_MS = float(os.environ.get("STARTUP_BUDGET_MS", "1500"))
+# Modules that should only load on first use, not when the app is imported
+LAZY_MODULES = ["jose", "bcrypt", "motor.motor_asyncio"]
+
+# Run in a fresh interpreter so nothing is already imported. The request
+# goes through the ASGI app in-process; /health/live does no I/O, so no
+# database is needed.
+STARTUP_PROBE = """
+import time
+started = time.perf_counter()
+import asyncio, json, sys
+import app.main
+imported = time.perf_counter()
+lazy = [name for name in %r if name in sys.modules]
+application = app.main.create_app()
+created = time.perf_counter()
+import httpx
+
+async def first_request():
+    async with httpx.AsyncClient(app=application, base_url="http://probe") as client:
+        return (await client.get("/health/live")).status_code
+
+status = asyncio.run(first_request())
+answered = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "create_app_ms": (created - imported) * 1000,
+    "first_request_ms": (answered - created) * 1000,
+    "total_ms": (answered - started) * 1000,
+    "status": status,
+    "loaded_eagerly": lazy
+}))
+"""
+
 def check_python_version():
     """Check Python version."""
     if sys.version_info < (3, 8):
@@ -76,6 +113,71 @@ def check_project_structure():
         return False
     return True
 
+def _probe_env() -> dict:
+    # Placeholders let the probe build the app without a .env; nothing is contacted
+    env = dict(os.environ)
+    env.setdefault("JWT_SECRET", "startup-probe")
+    env.setdefault("MONGO_URI", "mongodb://localhost:27017")
+    return env
+
+
+def measure_startup() -> dict:
+    """Import the app, build it and answer one request in a fresh interpreter; timings in ms."""
+    result = subprocess.run(
+        [sys.executable, "-c", STARTUP_PROBE % (LAZY_MODULES,)],
+        capture_output=True, text=True, env=_probe_env(), check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(count: int = 10) -> list:
+    """(cumulative ms, module) for the slowest direct imports of app.main, from -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True, text=True, env=_probe_env(), check=True
+    )
+    imports, pending = [], []
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package", children before their parent
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = len(name) - len(name.lstrip())
+        if depth == 3:
+            pending.append((int(cumulative) / 1000, name.strip()))
+        elif depth == 1:
+            if name.strip() == "app.main":
+                imports = pending
+            pending = []
+    return sorted(imports, reverse=True)[:count]
+
+
+def check_startup_time():
+    """Check time to first request against the startup budget and list the slowest imports."""
+    try:
+        timings = measure_startup()
+        slowest = slowest_imports()
+    except (subprocess.CalledProcessError, ValueError) as e:
+        print(f"[X] Could not start the app: {getattr(e, 'stderr', None) or e}")
+        return False
+    
+    print(f"    import app.main:  {timings['import_ms']:8.1f} ms")
+    print(f"    create_app():     {timings['create_app_ms']:8.1f} ms")
+    print(f"    first request:    {timings['first_request_ms']:8.1f} ms")
+    print("    Slowest imports:")
+    for elapsed, name in slowest:
+        print(f"      {elapsed:8.1f} ms  {name}")
+    
+    ok = True
+    if timings["loaded_eagerly"]:
+        print(f"[!] Loaded at import instead of first use: {', '.join(timings['loaded_eagerly'])}")
+        ok = False
+    if timings["total_ms"] > STARTUP_BUDGET_MS:
+        print(f"[X] Time to first request {timings['total_ms']:.0f} ms is over the {STARTUP_BUDGET_MS:.0f} ms budget")
+        return False
+    print(f"[OK] Time to first request {timings['total_ms']:.0f} ms (budget {STARTUP_BUDGET_MS:.0f} ms)")
+    return ok
+
 def main():
     print("=" * 60)
     print("Organization Management Service - Setup Verification")
@@ -87,6 +189,7 @@ def main():
         ("Project Structure", check_project_structure),
         ("Dependencies", check_dependencies),
         ("Environment File", check_env_file),
+        ("Startup Time", check_startup_time),
     ]
     
     results = []